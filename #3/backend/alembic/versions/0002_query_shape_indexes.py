@@ -0,0 +1,70 @@
+"""Composite indexes matching router query shapes
+
+Adds composite indexes for the multi-column filters used by the routers and
+indexes the foreign keys that had none. Indexes are created with IF NOT EXISTS
+because databases created by init_db already get them from the models.
+
+Revision ID: 0002_query_shape_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_query_shape_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_predictions_team_created", "predictions", ["team_id", "created_at"]),
+    (
+        "ix_predictions_status_validation",
+        "predictions",
+        ["status", "validation_date"],
+    ),
+    ("ix_predictions_repository_id", "predictions", ["repository_id"]),
+    (
+        "ix_prediction_models_type_status",
+        "prediction_models",
+        ["prediction_type", "status"],
+    ),
+    (
+        "ix_estimation_accuracy_rollup_key",
+        "estimation_accuracy",
+        ["prediction_type", "time_period", "team_id", "model_id", "task_type"],
+    ),
+    (
+        "ix_issues_repository_state_created",
+        "issues",
+        ["repository_id", "state", "created_at"],
+    ),
+    ("ix_pull_requests_repository_id", "pull_requests", ["repository_id"]),
+    ("ix_commits_repository_id", "commits", ["repository_id"]),
+    ("ix_team_members_team_active", "team_members", ["team_id", "is_active"]),
+    (
+        "ix_technology_experiences_team_member_id",
+        "technology_experiences",
+        ["team_member_id"],
+    ),
+    (
+        "ix_sprints_team_completed_start",
+        "sprints",
+        ["team_id", "is_completed", "start_date"],
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,51 @@
+"""GitHub conditional request validators
+
+Adds the github_etags table used by the repository sync engine to send
+conditional requests. Databases created by init_db after this change already
+have the table, so it is only created when missing.
+
+Revision ID: 0003_github_etags
+Revises: 0002_query_shape_indexes
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_github_etags"
+down_revision: Union[str, None] = "0002_query_shape_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("github_etags"):
+        return
+
+    op.create_table(
+        "github_etags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(length=1000), nullable=False),
+        sa.Column("etag", sa.String(length=255), nullable=True),
+        sa.Column("last_modified", sa.String(length=100), nullable=True),
+        sa.Column("has_next_page", sa.Boolean(), nullable=False),
+        sa.Column("last_page", sa.Integer(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_github_etags_id", "github_etags", ["id"])
+    op.create_index("ix_github_etags_url", "github_etags", ["url"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_github_etags_url", table_name="github_etags")
+    op.drop_index("ix_github_etags_id", table_name="github_etags")
+    op.drop_table("github_etags")
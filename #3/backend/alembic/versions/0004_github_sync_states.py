@@ -0,0 +1,54 @@
+"""Incremental GitHub sync positions
+
+Adds the github_sync_states table holding each repository's per-resource
+watermark and the position of an unfinished sync run. Databases created by
+init_db after this change already have the table, so it is only created when
+missing.
+
+Revision ID: 0004_github_sync_states
+Revises: 0003_github_etags
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_github_sync_states"
+down_revision: Union[str, None] = "0003_github_etags"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("github_sync_states"):
+        return
+
+    op.create_table(
+        "github_sync_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("repository_id", sa.Integer(), nullable=False),
+        sa.Column("resource", sa.String(length=50), nullable=False),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("cursor", sa.DateTime(), nullable=True),
+        sa.Column("next_page", sa.Integer(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["repository_id"], ["repositories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "repository_id", "resource", name="uq_github_sync_states_resource"
+        ),
+    )
+    op.create_index("ix_github_sync_states_id", "github_sync_states", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_github_sync_states_id", table_name="github_sync_states")
+    op.drop_table("github_sync_states")
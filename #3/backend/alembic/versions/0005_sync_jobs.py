@@ -0,0 +1,62 @@
+"""Background sync jobs
+
+Adds the sync_jobs table used by the in-process sync job queue. Databases
+created by init_db after this change already have the table, so it is only
+created when missing.
+
+Revision ID: 0005_sync_jobs
+Revises: 0004_github_sync_states
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_sync_jobs"
+down_revision: Union[str, None] = "0004_github_sync_states"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+sync_job_status = sa.Enum(
+    "QUEUED", "RUNNING", "COMPLETED", "FAILED", name="syncjobstatus"
+)
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("sync_jobs"):
+        return
+
+    op.create_table(
+        "sync_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("repository_full_name", sa.String(length=500), nullable=False),
+        sa.Column("status", sync_job_status, nullable=False),
+        sa.Column("full_resync", sa.Boolean(), nullable=False),
+        sa.Column("repository_id", sa.Integer(), nullable=True),
+        sa.Column("issues_synced", sa.Integer(), nullable=False),
+        sa.Column("pull_requests_synced", sa.Integer(), nullable=False),
+        sa.Column("commits_synced", sa.Integer(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["repository_id"], ["repositories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_sync_jobs_id", "sync_jobs", ["id"])
+    op.create_index(
+        "ix_sync_jobs_repository_status",
+        "sync_jobs",
+        ["repository_full_name", "status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_jobs_repository_status", table_name="sync_jobs")
+    op.drop_index("ix_sync_jobs_id", table_name="sync_jobs")
+    op.drop_table("sync_jobs")
+    sync_job_status.drop(op.get_bind(), checkfirst=True)
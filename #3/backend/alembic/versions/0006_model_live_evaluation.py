@@ -0,0 +1,45 @@
+"""Shadow and canary model evaluation
+
+Adds the SHADOW and CANARY model statuses and the
+prediction_models.traffic_percentage column. Databases created by init_db
+after this change already have the column, so it is only added when missing.
+Only PostgreSQL stores the status as a native enum type that needs the new
+values.
+
+Revision ID: 0006_model_live_evaluation
+Revises: 0005_sync_jobs
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_model_live_evaluation"
+down_revision: Union[str, None] = "0005_sync_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE modelstatus ADD VALUE IF NOT EXISTS 'SHADOW'")
+            op.execute("ALTER TYPE modelstatus ADD VALUE IF NOT EXISTS 'CANARY'")
+
+    columns = {
+        column["name"] for column in sa.inspect(bind).get_columns("prediction_models")
+    }
+    if "traffic_percentage" not in columns:
+        op.add_column(
+            "prediction_models",
+            sa.Column("traffic_percentage", sa.Float(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    # PostgreSQL can't drop enum values; models using them must be retired first
+    op.drop_column("prediction_models", "traffic_percentage")
@@ -0,0 +1,146 @@
+"""Stored team aggregates
+
+Adds the teams columns holding active member and seniority counts and the
+counter behind the running mean of estimation accuracy, then backfills them
+and the existing velocity and accuracy metrics from members, completed
+sprints and validated predictions. Databases created by init_db after this
+change already have the columns, so they are only added when missing. Teams
+with no history behind a metric keep its stored value.
+
+Revision ID: 0007_team_aggregates
+Revises: 0006_model_live_evaluation
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_team_aggregates"
+down_revision: Union[str, None] = "0006_model_live_evaluation"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_COLUMNS = [
+    "validated_prediction_count",
+    "current_size",
+    "junior_count",
+    "mid_count",
+    "senior_count",
+    "lead_count",
+    "principal_count",
+]
+
+# Stored enum names of the member seniority levels, keyed by count column
+SENIORITY_LEVELS = {
+    "junior_count": "JUNIOR",
+    "mid_count": "MID",
+    "senior_count": "SENIOR",
+    "lead_count": "LEAD",
+    "principal_count": "PRINCIPAL",
+}
+
+teams = sa.table(
+    "teams",
+    sa.column("id", sa.Integer),
+    sa.column("average_velocity", sa.Float),
+    sa.column("estimation_accuracy_score", sa.Float),
+    *(sa.column(name, sa.Integer) for name in COUNT_COLUMNS),
+)
+team_members = sa.table(
+    "team_members",
+    sa.column("id", sa.Integer),
+    sa.column("team_id", sa.Integer),
+    sa.column("is_active", sa.Boolean),
+    sa.column("seniority_level", sa.String),
+)
+sprints = sa.table(
+    "sprints",
+    sa.column("team_id", sa.Integer),
+    sa.column("is_completed", sa.Boolean),
+    sa.column("velocity", sa.Float),
+)
+predictions = sa.table(
+    "predictions",
+    sa.column("id", sa.Integer),
+    sa.column("team_id", sa.Integer),
+    sa.column("status", sa.String),
+    sa.column("predicted_value", sa.Float),
+    sa.column("actual_value", sa.Float),
+    sa.column("validation_date", sa.DateTime),
+)
+
+
+def _aggregate(expression, *criteria):
+    return sa.select(expression).where(*criteria).scalar_subquery()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("teams")}
+    for name in COUNT_COLUMNS:
+        if name not in columns:
+            op.add_column(
+                "teams",
+                sa.Column(name, sa.Integer(), nullable=False, server_default="0"),
+            )
+
+    active_members = (
+        team_members.c.team_id == teams.c.id,
+        team_members.c.is_active == sa.true(),
+    )
+    validated = (
+        predictions.c.team_id == teams.c.id,
+        predictions.c.status == "VALIDATED",
+        predictions.c.actual_value.isnot(None),
+        predictions.c.validation_date.isnot(None),
+    )
+
+    # Same as the Prediction.accuracy_percentage expression, on a 0-1 scale
+    error = sa.func.abs(predictions.c.predicted_value - predictions.c.actual_value)
+    actual = sa.func.abs(predictions.c.actual_value)
+    accuracy = sa.case(
+        (
+            predictions.c.actual_value == 0,
+            sa.case((predictions.c.predicted_value == 0, 1.0), else_=0.0),
+        ),
+        (error < actual, 1 - error / actual),
+        else_=0.0,
+    )
+
+    count = sa.func.count(team_members.c.id)
+    values = {"current_size": _aggregate(count, *active_members)}
+    for column, level in SENIORITY_LEVELS.items():
+        values[column] = _aggregate(
+            count,
+            *active_members,
+            team_members.c.seniority_level == level,
+        )
+    op.execute(
+        teams.update().values(
+            **values,
+            average_velocity=sa.func.coalesce(
+                _aggregate(
+                    sa.func.avg(sprints.c.velocity),
+                    sprints.c.team_id == teams.c.id,
+                    sprints.c.is_completed == sa.true(),
+                ),
+                teams.c.average_velocity,
+            ),
+            estimation_accuracy_score=sa.func.coalesce(
+                _aggregate(sa.func.avg(accuracy), *validated),
+                teams.c.estimation_accuracy_score,
+            ),
+            validated_prediction_count=_aggregate(
+                sa.func.count(predictions.c.id), *validated
+            ),
+        )
+    )
+
+
+def downgrade() -> None:
+    # Backfilled metric values are kept; only the new columns are dropped
+    for name in reversed(COUNT_COLUMNS):
+        op.drop_column("teams", name)
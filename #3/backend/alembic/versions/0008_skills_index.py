@@ -0,0 +1,39 @@
+"""Technology proficiency index for skills search
+
+Adds a composite index on technology name and proficiency score, so finding
+the members with a technology above a proficiency is an index range scan.
+The index is created with IF NOT EXISTS because databases created by init_db
+already get it from the models.
+
+Revision ID: 0008_skills_index
+Revises: 0007_team_aggregates
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_skills_index"
+down_revision: Union[str, None] = "0007_team_aggregates"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_technology_experiences_name_proficiency",
+        "technology_experiences",
+        ["technology_name", "proficiency_score"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_technology_experiences_name_proficiency",
+        table_name="technology_experiences",
+        if_exists=True,
+    )
@@ -0,0 +1,153 @@
+"""One estimation accuracy rollup per bucket
+
+Replaces the rollup key index with a unique index on the bucket dimensions,
+which incremental rollup updates upsert against. Unique indexes treat NULLs
+as distinct, so the nullable team, model and task type are coalesced.
+
+Duplicate buckets left by concurrent validations are merged first: counts
+are summed and running means are weighted by the counts behind them. The
+median isn't maintained incrementally and is cleared on merged rows.
+
+Revision ID: 0009_rollup_bucket_unique
+Revises: 0008_skills_index
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_rollup_bucket_unique"
+down_revision: Union[str, None] = "0008_skills_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_COLUMNS = [
+    "total_predictions",
+    "validated_predictions",
+    "predictions_within_10_percent",
+    "predictions_within_25_percent",
+    "predictions_within_50_percent",
+    "overestimation_count",
+    "underestimation_count",
+]
+
+# Running mean columns and the count column each one is a mean over
+MEAN_COLUMNS = {
+    "average_accuracy_percentage": "validated_predictions",
+    "mae": "validated_predictions",
+    "mse": "validated_predictions",
+    "average_overestimation_percentage": "overestimation_count",
+    "average_underestimation_percentage": "underestimation_count",
+}
+
+estimation_accuracy = sa.table(
+    "estimation_accuracy",
+    sa.column("id", sa.Integer),
+    sa.column("team_id", sa.Integer),
+    sa.column("model_id", sa.Integer),
+    sa.column("prediction_type", sa.String),
+    sa.column("time_period", sa.String),
+    sa.column("task_type", sa.String),
+    sa.column("period_start", sa.DateTime),
+    sa.column("period_end", sa.DateTime),
+    sa.column("calculated_at", sa.DateTime),
+    *(sa.column(name, sa.Integer) for name in COUNT_COLUMNS),
+    *(sa.column(name, sa.Float) for name in MEAN_COLUMNS),
+)
+
+
+def _bucket(table):
+    return [
+        table.c.prediction_type,
+        table.c.time_period,
+        sa.func.coalesce(table.c.team_id, sa.literal_column("0")),
+        sa.func.coalesce(table.c.model_id, sa.literal_column("0")),
+        sa.func.coalesce(table.c.task_type, sa.literal_column("''")),
+    ]
+
+
+def _merge_duplicate_buckets() -> None:
+    rollups = estimation_accuracy
+    bucket = _bucket(rollups)
+    last_id = op.get_bind().scalar(sa.select(sa.func.max(rollups.c.id))) or 0
+
+    merged = {
+        "team_id": sa.func.max(rollups.c.team_id),
+        "model_id": sa.func.max(rollups.c.model_id),
+        "prediction_type": rollups.c.prediction_type,
+        "time_period": rollups.c.time_period,
+        "task_type": sa.func.max(rollups.c.task_type),
+        "period_start": sa.func.min(rollups.c.period_start),
+        "period_end": sa.func.max(rollups.c.period_end),
+        "calculated_at": sa.func.max(rollups.c.calculated_at),
+    }
+    for name in COUNT_COLUMNS:
+        merged[name] = sa.func.sum(rollups.c[name])
+    for name, count in MEAN_COLUMNS.items():
+        weight = sa.case((rollups.c[name].isnot(None), rollups.c[count]))
+        merged[name] = sa.func.sum(rollups.c[name] * rollups.c[count]) / sa.func.nullif(
+            sa.func.sum(weight), 0
+        )
+
+    op.execute(
+        rollups.insert().from_select(
+            list(merged),
+            sa.select(*merged.values())
+            .group_by(*bucket)
+            .having(sa.func.count(rollups.c.id) > 1),
+        )
+    )
+
+    # Drop the rows that were merged into a new one
+    replacement = rollups.alias("replacement")
+    op.execute(
+        rollups.delete().where(
+            rollups.c.id <= last_id,
+            sa.exists().where(
+                replacement.c.id > last_id,
+                *(
+                    new == old
+                    for new, old in zip(_bucket(replacement), _bucket(rollups))
+                ),
+            ),
+        )
+    )
+
+
+def upgrade() -> None:
+    _merge_duplicate_buckets()
+    op.drop_index(
+        "ix_estimation_accuracy_rollup_key",
+        table_name="estimation_accuracy",
+        if_exists=True,
+    )
+    op.create_index(
+        "ix_estimation_accuracy_bucket",
+        "estimation_accuracy",
+        [
+            "prediction_type",
+            "time_period",
+            sa.text("coalesce(team_id, 0)"),
+            sa.text("coalesce(model_id, 0)"),
+            sa.text("coalesce(task_type, '')"),
+        ],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_estimation_accuracy_bucket",
+        table_name="estimation_accuracy",
+        if_exists=True,
+    )
+    op.create_index(
+        "ix_estimation_accuracy_rollup_key",
+        "estimation_accuracy",
+        ["prediction_type", "time_period", "team_id", "model_id", "task_type"],
+        if_not_exists=True,
+    )
@@ -0,0 +1,40 @@
+"""Training run claims
+
+Adds the training_claims table. Processes that run the training pipeline
+claim each run by conditionally updating the row, committed before any
+training data is loaded, so concurrent API workers don't train together.
+Databases created by init_db after this change already have the table, so it
+is only created when missing.
+
+Revision ID: 0010_training_claims
+Revises: 0009_rollup_bucket_unique
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_training_claims"
+down_revision: Union[str, None] = "0009_rollup_bucket_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("training_claims"):
+        return
+
+    op.create_table(
+        "training_claims",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("claimed_by", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("training_claims")
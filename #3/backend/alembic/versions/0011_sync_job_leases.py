@@ -0,0 +1,73 @@
+"""Sync job leases
+
+Adds sync_jobs.heartbeat_at, which workers renew while they run a job so a
+restart only re-queues jobs whose lease has expired, and a partial unique
+index allowing one queued or running job per repository. Duplicate active
+jobs left by concurrent submits are failed first, keeping the oldest job of
+each repository. Databases created by init_db after this change already have
+the column and index, so they are only created when missing.
+
+Revision ID: 0011_sync_job_leases
+Revises: 0010_training_claims
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_sync_job_leases"
+down_revision: Union[str, None] = "0010_training_claims"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("status IN ('QUEUED', 'RUNNING')")
+
+sync_jobs = sa.table(
+    "sync_jobs",
+    sa.column("id", sa.Integer),
+    sa.column("repository_full_name", sa.String),
+    sa.column("status", sa.String),
+    sa.column("error", sa.Text),
+    sa.column("finished_at", sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("sync_jobs")}
+    if "heartbeat_at" not in columns:
+        op.add_column(
+            "sync_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True)
+        )
+
+    oldest = (
+        sa.select(sa.func.min(sync_jobs.c.id))
+        .where(ACTIVE)
+        .group_by(sync_jobs.c.repository_full_name)
+    )
+    op.execute(
+        sync_jobs.update()
+        .where(ACTIVE, sync_jobs.c.id.not_in(oldest))
+        .values(
+            status="FAILED",
+            error="Coalesced into an earlier job",
+            finished_at=sa.func.now(),
+        )
+    )
+    op.create_index(
+        "ix_sync_jobs_active_repository",
+        "sync_jobs",
+        ["repository_full_name"],
+        unique=True,
+        sqlite_where=ACTIVE,
+        postgresql_where=ACTIVE,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_jobs_active_repository", table_name="sync_jobs")
+    op.drop_column("sync_jobs", "heartbeat_at")
@@ -6,6 +6,8 @@ This package contains all API endpoints organized by domain:
 - teams: Team and member management endpoints
 - predictions: Prediction and estimation endpoints
 - analytics: Analytics and reporting endpoints
+- pagination: Keyset pagination shared by the list endpoints
+- export: Streaming NDJSON and CSV exports
 """
 
 __version__ = "1.0.0"
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, case, select, true
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from pydantic import BaseModel
@@ -12,7 +12,17 @@ from app.models.prediction import (
     Prediction,
     PredictionModel,
     EstimationAccuracy,
+    ModelStatus,
     PredictionStatus,
+    PredictionType,
+)
+from app.services.analytics_cache import (
+    ALL_REPOSITORIES,
+    ALL_TEAMS,
+    MODELS,
+    analytics_cache,
+    repository_scope,
+    team_scope,
 )
 
 router = APIRouter()
@@ -50,10 +60,12 @@ class PredictionAnalyticsResponse(BaseModel):
 
 
 @router.get("/teams/velocity", response_model=List[TeamVelocityResponse])
+@analytics_cache.cached(lambda team_id, **_: [team_scope(team_id)])
 async def get_team_velocity_analytics(
+    request: Request,
     team_id: Optional[int] = Query(None),
     days: int = Query(30, ge=7, le=365),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get team velocity analytics for the specified period.
@@ -62,32 +74,49 @@ async def get_team_velocity_analytics(
     start_date = end_date - timedelta(days=days)
 
     # Build base query
-    query = db.query(Team)
+    query = select(Team.id, Team.name).order_by(Team.id)
 
     if team_id:
-        query = query.filter(Team.id == team_id)
+        query = query.where(Team.id == team_id)
 
-    teams = query.filter(Team.is_active == True).all()
+    result = await db.execute(query.where(Team.is_active == True))
+    teams = result.all()
 
     if not teams:
         return []
 
+    # Aggregate completed sprints in the period per team
+    sprint_query = (
+        select(
+            Sprint.team_id,
+            func.count(Sprint.id).label("sprint_count"),
+            func.sum(func.coalesce(Sprint.completed_story_points, 0)).label(
+                "total_story_points"
+            ),
+            func.sum(func.coalesce(Sprint.actual_hours, 0)).label("total_hours"),
+            func.sum(Sprint.duration_days).label("total_sprint_days"),
+            func.avg(Sprint.story_points_estimation_accuracy).label("avg_accuracy"),
+        )
+        .where(
+            Sprint.start_date >= start_date,
+            Sprint.end_date <= end_date,
+            Sprint.is_completed == True,
+        )
+        .group_by(Sprint.team_id)
+    )
+
+    if team_id:
+        sprint_query = sprint_query.where(Sprint.team_id == team_id)
+
+    result = await db.execute(sprint_query)
+    sprint_totals = {row.team_id: row for row in result}
+
     results = []
 
     for team in teams:
-        # Get sprints in the period
-        sprints = (
-            db.query(Sprint)
-            .filter(
-                Sprint.team_id == team.id,
-                Sprint.start_date >= start_date,
-                Sprint.end_date <= end_date,
-                Sprint.is_completed == True,
-            )
-            .all()
-        )
+        totals = sprint_totals.get(team.id)
 
-        if not sprints:
+        if totals is None:
             # Create entry with no data
             results.append(
                 TeamVelocityResponse(
@@ -104,25 +133,15 @@ async def get_team_velocity_analytics(
             continue
 
         # Calculate metrics
-        total_story_points = sum(s.completed_story_points or 0 for s in sprints)
-        total_hours = sum(s.actual_hours or 0 for s in sprints)
+        total_story_points = totals.total_story_points or 0
+        total_hours = totals.total_hours or 0
 
         # Calculate velocity per day
-        total_sprint_days = sum(s.duration_days for s in sprints)
+        total_sprint_days = totals.total_sprint_days or 0
         velocity_per_day = (
             total_story_points / total_sprint_days if total_sprint_days > 0 else None
         )
 
-        # Calculate average estimation accuracy
-        accuracy_scores = [
-            s.story_points_estimation_accuracy
-            for s in sprints
-            if s.story_points_estimation_accuracy is not None
-        ]
-        avg_accuracy = (
-            sum(accuracy_scores) / len(accuracy_scores) if accuracy_scores else None
-        )
-
         results.append(
             TeamVelocityResponse(
                 team_id=team.id,
@@ -134,7 +153,7 @@ async def get_team_velocity_analytics(
                 else None,
                 total_hours_logged=total_hours if total_hours > 0 else None,
                 velocity_per_day=velocity_per_day,
-                estimation_accuracy=avg_accuracy,
+                estimation_accuracy=totals.avg_accuracy,
             )
         )
 
@@ -142,10 +161,12 @@ async def get_team_velocity_analytics(
 
 
 @router.get("/repositories/insights", response_model=List[RepositoryInsightsResponse])
+@analytics_cache.cached(lambda repository_id, **_: [repository_scope(repository_id)])
 async def get_repository_insights(
+    request: Request,
     repository_id: Optional[int] = Query(None),
     days: int = Query(30, ge=7, le=365),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get repository insights and analytics.
@@ -154,42 +175,46 @@ async def get_repository_insights(
     start_date = end_date - timedelta(days=days)
 
     # Build base query
-    query = db.query(Repository)
+    query = select(Repository.id, Repository.full_name).order_by(Repository.id)
 
     if repository_id:
-        query = query.filter(Repository.id == repository_id)
+        query = query.where(Repository.id == repository_id)
 
-    repositories = query.all()
+    result = await db.execute(query)
+    repositories = result.all()
 
     if not repositories:
         return []
 
+    # Aggregate issues in the period per repository
+    is_resolved = and_(Issue.state == "closed", Issue.closed_at.isnot(None))
+    issue_query = (
+        select(
+            Issue.repository_id,
+            func.count(Issue.id).label("total_issues"),
+            func.count(case((Issue.state == "open", Issue.id))).label("open_issues"),
+            func.count(case((Issue.state == "closed", Issue.id))).label(
+                "closed_issues"
+            ),
+            func.avg(case((is_resolved, Issue.resolution_time_hours))).label(
+                "avg_resolution_time"
+            ),
+            func.count(func.distinct(Issue.author_id)).label("contributor_count"),
+        )
+        .where(Issue.created_at >= start_date)
+        .group_by(Issue.repository_id)
+    )
+
+    if repository_id:
+        issue_query = issue_query.where(Issue.repository_id == repository_id)
+
+    result = await db.execute(issue_query)
+    issue_totals = {row.repository_id: row for row in result}
+
     results = []
 
     for repo in repositories:
-        # Get issues in the period
-        issues_query = db.query(Issue).filter(
-            Issue.repository_id == repo.id, Issue.created_at >= start_date
-        )
-
-        total_issues = issues_query.count()
-        open_issues = issues_query.filter(Issue.state == "open").count()
-        closed_issues = issues_query.filter(Issue.state == "closed").count()
-
-        # Calculate average resolution time
-        closed_issues_with_time = issues_query.filter(
-            Issue.state == "closed", Issue.closed_at.isnot(None)
-        ).all()
-
-        avg_resolution_time = None
-        if closed_issues_with_time:
-            resolution_times = [
-                i.resolution_time_hours
-                for i in closed_issues_with_time
-                if i.resolution_time_hours is not None
-            ]
-            if resolution_times:
-                avg_resolution_time = sum(resolution_times) / len(resolution_times)
+        totals = issue_totals.get(repo.id)
 
         # Get most common labels (mock implementation)
         # In a real implementation, you'd parse the labels JSON field
@@ -199,24 +224,18 @@ async def get_repository_insights(
             {"label": "documentation", "count": 2},
         ]
 
-        # Count unique contributors
-        contributor_count = (
-            db.query(func.count(func.distinct(Issue.author_id)))
-            .filter(Issue.repository_id == repo.id, Issue.created_at >= start_date)
-            .scalar()
-            or 0
-        )
-
         results.append(
             RepositoryInsightsResponse(
                 repository_id=repo.id,
                 repository_name=repo.full_name,
-                total_issues=total_issues,
-                open_issues=open_issues,
-                closed_issues=closed_issues,
-                average_resolution_time_hours=avg_resolution_time,
+                total_issues=totals.total_issues if totals else 0,
+                open_issues=totals.open_issues if totals else 0,
+                closed_issues=totals.closed_issues if totals else 0,
+                average_resolution_time_hours=totals.avg_resolution_time
+                if totals
+                else None,
                 most_common_labels=most_common_labels,
-                contributor_count=contributor_count,
+                contributor_count=totals.contributor_count if totals else 0,
             )
         )
 
@@ -224,10 +243,12 @@ async def get_repository_insights(
 
 
 @router.get("/predictions/analytics", response_model=PredictionAnalyticsResponse)
+@analytics_cache.cached(lambda team_id, **_: [team_scope(team_id)])
 async def get_prediction_analytics(
+    request: Request,
     team_id: Optional[int] = Query(None),
     days: int = Query(30, ge=7, le=365),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get prediction accuracy analytics.
@@ -235,94 +256,144 @@ async def get_prediction_analytics(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
 
-    # Build base query
-    query = db.query(Prediction).filter(
-        Prediction.created_at >= start_date, Prediction.created_at <= end_date
-    )
+    # Build base filters
+    filters = [Prediction.created_at >= start_date, Prediction.created_at <= end_date]
 
     if team_id:
-        query = query.filter(Prediction.team_id == team_id)
-
-    all_predictions = query.all()
-    validated_predictions = [
-        p for p in all_predictions if p.status == PredictionStatus.VALIDATED
-    ]
-
-    total_predictions = len(all_predictions)
-    validated_count = len(validated_predictions)
-
-    # Calculate average accuracy
-    accuracies = [
-        p.accuracy_percentage
-        for p in validated_predictions
-        if p.accuracy_percentage is not None
-    ]
-    average_accuracy = sum(accuracies) / len(accuracies) if accuracies else None
+        filters.append(Prediction.team_id == team_id)
+
+    is_validated = Prediction.status == PredictionStatus.VALIDATED
+
+    result = await db.execute(
+        select(
+            func.count(Prediction.id).label("total_predictions"),
+            func.count(case((is_validated, Prediction.id))).label("validated_count"),
+            func.avg(case((is_validated, Prediction.accuracy_percentage))).label(
+                "average_accuracy"
+            ),
+        ).where(*filters)
+    )
+    totals = result.one()
 
     # Calculate accuracy by prediction type
+    result = await db.execute(
+        select(
+            Prediction.prediction_type,
+            func.avg(Prediction.accuracy_percentage).label("average_accuracy"),
+        )
+        .where(*filters, is_validated)
+        .group_by(Prediction.prediction_type)
+    )
+    type_accuracies = {row.prediction_type: row.average_accuracy for row in result}
+
     accuracy_by_type = {}
-    for pred_type in ["story_points", "hours", "complexity", "risk_score"]:
-        type_predictions = [
-            p for p in validated_predictions if p.prediction_type.value == pred_type
-        ]
-        if type_predictions:
-            type_accuracies = [
-                p.accuracy_percentage
-                for p in type_predictions
-                if p.accuracy_percentage is not None
-            ]
-            if type_accuracies:
-                accuracy_by_type[pred_type] = sum(type_accuracies) / len(
-                    type_accuracies
-                )
+    for pred_type in PredictionType:
+        if type_accuracies.get(pred_type) is not None:
+            accuracy_by_type[pred_type.value] = type_accuracies[pred_type]
 
     # Calculate weekly accuracy trends
-    accuracy_trends = []
+    weeks = []
     current_date = start_date
     while current_date < end_date:
         week_end = min(current_date + timedelta(days=7), end_date)
+        weeks.append((current_date, week_end))
+        current_date = week_end
 
-        week_predictions = [
-            p for p in validated_predictions if current_date <= p.created_at < week_end
-        ]
-
-        if week_predictions:
-            week_accuracies = [
-                p.accuracy_percentage
-                for p in week_predictions
-                if p.accuracy_percentage is not None
-            ]
-            week_avg = (
-                sum(week_accuracies) / len(week_accuracies) if week_accuracies else None
-            )
-        else:
-            week_avg = None
+    # Bucket each validated prediction into its week with a CASE over the
+    # precomputed boundaries, so the database returns one row per week
+    week_bucket = case(
+        *[
+            (Prediction.created_at < week_end, index)
+            for index, (_, week_end) in enumerate(weeks)
+        ],
+        else_=None,
+    ).label("week")
+    result = await db.execute(
+        select(
+            week_bucket,
+            func.count(Prediction.id).label("predictions_count"),
+            func.avg(Prediction.accuracy_percentage).label("average_accuracy"),
+        )
+        .where(*filters, is_validated)
+        .group_by(week_bucket)
+    )
+    weekly_totals = {row.week: row for row in result}
 
+    accuracy_trends = []
+    for index, (week_start, week_end) in enumerate(weeks):
+        week = weekly_totals.get(index)
         accuracy_trends.append(
             {
-                "week_start": current_date.isoformat(),
+                "week_start": week_start.isoformat(),
                 "week_end": week_end.isoformat(),
-                "predictions_count": len(week_predictions),
-                "average_accuracy": week_avg,
+                "predictions_count": week.predictions_count if week else 0,
+                "average_accuracy": week.average_accuracy if week else None,
             }
         )
 
-        current_date = week_end
-
     return PredictionAnalyticsResponse(
-        total_predictions=total_predictions,
-        validated_predictions=validated_count,
-        average_accuracy=average_accuracy,
+        total_predictions=totals.total_predictions,
+        validated_predictions=totals.validated_count,
+        average_accuracy=totals.average_accuracy,
         accuracy_by_type=accuracy_by_type,
         accuracy_trends=accuracy_trends,
     )
 
 
+def dashboard_counts_query(start_date: datetime, team_id: Optional[int] = None):
+    """
+    Build one statement returning every dashboard count. Each table is
+    aggregated once into a single-row subquery, and the rows are cross-joined.
+    """
+    team_filters = [Team.is_active == True]
+    prediction_filters = [Prediction.created_at >= start_date]
+    if team_id:
+        team_filters.append(Team.id == team_id)
+        prediction_filters.append(Prediction.team_id == team_id)
+
+    is_validated = Prediction.status == PredictionStatus.VALIDATED
+    is_active_model = PredictionModel.status == ModelStatus.ACTIVE
+    aggregates = [
+        select(func.count(Team.id).label("active_teams")).where(*team_filters),
+        select(func.count(TeamMember.id).label("total_members")).where(
+            TeamMember.is_active == True
+        ),
+        select(
+            func.count(Prediction.id).label("recent_predictions"),
+            func.count(case((is_validated, Prediction.id))).label(
+                "validated_predictions"
+            ),
+        ).where(*prediction_filters),
+        select(func.count(Repository.id).label("total_repositories")),
+        select(
+            func.count(Issue.id).label("recent_issues"),
+            func.count(case((Issue.state == "closed", Issue.id))).label(
+                "closed_issues"
+            ),
+        ).where(Issue.created_at >= start_date),
+        select(
+            func.count(case((is_active_model, PredictionModel.id))).label(
+                "active_models"
+            ),
+            func.count(PredictionModel.id).label("total_models"),
+        ),
+    ]
+
+    subqueries = [aggregate.subquery() for aggregate in aggregates]
+    joined = subqueries[0]
+    for subquery in subqueries[1:]:
+        joined = joined.join(subquery, true())
+    return select(*subqueries).select_from(joined)
+
+
+# Member, repository and issue totals cover every team, even when filtered
 @router.get("/dashboard/summary")
+@analytics_cache.cached(lambda **_: [ALL_TEAMS, ALL_REPOSITORIES, MODELS])
 async def get_dashboard_summary(
+    request: Request,
     team_id: Optional[int] = Query(None),
     days: int = Query(7, ge=1, le=30),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get summary data for the main dashboard.
@@ -330,126 +401,97 @@ async def get_dashboard_summary(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
 
-    # Team metrics
-    team_query = db.query(Team)
-    if team_id:
-        team_query = team_query.filter(Team.id == team_id)
-
-    active_teams = team_query.filter(Team.is_active == True).count()
-
-    # Prediction metrics
-    pred_query = db.query(Prediction).filter(Prediction.created_at >= start_date)
-    if team_id:
-        pred_query = pred_query.filter(Prediction.team_id == team_id)
-
-    recent_predictions = pred_query.count()
-    validated_predictions = pred_query.filter(
-        Prediction.status == PredictionStatus.VALIDATED
-    ).count()
-
-    # Repository metrics
-    repo_query = db.query(Repository)
-    total_repositories = repo_query.count()
-
-    # Issue metrics
-    issue_query = db.query(Issue).filter(Issue.created_at >= start_date)
-    recent_issues = issue_query.count()
-    closed_issues = issue_query.filter(Issue.state == "closed").count()
-
-    # Model metrics
-    active_models = (
-        db.query(PredictionModel).filter(PredictionModel.status == "active").count()
-    )
+    counts = (await db.execute(dashboard_counts_query(start_date, team_id))).one()
 
     return {
         "period_days": days,
         "period_start": start_date.isoformat(),
         "period_end": end_date.isoformat(),
         "team_metrics": {
-            "active_teams": active_teams,
-            "total_members": db.query(TeamMember)
-            .filter(TeamMember.is_active == True)
-            .count(),
+            "active_teams": counts.active_teams,
+            "total_members": counts.total_members,
         },
         "prediction_metrics": {
-            "recent_predictions": recent_predictions,
-            "validated_predictions": validated_predictions,
-            "validation_rate": (validated_predictions / recent_predictions * 100)
-            if recent_predictions > 0
+            "recent_predictions": counts.recent_predictions,
+            "validated_predictions": counts.validated_predictions,
+            "validation_rate": (
+                counts.validated_predictions / counts.recent_predictions * 100
+            )
+            if counts.recent_predictions > 0
             else 0,
         },
         "repository_metrics": {
-            "total_repositories": total_repositories,
-            "recent_issues": recent_issues,
-            "issues_closed": closed_issues,
-            "close_rate": (closed_issues / recent_issues * 100)
-            if recent_issues > 0
+            "total_repositories": counts.total_repositories,
+            "recent_issues": counts.recent_issues,
+            "issues_closed": counts.closed_issues,
+            "close_rate": (counts.closed_issues / counts.recent_issues * 100)
+            if counts.recent_issues > 0
             else 0,
         },
         "model_metrics": {
-            "active_models": active_models,
-            "total_models": db.query(PredictionModel).count(),
+            "active_models": counts.active_models,
+            "total_models": counts.total_models,
         },
     }
 
 
 @router.get("/teams/{team_id}/performance")
+@analytics_cache.cached(lambda team_id, **_: [team_scope(team_id)])
 async def get_team_performance(
+    request: Request,
     team_id: int,
     days: int = Query(30, ge=7, le=365),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get detailed performance analytics for a specific team.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await db.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
 
-    # Get team predictions in period
-    predictions = (
-        db.query(Prediction)
-        .filter(Prediction.team_id == team_id, Prediction.created_at >= start_date)
-        .all()
+    # Aggregate team predictions in period
+    filters = (Prediction.team_id == team_id, Prediction.created_at >= start_date)
+    is_validated = Prediction.status == PredictionStatus.VALIDATED
+
+    result = await db.execute(
+        select(
+            func.count(Prediction.id).label("total_predictions"),
+            func.count(case((is_validated, Prediction.id))).label("validated_count"),
+            func.avg(case((is_validated, Prediction.accuracy_percentage))).label(
+                "average_accuracy"
+            ),
+        ).where(*filters)
     )
-
-    validated_predictions = [
-        p for p in predictions if p.status == PredictionStatus.VALIDATED
-    ]
+    totals = result.one()
 
     # Calculate performance metrics
-    total_predictions = len(predictions)
+    total_predictions = totals.total_predictions
     validation_rate = (
-        (len(validated_predictions) / total_predictions * 100)
+        (totals.validated_count / total_predictions * 100)
         if total_predictions > 0
         else 0
     )
 
-    # Accuracy metrics
-    accuracies = [
-        p.accuracy_percentage
-        for p in validated_predictions
-        if p.accuracy_percentage is not None
-    ]
-    avg_accuracy = sum(accuracies) / len(accuracies) if accuracies else None
-
-    # Prediction distribution by type
-    prediction_distribution = {}
-    for pred in predictions:
-        pred_type = pred.prediction_type.value
-        if pred_type not in prediction_distribution:
-            prediction_distribution[pred_type] = 0
-        prediction_distribution[pred_type] += 1
+    # Prediction distribution by type, in order of first appearance
+    result = await db.execute(
+        select(Prediction.prediction_type, func.count(Prediction.id))
+        .where(*filters)
+        .group_by(Prediction.prediction_type)
+        .order_by(func.min(Prediction.id))
+    )
+    prediction_distribution = {
+        pred_type.value: count for pred_type, count in result.all()
+    }
 
     # Get sprint data
-    sprints = (
-        db.query(Sprint)
-        .filter(Sprint.team_id == team_id, Sprint.start_date >= start_date)
-        .all()
+    result = await db.execute(
+        select(Sprint).where(Sprint.team_id == team_id, Sprint.start_date >= start_date)
     )
+    sprints = result.scalars().all()
 
     sprint_metrics = []
     for sprint in sprints:
@@ -473,9 +515,9 @@ async def get_team_performance(
         "period_end": end_date.isoformat(),
         "prediction_metrics": {
             "total_predictions": total_predictions,
-            "validated_predictions": len(validated_predictions),
+            "validated_predictions": totals.validated_count,
             "validation_rate": validation_rate,
-            "average_accuracy": avg_accuracy,
+            "average_accuracy": totals.average_accuracy,
             "prediction_distribution": prediction_distribution,
         },
         "sprint_metrics": sprint_metrics,
@@ -486,6 +528,14 @@ async def get_team_performance(
     }
 
 
+@router.get("/cache/stats")
+async def get_analytics_cache_stats():
+    """
+    Get hit, miss and 304 counters of the analytics response cache.
+    """
+    return analytics_cache.stats()
+
+
 @router.get("/health")
 async def analytics_health_check():
     """
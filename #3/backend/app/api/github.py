@@ -1,12 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
 from datetime import datetime
-import httpx
+from urllib.parse import parse_qs
+import json
 
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import page_rows, paginate
 from app.core.database import get_db
 from app.core.config import settings
-from app.models.github import Repository, Issue, PullRequest, Commit, GitHubUser
+from app.models.github import Repository, Issue, SyncJob, SyncJobStatus
+from app.services.github_webhooks import (
+    SUPPORTED_EVENTS,
+    github_webhook_consumer,
+    verify_signature,
+)
+from app.services.sync_jobs import sync_job_queue
 
 router = APIRouter()
 
@@ -55,35 +74,58 @@ class IssueResponse(BaseModel):
 class SyncRequest(BaseModel):
     repository_full_name: str
     github_token: Optional[str] = None
+    full_resync: bool = False
 
 
-class SyncResponse(BaseModel):
-    message: str
-    repository_id: int
+class SyncChangeCounts(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+class SyncJobResponse(BaseModel):
+    id: int
+    repository_full_name: str
+    status: SyncJobStatus
+    full_resync: bool
+    repository_id: Optional[int]
     issues_synced: int
     pull_requests_synced: int
     commits_synced: int
+    result: Optional[Dict[str, SyncChangeCounts]]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
 
 
 @router.get("/repositories", response_model=List[RepositoryResponse])
 async def list_repositories(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    List all repositories in the database.
+    List all repositories in the database, paged by cursor.
     """
-    repositories = db.query(Repository).offset(skip).limit(limit).all()
+    result = await db.execute(
+        paginate(select(Repository), Repository.id, skip, limit, cursor)
+    )
+    repositories = page_rows(result.scalars().all(), limit, response)
     return repositories
 
 
 @router.get("/repositories/{repo_id}", response_model=RepositoryResponse)
-async def get_repository(repo_id: int, db: Session = Depends(get_db)):
+async def get_repository(repo_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a specific repository by ID.
     """
-    repository = db.query(Repository).filter(Repository.id == repo_id).first()
+    repository = await db.get(Repository, repo_id)
     if not repository:
         raise HTTPException(status_code=404, detail="Repository not found")
     return repository
@@ -92,155 +134,220 @@ async def get_repository(repo_id: int, db: Session = Depends(get_db)):
 @router.get("/repositories/{repo_id}/issues", response_model=List[IssueResponse])
 async def list_repository_issues(
     repo_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     state: Optional[str] = Query(None, regex="^(open|closed|all)$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    List issues for a specific repository.
+    List issues for a specific repository, paged by cursor.
     """
     # Verify repository exists
-    repository = db.query(Repository).filter(Repository.id == repo_id).first()
+    repository = await db.get(Repository, repo_id)
     if not repository:
         raise HTTPException(status_code=404, detail="Repository not found")
 
     # Build query
-    query = db.query(Issue).filter(Issue.repository_id == repo_id)
+    query = select(Issue).where(Issue.repository_id == repo_id)
 
     if state and state != "all":
-        query = query.filter(Issue.state == state)
+        query = query.where(Issue.state == state)
 
-    issues = query.offset(skip).limit(limit).all()
+    result = await db.execute(paginate(query, Issue.id, skip, limit, cursor))
+    issues = page_rows(result.scalars().all(), limit, response)
     return issues
 
 
-@router.post("/repositories/sync", response_model=SyncResponse)
-async def sync_repository(sync_request: SyncRequest, db: Session = Depends(get_db)):
+@router.get("/repositories/{repo_id}/issues/export")
+async def export_repository_issues(
+    repo_id: int,
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    state: Optional[str] = Query(None, regex="^(open|closed|all)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream every issue of a repository as NDJSON or CSV, ordered by ID.
+    """
+    repository = await db.get(Repository, repo_id)
+    if not repository:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    query = select(
+        Issue.id,
+        Issue.github_id,
+        Issue.number,
+        Issue.title,
+        Issue.body,
+        Issue.state,
+        Issue.labels,
+        Issue.assignees,
+        Issue.milestone,
+        Issue.url,
+        Issue.estimated_hours,
+        Issue.actual_hours,
+        Issue.story_points,
+        Issue.complexity_score,
+        Issue.author_id,
+        Issue.created_at,
+        Issue.updated_at,
+        Issue.closed_at,
+    ).where(Issue.repository_id == repo_id)
+
+    if state and state != "all":
+        query = query.where(Issue.state == state)
+
+    return export_response(
+        query.order_by(Issue.id), format, f"{repository.name}-issues"
+    )
+
+
+@router.post("/repositories/sync", response_model=SyncJobResponse, status_code=202)
+async def sync_repository(sync_request: SyncRequest):
     """
-    Sync a repository from GitHub API.
-    This is a minimal implementation - in a real app, this would:
-    1. Fetch data from GitHub API
-    2. Parse and store in database
-    3. Handle rate limiting and errors
+    Queue a repository sync from GitHub API and return the job immediately.
+    A repository already queued or syncing returns its existing job instead.
     """
     # Use provided token or default from settings
     token = sync_request.github_token or settings.github_token
     if not token:
         raise HTTPException(status_code=400, detail="GitHub token is required")
 
+    job, _ = await sync_job_queue.submit(
+        sync_request.repository_full_name,
+        github_token=sync_request.github_token,
+        full_resync=sync_request.full_resync,
+    )
+    return job
+
+
+@router.get("/sync-jobs", response_model=List[SyncJobResponse])
+async def list_sync_jobs(
+    status: Optional[SyncJobStatus] = None,
+    repository_full_name: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List sync jobs, most recent first.
+    """
+    query = select(SyncJob)
+    if status:
+        query = query.where(SyncJob.status == status)
+    if repository_full_name:
+        query = query.where(SyncJob.repository_full_name == repository_full_name)
+
+    result = await db.execute(query.order_by(SyncJob.id.desc()).limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/sync-jobs/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Get a sync job's status and progress.
+    """
+    job = await db.get(SyncJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+
+def _webhook_payload(content_type: str, body: bytes) -> Dict[str, Any]:
+    """
+    Decode a webhook body sent as ``application/json`` or, when the hook is
+    configured for form content, as the ``payload`` field of a form.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "application/x-www-form-urlencoded":
+        fields = parse_qs(body.decode("utf-8", errors="replace"))
+        if "payload" not in fields:
+            raise HTTPException(status_code=400, detail="Missing webhook payload")
+        raw = fields["payload"][0]
+    elif media_type == "application/json":
+        raw = body
+    else:
+        raise HTTPException(
+            status_code=415, detail=f"Unsupported webhook content type: {media_type}"
+        )
+
     try:
-        # This is a placeholder implementation
-        # In reality, you would call GitHub API here
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github.v3+json",
-            }
-
-            # Simulate API call (commented out for minimal implementation)
-            # repo_response = await client.get(
-            #     f"{settings.github_api_url}/repos/{sync_request.repository_full_name}",
-            #     headers=headers
-            # )
-
-            # For now, create a mock repository entry
-            existing_repo = (
-                db.query(Repository)
-                .filter(Repository.full_name == sync_request.repository_full_name)
-                .first()
-            )
-
-            if existing_repo:
-                existing_repo.last_synced_at = datetime.utcnow()
-                db.commit()
-                repo_id = existing_repo.id
-            else:
-                # Create mock repository
-                new_repo = Repository(
-                    github_id=12345,  # Mock GitHub ID
-                    name=sync_request.repository_full_name.split("/")[-1],
-                    full_name=sync_request.repository_full_name,
-                    description=f"Mock repository for {sync_request.repository_full_name}",
-                    url=f"https://github.com/{sync_request.repository_full_name}",
-                    clone_url=f"https://github.com/{sync_request.repository_full_name}.git",
-                    default_branch="main",
-                    language="Python",
-                    size=1000,
-                    stargazers_count=10,
-                    forks_count=5,
-                    open_issues_count=3,
-                    is_private=False,
-                    is_fork=False,
-                    owner_id=1,  # Mock owner ID
-                    created_at=datetime.utcnow(),
-                    last_synced_at=datetime.utcnow(),
-                )
-
-                # Need to create a mock user first
-                mock_user = (
-                    db.query(GitHubUser).filter(GitHubUser.login == "mockuser").first()
-                )
-                if not mock_user:
-                    mock_user = GitHubUser(
-                        github_id=1,
-                        login="mockuser",
-                        name="Mock User",
-                        email="mock@example.com",
-                        type="User",
-                        created_at=datetime.utcnow(),
-                    )
-                    db.add(mock_user)
-                    db.commit()
-                    db.refresh(mock_user)
-
-                new_repo.owner_id = mock_user.id
-                db.add(new_repo)
-                db.commit()
-                db.refresh(new_repo)
-                repo_id = new_repo.id
-
-            return SyncResponse(
-                message=f"Repository {sync_request.repository_full_name} synced successfully",
-                repository_id=repo_id,
-                issues_synced=0,  # Mock values
-                pull_requests_synced=0,
-                commits_synced=0,
-            )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
+        payload = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook payload is not valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook payload is not an object")
+    return payload
+
+
+@router.post("/webhooks")
+async def receive_webhook(
+    request: Request,
+    x_github_event: str = Header(...),
+    x_github_delivery: Optional[str] = Header(None),
+    x_hub_signature_256: Optional[str] = Header(None),
+):
+    """
+    Receive a GitHub webhook delivery.
+    Issues, pull request and push events are queued and applied in batches.
+    Both the JSON and the form-encoded webhook content types are accepted.
+    """
+    if not settings.github_webhook_secret:
+        raise HTTPException(status_code=503, detail="Webhook secret is not configured")
+
+    # The signature covers the exact bytes GitHub sent
+    body = await request.body()
+    if not verify_signature(settings.github_webhook_secret, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    if x_github_event == "ping":
+        return {"status": "pong"}
+    if x_github_event not in SUPPORTED_EVENTS:
+        return {"status": "ignored", "event": x_github_event}
+
+    payload = _webhook_payload(request.headers.get("content-type", ""), body)
+    queued = github_webhook_consumer.enqueue(
+        x_github_event, payload, delivery_id=x_github_delivery
+    )
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "queued" if queued else "duplicate",
+            "event": x_github_event,
+        },
+    )
 
 
 @router.get("/repositories/{repo_id}/analytics")
-async def get_repository_analytics(repo_id: int, db: Session = Depends(get_db)):
+async def get_repository_analytics(repo_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get analytics for a specific repository.
     """
-    repository = db.query(Repository).filter(Repository.id == repo_id).first()
+    repository = await db.get(Repository, repo_id)
     if not repository:
         raise HTTPException(status_code=404, detail="Repository not found")
 
     # Calculate basic analytics
-    total_issues = db.query(Issue).filter(Issue.repository_id == repo_id).count()
-    open_issues = (
-        db.query(Issue)
-        .filter(Issue.repository_id == repo_id, Issue.state == "open")
-        .count()
+    total_issues = await db.scalar(
+        select(func.count(Issue.id)).where(Issue.repository_id == repo_id)
+    )
+    open_issues = await db.scalar(
+        select(func.count(Issue.id)).where(
+            Issue.repository_id == repo_id, Issue.state == "open"
+        )
     )
     closed_issues = total_issues - open_issues
 
     # Calculate average resolution time for closed issues
-    closed_issues_with_time = (
-        db.query(Issue)
-        .filter(
+    result = await db.execute(
+        select(Issue).where(
             Issue.repository_id == repo_id,
             Issue.state == "closed",
             Issue.created_at.isnot(None),
             Issue.closed_at.isnot(None),
         )
-        .all()
     )
+    closed_issues_with_time = result.scalars().all()
 
     avg_resolution_time = None
     if closed_issues_with_time:
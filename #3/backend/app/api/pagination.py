@@ -0,0 +1,64 @@
+"""
+Keyset pagination for list endpoints.
+
+Pages are ordered by primary key. When a page is full, its response carries an
+opaque cursor naming its last row in the ``X-Next-Cursor`` header. Passing it
+back as ``cursor`` starts the next page with an indexed ``id > last_id`` range
+instead of an OFFSET, so a deep page costs the same as the first one. Response
+bodies stay plain lists, and ``skip`` still works when no cursor is given.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, List, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def paginate(
+    query: Select, id_column, skip: int, limit: int, cursor: Optional[str]
+) -> Select:
+    """
+    Order a query by ID and restrict it to one page. One extra row is fetched
+    to tell whether another page follows.
+    """
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.where(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def page_rows(
+    rows: List[Any],
+    limit: int,
+    response: Response,
+    row_id: Callable[[Any], int] = lambda row: row.id,
+) -> List[Any]:
+    """Trim the extra row and set the next-page cursor if there is one."""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(row_id(rows[-1]))
+    return rows
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, insert, literal, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import datetime, timedelta
+from pydantic import BaseModel, Field
 
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import page_rows, paginate
 from app.core.database import get_db
 from app.models.prediction import (
     Prediction,
@@ -16,6 +19,21 @@ from app.models.prediction import (
 )
 from app.models.team import Team
 from app.models.github import Repository, Issue
+from app.services.accuracy_rollups import record_validation
+from app.services.analytics_cache import analytics_cache
+from app.services.feature_store import feature_store
+from app.services.inference import (
+    Estimate,
+    LoadedModel,
+    ModelLoadError,
+    extract_features,
+    load_model,
+    model_registry,
+)
+from app.services.prediction_cache import feature_hash, prediction_cache
+from app.services.shadow_scoring import shadow_scorer
+from app.services.similarity_index import similarity_index
+from app.services.team_aggregates import record_team_validation
 
 router = APIRouter()
 
@@ -31,6 +49,10 @@ class PredictionRequest(BaseModel):
     context: Optional[Dict[str, Any]] = None
 
 
+class BatchPredictionRequest(BaseModel):
+    tasks: List[PredictionRequest] = Field(..., min_length=1, max_length=1000)
+
+
 class PredictionResponse(BaseModel):
     id: int
     task_title: str
@@ -68,6 +90,7 @@ class ModelResponse(BaseModel):
     mse: Optional[float]
     r2_score: Optional[float]
     training_data_size: Optional[int]
+    traffic_percentage: Optional[float] = None
     created_at: datetime
     deployed_at: Optional[datetime]
 
@@ -75,6 +98,10 @@ class ModelResponse(BaseModel):
         from_attributes = True
 
 
+class CanaryRequest(BaseModel):
+    traffic_percentage: float = Field(..., gt=0, le=100)
+
+
 class TaskFeatureRequest(BaseModel):
     task_source: str
     task_source_id: str
@@ -87,53 +114,58 @@ class TaskFeatureRequest(BaseModel):
     actual_story_points: Optional[int] = None
 
 
-@router.post("/predict", response_model=PredictionResponse)
-async def create_prediction(
-    prediction_request: PredictionRequest, db: Session = Depends(get_db)
-):
+def _select_predictions_with_model_name():
     """
-    Create a new prediction for a task.
-    This is a minimal implementation that creates a mock prediction.
-    In a real system, this would:
-    1. Extract features from the task
-    2. Load the appropriate ML model
-    3. Make the prediction
-    4. Store the result
+    Build a prediction query that loads each row's model name in the same
+    round trip, so listing endpoints don't issue a lookup per prediction.
     """
-    # Verify team exists if provided
-    if prediction_request.team_id:
-        team = db.query(Team).filter(Team.id == prediction_request.team_id).first()
-        if not team:
-            raise HTTPException(status_code=404, detail="Team not found")
+    return select(Prediction, PredictionModel.name).outerjoin(
+        PredictionModel, Prediction.model_id == PredictionModel.id
+    )
+
+
+def _attach_model_names(rows) -> List[Prediction]:
+    """
+    Copy the joined model name onto each prediction for the response schema.
+    """
+    predictions = []
+    for prediction, model_name in rows:
+        prediction.model_name = model_name if model_name else "Unknown"
+        predictions.append(prediction)
+    return predictions
 
-    # Verify repository exists if provided
-    if prediction_request.repository_id:
-        repository = (
-            db.query(Repository)
-            .filter(Repository.id == prediction_request.repository_id)
-            .first()
-        )
-        if not repository:
-            raise HTTPException(status_code=404, detail="Repository not found")
 
-    # Get the active model for this prediction type
-    model = (
-        db.query(PredictionModel)
-        .filter(
-            PredictionModel.prediction_type == prediction_request.prediction_type,
+async def _get_serving_model(
+    db: AsyncSession, prediction_type: PredictionType
+) -> LoadedModel:
+    """
+    Get the loaded model serving a prediction type. The registry normally has
+    it; otherwise the ACTIVE model is loaded, or a default one is created.
+    """
+    loaded = model_registry.get(prediction_type)
+    if loaded is not None:
+        return loaded
+
+    result = await db.execute(
+        select(PredictionModel)
+        .where(
+            PredictionModel.prediction_type == prediction_type,
             PredictionModel.status == ModelStatus.ACTIVE,
         )
-        .first()
+        .order_by(
+            PredictionModel.deployed_at.desc().nulls_last(), PredictionModel.id.desc()
+        )
     )
+    model = result.scalars().first()
 
     if not model:
-        # Create a default mock model if none exists
+        # Create a default model served by the word-count heuristic
         model = PredictionModel(
             name="Default Mock Model",
             version="1.0",
             description="Default model for testing",
             model_type="mock_estimator",
-            prediction_type=prediction_request.prediction_type,
+            prediction_type=prediction_type,
             status=ModelStatus.ACTIVE,
             accuracy_score=0.75,
             mae=2.5,
@@ -141,130 +173,389 @@ async def create_prediction(
             training_data_size=100,
         )
         db.add(model)
-        db.commit()
-        db.refresh(model)
-
-    # Mock prediction logic
-    # In a real implementation, this would extract features and use ML model
-    task_complexity = len(prediction_request.task_title.split()) + (
-        len(prediction_request.task_description.split())
-        if prediction_request.task_description
-        else 0
-    )
+        await db.commit()
+        await db.refresh(model)
+
+    try:
+        return await model_registry.deploy(model)
+    except ModelLoadError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _task_text(task_title: str, task_description: Optional[str]) -> str:
+    return f"{task_title} {task_description or ''}"
+
+
+def _task_features(prediction_request: PredictionRequest) -> Dict[str, Any]:
+    """
+    Get a task's request-time features together with its precomputed
+    historical and team features from the feature store.
+    """
+    return {
+        **extract_features(
+            prediction_request.task_title, prediction_request.task_description
+        ),
+        **feature_store.features(
+            prediction_request.team_id,
+            prediction_request.repository_id,
+            prediction_request.task_type,
+            _task_text(
+                prediction_request.task_title, prediction_request.task_description
+            ),
+        ),
+    }
+
+
+def _feature_hash(
+    prediction_request: PredictionRequest,
+    features: Dict[str, Any],
+    model: LoadedModel,
+) -> str:
+    return feature_hash(prediction_request.model_dump(mode="json"), features, model)
+
+
+def _prediction_values(
+    prediction_request: PredictionRequest,
+    features: Dict[str, Any],
+    estimate: Estimate,
+    model: LoadedModel,
+) -> Dict[str, Any]:
+    """
+    Get the column values of the Prediction recorded for an estimate.
+    """
+    return {
+        "feature_hash": _feature_hash(prediction_request, features, model),
+        "task_title": prediction_request.task_title,
+        "task_description": prediction_request.task_description,
+        "task_type": prediction_request.task_type,
+        "input_features": features,
+        "prediction_type": prediction_request.prediction_type,
+        "predicted_value": estimate.value,
+        "confidence_score": estimate.confidence,
+        "confidence_interval_lower": estimate.lower,
+        "confidence_interval_upper": estimate.upper,
+        "prediction_context": prediction_request.context,
+        "model_id": model.model_id,
+        "team_id": prediction_request.team_id,
+        "repository_id": prediction_request.repository_id,
+    }
 
-    base_prediction = task_complexity * 0.5
-    if prediction_request.prediction_type == PredictionType.STORY_POINTS:
-        predicted_value = max(1, min(13, round(base_prediction)))  # Cap at 1-13 points
-    else:  # Hours
-        predicted_value = max(0.5, base_prediction * 2)  # Convert to hours
 
-    confidence_score = 0.7 + (task_complexity / 100)  # Mock confidence
-    confidence_score = min(0.95, confidence_score)
+@router.post("/predict", response_model=PredictionResponse)
+async def create_prediction(
+    prediction_request: PredictionRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a new prediction for a task.
+    The estimate comes from the ACTIVE model for the prediction type, which is
+    held in memory by the model registry, or from a canary model for its share
+    of traffic. Repeating a request for the same task and model returns the
+    stored prediction instead of a new one. Shadow and canary models score the
+    task in the background.
+    """
+    active = await _get_serving_model(db, prediction_request.prediction_type)
+    model = model_registry.route(active, prediction_request.model_dump_json())
+
+    features = _task_features(prediction_request)
+    key = _feature_hash(prediction_request, features, model)
+
+    # A cached prediction was created with these exact team and repository IDs
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Verify team exists if provided
+    if prediction_request.team_id:
+        team = await db.get(Team, prediction_request.team_id)
+        if not team:
+            raise HTTPException(status_code=404, detail="Team not found")
+
+    # Verify repository exists if provided
+    if prediction_request.repository_id:
+        repository = await db.get(Repository, prediction_request.repository_id)
+        if not repository:
+            raise HTTPException(status_code=404, detail="Repository not found")
+
+    stored = await prediction_cache.lookup(db, key)
+    if stored is not None:
+        return stored
+
+    estimate = model.predict([features])[0]
 
     # Create prediction record
     prediction = Prediction(
-        task_title=prediction_request.task_title,
-        task_description=prediction_request.task_description,
-        task_type=prediction_request.task_type,
-        input_features={
-            "title_word_count": len(prediction_request.task_title.split()),
-            "description_word_count": len(prediction_request.task_description.split())
-            if prediction_request.task_description
-            else 0,
-            "task_complexity": task_complexity,
-        },
-        prediction_type=prediction_request.prediction_type,
-        predicted_value=predicted_value,
-        confidence_score=confidence_score,
-        confidence_interval_lower=predicted_value * 0.8,
-        confidence_interval_upper=predicted_value * 1.2,
-        prediction_context=prediction_request.context,
-        model_id=model.id,
-        team_id=prediction_request.team_id,
-        repository_id=prediction_request.repository_id,
+        **_prediction_values(prediction_request, features, estimate, model)
     )
 
     db.add(prediction)
-    db.commit()
-    db.refresh(prediction)
+    await db.commit()
+    await db.refresh(prediction)
+    await analytics_cache.invalidate_teams(prediction.team_id)
 
     # Add model name to response
     prediction.model_name = model.name
+    prediction_cache.store(prediction)
+    shadow_scorer.enqueue(
+        prediction.id, prediction.prediction_type, features, model.model_id
+    )
 
     return prediction
 
 
-@router.get("/", response_model=List[PredictionResponse])
-async def list_predictions(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    team_id: Optional[int] = Query(None),
-    repository_id: Optional[int] = Query(None),
-    status: Optional[PredictionStatus] = Query(None),
-    prediction_type: Optional[PredictionType] = Query(None),
-    db: Session = Depends(get_db),
+@router.post("/predict/batch", response_model=List[PredictionResponse])
+async def create_predictions_batch(
+    batch_request: BatchPredictionRequest, db: AsyncSession = Depends(get_db)
 ):
     """
-    List predictions with optional filtering.
+    Create predictions for many tasks at once.
+    Each model is called once with the features of all its new tasks, and
+    every new prediction is stored in a single transaction. Tasks that repeat
+    one another or an earlier request share one prediction, as in
+    ``/predict``. Predictions are returned in request order.
     """
-    query = db.query(Prediction)
+    tasks = batch_request.tasks
+
+    # Verify every referenced team and repository exists in one round trip
+    team_ids = {task.team_id for task in tasks if task.team_id}
+    repository_ids = {task.repository_id for task in tasks if task.repository_id}
+    lookups = []
+    if team_ids:
+        lookups.append(
+            select(literal("team").label("kind"), Team.id).where(Team.id.in_(team_ids))
+        )
+    if repository_ids:
+        lookups.append(
+            select(literal("repository").label("kind"), Repository.id).where(
+                Repository.id.in_(repository_ids)
+            )
+        )
+    if lookups:
+        result = await db.execute(
+            union_all(*lookups) if len(lookups) > 1 else lookups[0]
+        )
+        found = set(result.all())
+        missing_teams = sorted(
+            team_id for team_id in team_ids if ("team", team_id) not in found
+        )
+        if missing_teams:
+            raise HTTPException(
+                status_code=404, detail=f"Team not found: {missing_teams}"
+            )
+        missing_repositories = sorted(
+            repository_id
+            for repository_id in repository_ids
+            if ("repository", repository_id) not in found
+        )
+        if missing_repositories:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Repository not found: {missing_repositories}",
+            )
+
+    features = [_task_features(task) for task in tasks]
+
+    # Route every task to its model; repeated tasks share a feature hash
+    serving: Dict[PredictionType, LoadedModel] = {}
+    models: List[LoadedModel] = []
+    for task in tasks:
+        if task.prediction_type not in serving:
+            serving[task.prediction_type] = await _get_serving_model(
+                db, task.prediction_type
+            )
+        models.append(
+            model_registry.route(serving[task.prediction_type], task.model_dump_json())
+        )
+    keys = [
+        _feature_hash(task, features[position], models[position])
+        for position, task in enumerate(tasks)
+    ]
+
+    # Reuse the predictions already made for any of the tasks
+    predictions: Dict[str, Prediction] = {}
+    for key in set(keys):
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            predictions[key] = cached
+    predictions.update(
+        await prediction_cache.lookup_many(db, set(keys) - predictions.keys())
+    )
+
+    # Score the first task of each new key with one call per model
+    first_positions: Dict[str, int] = {}
+    for position, key in enumerate(keys):
+        if key not in predictions:
+            first_positions.setdefault(key, position)
+    routed: Dict[int, List[int]] = {}
+    for position in first_positions.values():
+        routed.setdefault(models[position].model_id, []).append(position)
+
+    rows: List[Dict[str, Any]] = []
+    for positions in routed.values():
+        model = models[positions[0]]
+        estimates = model.predict([features[position] for position in positions])
+        rows.extend(
+            _prediction_values(tasks[position], features[position], estimate, model)
+            for position, estimate in zip(positions, estimates)
+        )
 
+    if rows:
+        # One multi-row INSERT. Its RETURNING rows come back in no guaranteed
+        # order, so they're matched to the tasks by their unique feature hash
+        result = await db.scalars(insert(Prediction).returning(Prediction), rows)
+        created = result.all()
+        await db.commit()
+        await analytics_cache.invalidate_teams(
+            *{
+                prediction.team_id
+                for prediction in created
+                if prediction.team_id is not None
+            }
+        )
+
+        model_names = {model.model_id: model.name for model in models}
+        for prediction in created:
+            prediction.model_name = model_names[prediction.model_id]
+            prediction_cache.store(prediction)
+            predictions[prediction.feature_hash] = prediction
+            shadow_scorer.enqueue(
+                prediction.id,
+                prediction.prediction_type,
+                prediction.input_features,
+                prediction.model_id,
+            )
+
+    return [predictions[key] for key in keys]
+
+
+def _filter_predictions(
+    query,
+    team_id: Optional[int],
+    repository_id: Optional[int],
+    status: Optional[PredictionStatus],
+    prediction_type: Optional[PredictionType],
+):
     if team_id:
-        query = query.filter(Prediction.team_id == team_id)
+        query = query.where(Prediction.team_id == team_id)
 
     if repository_id:
-        query = query.filter(Prediction.repository_id == repository_id)
+        query = query.where(Prediction.repository_id == repository_id)
 
     if status:
-        query = query.filter(Prediction.status == status)
+        query = query.where(Prediction.status == status)
 
     if prediction_type:
-        query = query.filter(Prediction.prediction_type == prediction_type)
+        query = query.where(Prediction.prediction_type == prediction_type)
 
-    predictions = query.offset(skip).limit(limit).all()
+    return query
 
-    # Add model names
-    for prediction in predictions:
-        model = (
-            db.query(PredictionModel)
-            .filter(PredictionModel.id == prediction.model_id)
-            .first()
-        )
-        prediction.model_name = model.name if model else "Unknown"
+
+@router.get("/", response_model=List[PredictionResponse])
+async def list_predictions(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    team_id: Optional[int] = Query(None),
+    repository_id: Optional[int] = Query(None),
+    status: Optional[PredictionStatus] = Query(None),
+    prediction_type: Optional[PredictionType] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List predictions with optional filtering, paged by cursor.
+    """
+    query = _filter_predictions(
+        _select_predictions_with_model_name(),
+        team_id,
+        repository_id,
+        status,
+        prediction_type,
+    )
+
+    result = await db.execute(paginate(query, Prediction.id, skip, limit, cursor))
+    predictions = _attach_model_names(
+        page_rows(result.all(), limit, response, lambda row: row[0].id)
+    )
 
     return predictions
 
 
+@router.get("/export")
+async def export_predictions(
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    team_id: Optional[int] = Query(None),
+    repository_id: Optional[int] = Query(None),
+    status: Optional[PredictionStatus] = Query(None),
+    prediction_type: Optional[PredictionType] = Query(None),
+):
+    """
+    Stream every matching prediction as NDJSON or CSV, ordered by ID.
+    """
+    query = select(
+        Prediction.id,
+        Prediction.task_title,
+        Prediction.task_description,
+        Prediction.task_type,
+        Prediction.prediction_type,
+        Prediction.predicted_value,
+        Prediction.confidence_score,
+        Prediction.confidence_interval_lower,
+        Prediction.confidence_interval_upper,
+        Prediction.actual_value,
+        Prediction.validation_date,
+        Prediction.validation_source,
+        Prediction.status,
+        Prediction.input_features,
+        Prediction.secondary_predictions,
+        Prediction.model_id,
+        PredictionModel.name.label("model_name"),
+        PredictionModel.version.label("model_version"),
+        Prediction.team_id,
+        Prediction.repository_id,
+        Prediction.issue_id,
+        Prediction.created_at,
+    ).outerjoin(PredictionModel, Prediction.model_id == PredictionModel.id)
+    query = _filter_predictions(
+        query, team_id, repository_id, status, prediction_type
+    ).order_by(Prediction.id)
+
+    return export_response(query, format, "predictions")
+
+
+@router.get("/cache/stats")
+async def get_prediction_cache_stats():
+    """
+    Get hit and miss counters of the prediction deduplication cache.
+    """
+    return prediction_cache.stats()
+
+
 @router.get("/{prediction_id}", response_model=PredictionResponse)
-async def get_prediction(prediction_id: int, db: Session = Depends(get_db)):
+async def get_prediction(prediction_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a specific prediction by ID.
     """
-    prediction = db.query(Prediction).filter(Prediction.id == prediction_id).first()
-    if not prediction:
-        raise HTTPException(status_code=404, detail="Prediction not found")
-
-    # Add model name
-    model = (
-        db.query(PredictionModel)
-        .filter(PredictionModel.id == prediction.model_id)
-        .first()
+    result = await db.execute(
+        _select_predictions_with_model_name().where(Prediction.id == prediction_id)
     )
-    prediction.model_name = model.name if model else "Unknown"
+    predictions = _attach_model_names(result.all())
+    if not predictions:
+        raise HTTPException(status_code=404, detail="Prediction not found")
 
-    return prediction
+    return predictions[0]
 
 
 @router.post("/{prediction_id}/validate")
 async def validate_prediction(
     prediction_id: int,
     validation_request: ValidationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Validate a prediction with actual values.
+    The estimates shadow and canary models made for it are compared too.
     """
-    prediction = db.query(Prediction).filter(Prediction.id == prediction_id).first()
+    prediction = await db.get(Prediction, prediction_id)
     if not prediction:
         raise HTTPException(status_code=404, detail="Prediction not found")
 
@@ -281,7 +572,15 @@ async def validate_prediction(
     if validation_request.notes:
         prediction.notes = validation_request.notes
 
-    db.commit()
+    # Fold the result into the accuracy rollups and team aggregates in the
+    # same transaction
+    await record_validation(db, prediction)
+    await record_team_validation(db, prediction)
+
+    await db.commit()
+    await analytics_cache.invalidate_teams(prediction.team_id)
+    prediction_cache.discard(prediction.feature_hash)
+    feature_store.record_validation(prediction)
 
     return {
         "message": "Prediction validated successfully",
@@ -290,38 +589,52 @@ async def validate_prediction(
         "actual_value": prediction.actual_value,
         "accuracy_percentage": prediction.accuracy_percentage,
         "absolute_error": prediction.absolute_error,
+        "secondary_predictions": [
+            {
+                "model_id": entry["model_id"],
+                "model_name": entry["model_name"],
+                "predicted_value": entry["predicted_value"],
+                "absolute_error": abs(
+                    entry["predicted_value"] - prediction.actual_value
+                ),
+            }
+            for entry in prediction.secondary_predictions or []
+        ],
     }
 
 
 @router.get("/models/", response_model=List[ModelResponse])
 async def list_models(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     status: Optional[ModelStatus] = Query(None),
     prediction_type: Optional[PredictionType] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    List prediction models.
+    List prediction models, paged by cursor.
     """
-    query = db.query(PredictionModel)
+    query = select(PredictionModel)
 
     if status:
-        query = query.filter(PredictionModel.status == status)
+        query = query.where(PredictionModel.status == status)
 
     if prediction_type:
-        query = query.filter(PredictionModel.prediction_type == prediction_type)
+        query = query.where(PredictionModel.prediction_type == prediction_type)
 
-    models = query.offset(skip).limit(limit).all()
+    result = await db.execute(paginate(query, PredictionModel.id, skip, limit, cursor))
+    models = page_rows(result.scalars().all(), limit, response)
     return models
 
 
 @router.get("/models/{model_id}", response_model=ModelResponse)
-async def get_model(model_id: int, db: Session = Depends(get_db)):
+async def get_model(model_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a specific prediction model by ID.
     """
-    model = db.query(PredictionModel).filter(PredictionModel.id == model_id).first()
+    model = await db.get(PredictionModel, model_id)
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
 
@@ -329,25 +642,44 @@ async def get_model(model_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/models/{model_id}/deploy")
-async def deploy_model(model_id: int, db: Session = Depends(get_db)):
+async def deploy_model(model_id: int, db: AsyncSession = Depends(get_db)):
     """
     Deploy a model (set as active).
     """
-    model = db.query(PredictionModel).filter(PredictionModel.id == model_id).first()
+    model = await db.get(PredictionModel, model_id)
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    # Deactivate other models of the same prediction type
-    db.query(PredictionModel).filter(
-        PredictionModel.prediction_type == model.prediction_type,
-        PredictionModel.id != model_id,
-    ).update({"status": ModelStatus.DEPRECATED})
+    # Load the artifacts first so a broken model is never marked active
+    try:
+        loaded = await load_model(model)
+    except ModelLoadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Deactivate the active model of the same prediction type; shadow and
+    # canary models keep being evaluated
+    await db.execute(
+        update(PredictionModel)
+        .where(
+            PredictionModel.prediction_type == model.prediction_type,
+            PredictionModel.status == ModelStatus.ACTIVE,
+            PredictionModel.id != model_id,
+        )
+        .values(status=ModelStatus.DEPRECATED)
+    )
 
     # Activate this model
     model.status = ModelStatus.ACTIVE
+    model.traffic_percentage = None
     model.deployed_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
+
+    # Serve the new model from this process right away; other workers pick it
+    # up on their next registry refresh
+    model_registry.activate(loaded)
+    prediction_cache.clear()
+    await analytics_cache.invalidate_models()
 
     return {
         "message": f"Model {model.name} v{model.version} deployed successfully",
@@ -355,26 +687,191 @@ async def deploy_model(model_id: int, db: Session = Depends(get_db)):
     }
 
 
+async def _start_candidate(
+    db: AsyncSession,
+    model_id: int,
+    status: ModelStatus,
+    traffic_percentage: Optional[float] = None,
+) -> PredictionModel:
+    """
+    Make a model a shadow or canary candidate of its prediction type.
+    """
+    model = await db.get(PredictionModel, model_id)
+    if not model:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    if model.status == ModelStatus.ACTIVE:
+        raise HTTPException(
+            status_code=400, detail="The active model can't be a candidate"
+        )
+
+    if traffic_percentage is not None:
+        result = await db.execute(
+            select(func.sum(PredictionModel.traffic_percentage)).where(
+                PredictionModel.prediction_type == model.prediction_type,
+                PredictionModel.status == ModelStatus.CANARY,
+                PredictionModel.id != model_id,
+            )
+        )
+        if (result.scalar() or 0) + traffic_percentage > 100:
+            raise HTTPException(
+                status_code=400,
+                detail="Canary traffic of a prediction type can't exceed 100%",
+            )
+
+    # Load the artifacts first so a broken model never becomes a candidate
+    try:
+        await load_model(model)
+    except ModelLoadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    model.status = status
+    model.traffic_percentage = traffic_percentage
+    model.deployed_at = datetime.utcnow()
+    await db.commit()
+    await analytics_cache.invalidate_models()
+
+    # Other workers pick the change up on their next registry refresh
+    await model_registry.refresh()
+    return model
+
+
+@router.post("/models/{model_id}/shadow", response_model=ModelResponse)
+async def shadow_model(model_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Score every prediction of the model's type with it in the background,
+    without serving its estimates.
+    """
+    return await _start_candidate(db, model_id, ModelStatus.SHADOW)
+
+
+@router.post("/models/{model_id}/canary", response_model=ModelResponse)
+async def canary_model(
+    model_id: int, canary_request: CanaryRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Serve a percentage of the model type's predictions with the model; the
+    active model scores those requests in the background.
+    """
+    return await _start_candidate(
+        db, model_id, ModelStatus.CANARY, canary_request.traffic_percentage
+    )
+
+
+@router.post("/models/{model_id}/retire", response_model=ModelResponse)
+async def retire_model(model_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Stop evaluating a shadow or canary model.
+    """
+    model = await db.get(PredictionModel, model_id)
+    if not model:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    if model.status not in (ModelStatus.SHADOW, ModelStatus.CANARY):
+        raise HTTPException(
+            status_code=400, detail="Only shadow and canary models can be retired"
+        )
+
+    model.status = ModelStatus.DEPRECATED
+    model.traffic_percentage = None
+    await db.commit()
+    await analytics_cache.invalidate_models()
+    await model_registry.refresh()
+    return model
+
+
+@router.get("/models/{model_id}/evaluation")
+async def get_model_evaluation(
+    model_id: int,
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Compare a model with the model served alongside it on validated live
+    predictions: its estimates as a shadow or canary candidate against those
+    of the served model, or, for the predictions it served as a canary,
+    against the active model's background estimates.
+    """
+    model = await db.get(PredictionModel, model_id)
+    if not model:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    start_date = datetime.utcnow() - timedelta(days=days)
+    result = await db.stream(
+        select(
+            Prediction.model_id,
+            Prediction.predicted_value,
+            Prediction.actual_value,
+            Prediction.secondary_predictions,
+        )
+        .where(
+            Prediction.status == PredictionStatus.VALIDATED,
+            Prediction.validation_date >= start_date,
+            Prediction.prediction_type == model.prediction_type,
+            Prediction.secondary_predictions.isnot(None),
+        )
+        .execution_options(yield_per=1000)
+    )
+
+    compared = wins = 0
+    error_total = baseline_error_total = 0.0
+    async for served_model_id, predicted_value, actual_value, secondary in result:
+        estimates = {entry["model_id"]: entry for entry in secondary}
+        if served_model_id == model_id:
+            baseline = next(
+                (
+                    entry
+                    for entry in secondary
+                    if entry.get("model_status") == ModelStatus.ACTIVE.value
+                ),
+                None,
+            )
+            if baseline is None:
+                continue
+            value, baseline_value = predicted_value, baseline["predicted_value"]
+        elif model_id in estimates:
+            value, baseline_value = (
+                estimates[model_id]["predicted_value"],
+                predicted_value,
+            )
+        else:
+            continue
+
+        error = abs(value - actual_value)
+        baseline_error = abs(baseline_value - actual_value)
+        compared += 1
+        wins += error < baseline_error
+        error_total += error
+        baseline_error_total += baseline_error
+
+    return {
+        "model_id": model_id,
+        "status": model.status,
+        "traffic_percentage": model.traffic_percentage,
+        "period_days": days,
+        "compared_predictions": compared,
+        "mae": round(error_total / compared, 4) if compared else None,
+        "baseline_mae": round(baseline_error_total / compared, 4) if compared else None,
+        "win_rate": round(wins / compared, 4) if compared else None,
+    }
+
+
 @router.post("/features/", response_model=dict)
 async def create_task_feature(
-    feature_request: TaskFeatureRequest, db: Session = Depends(get_db)
+    feature_request: TaskFeatureRequest, db: AsyncSession = Depends(get_db)
 ):
     """
     Create a task feature record for ML training data.
     """
     # Verify team exists if provided
     if feature_request.team_id:
-        team = db.query(Team).filter(Team.id == feature_request.team_id).first()
+        team = await db.get(Team, feature_request.team_id)
         if not team:
             raise HTTPException(status_code=404, detail="Team not found")
 
     # Verify repository exists if provided
     if feature_request.repository_id:
-        repository = (
-            db.query(Repository)
-            .filter(Repository.id == feature_request.repository_id)
-            .first()
-        )
+        repository = await db.get(Repository, feature_request.repository_id)
         if not repository:
             raise HTTPException(status_code=404, detail="Repository not found")
 
@@ -386,6 +883,14 @@ async def create_task_feature(
         else 0
     )
 
+    # Historical and team features as they stood before this task completed
+    historical_features = feature_store.features(
+        feature_request.team_id,
+        feature_request.repository_id,
+        feature_request.task_type,
+        _task_text(feature_request.task_title, feature_request.task_description),
+    )
+
     # Create task feature record
     task_feature = TaskFeature(
         task_source=feature_request.task_source,
@@ -399,11 +904,20 @@ async def create_task_feature(
         repository_id=feature_request.repository_id,
         actual_hours=feature_request.actual_hours,
         actual_story_points=feature_request.actual_story_points,
+        **historical_features,
     )
 
     db.add(task_feature)
-    db.commit()
-    db.refresh(task_feature)
+    await db.commit()
+    await db.refresh(task_feature)
+    feature_store.record_actual(
+        task_feature.team_id,
+        task_feature.repository_id,
+        task_feature.task_type,
+        hours=task_feature.actual_hours,
+        story_points=task_feature.actual_story_points,
+    )
+    similarity_index.notify()
 
     return {
         "message": "Task feature created successfully",
@@ -417,51 +931,68 @@ async def get_accuracy_analytics(
     team_id: Optional[int] = Query(None),
     prediction_type: Optional[PredictionType] = Query(None),
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get prediction accuracy analytics.
+    Reads the daily EstimationAccuracy rollups, so the window is resolved to
+    whole days of validation dates: the day the window starts in is left out,
+    and today is included. Every validated prediction counts towards the
+    averages, including exact predictions (zero error) and complete misses
+    (zero accuracy).
     """
     from datetime import datetime, timedelta
 
     start_date = datetime.utcnow() - timedelta(days=days)
 
-    # Build query for validated predictions
-    query = db.query(Prediction).filter(
-        Prediction.status == PredictionStatus.VALIDATED,
-        Prediction.validation_date >= start_date,
-    )
+    # Combine the rollups of the days inside the window, weighting means by count
+    validated = EstimationAccuracy.validated_predictions
+    query = select(
+        func.sum(validated).label("validated_count"),
+        func.sum(EstimationAccuracy.average_accuracy_percentage * validated).label(
+            "accuracy_total"
+        ),
+        func.sum(EstimationAccuracy.mae * validated).label("error_total"),
+        func.sum(EstimationAccuracy.predictions_within_10_percent).label(
+            "within_10_percent"
+        ),
+        func.sum(EstimationAccuracy.predictions_within_25_percent).label(
+            "within_25_percent"
+        ),
+        func.sum(EstimationAccuracy.predictions_within_50_percent).label(
+            "within_50_percent"
+        ),
+    ).where(EstimationAccuracy.period_start >= start_date)
 
     if team_id:
-        query = query.filter(Prediction.team_id == team_id)
+        query = query.where(EstimationAccuracy.team_id == team_id)
 
     if prediction_type:
-        query = query.filter(Prediction.prediction_type == prediction_type)
+        query = query.where(EstimationAccuracy.prediction_type == prediction_type)
 
-    predictions = query.all()
+    result = await db.execute(query)
+    totals = result.one()
+    validated_count = totals.validated_count or 0
 
-    if not predictions:
+    if not validated_count:
         return {
             "message": "No validated predictions found for the specified criteria",
             "total_predictions": 0,
         }
 
     # Calculate analytics
-    accuracies = [p.accuracy_percentage for p in predictions if p.accuracy_percentage]
-    errors = [p.absolute_error for p in predictions if p.absolute_error]
-
-    avg_accuracy = sum(accuracies) / len(accuracies) if accuracies else 0
-    avg_error = sum(errors) / len(errors) if errors else 0
+    avg_accuracy = (totals.accuracy_total or 0) / validated_count
+    avg_error = (totals.error_total or 0) / validated_count
 
     # Count predictions within accuracy thresholds
-    within_10_percent = len([a for a in accuracies if a >= 90])
-    within_25_percent = len([a for a in accuracies if a >= 75])
-    within_50_percent = len([a for a in accuracies if a >= 50])
+    within_10_percent = totals.within_10_percent
+    within_25_percent = totals.within_25_percent
+    within_50_percent = totals.within_50_percent
 
     return {
         "period_days": days,
-        "total_predictions": len(predictions),
-        "validated_predictions": len(predictions),
+        "total_predictions": validated_count,
+        "validated_predictions": validated_count,
         "average_accuracy_percentage": round(avg_accuracy, 2),
         "average_absolute_error": round(avg_error, 2),
         "predictions_within_10_percent": within_10_percent,
@@ -469,13 +1000,13 @@ async def get_accuracy_analytics(
         "predictions_within_50_percent": within_50_percent,
         "accuracy_distribution": {
             "within_10_percent_rate": round(
-                (within_10_percent / len(predictions)) * 100, 2
+                (within_10_percent / validated_count) * 100, 2
             ),
             "within_25_percent_rate": round(
-                (within_25_percent / len(predictions)) * 100, 2
+                (within_25_percent / validated_count) * 100, 2
             ),
             "within_50_percent_rate": round(
-                (within_50_percent / len(predictions)) * 100, 2
+                (within_50_percent / validated_count) * 100, 2
             ),
         },
     }
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
+from app.api.pagination import page_rows, paginate
 from app.core.database import get_db
 from app.models.team import (
     Team,
@@ -13,6 +15,12 @@ from app.models.team import (
     SeniorityLevel,
     ExperienceLevel,
 )
+from app.services.analytics_cache import analytics_cache
+from app.services.feature_store import feature_store
+from app.services.team_aggregates import (
+    record_sprint_completion,
+    refresh_team_members,
+)
 
 router = APIRouter()
 
@@ -104,32 +112,107 @@ class TechnologyExperienceResponse(BaseModel):
         from_attributes = True
 
 
+class SprintCompletion(BaseModel):
+    completed_story_points: int
+    actual_hours: Optional[float] = None
+
+
+class SprintResponse(BaseModel):
+    id: int
+    name: str
+    start_date: datetime
+    end_date: datetime
+    is_active: bool
+    is_completed: bool
+    planned_story_points: Optional[int]
+    completed_story_points: Optional[int]
+    planned_hours: Optional[float]
+    actual_hours: Optional[float]
+    velocity: Optional[float]
+
+    class Config:
+        from_attributes = True
+
+
+class SkillMatchResponse(BaseModel):
+    member_id: int
+    member_name: str
+    github_username: Optional[str]
+    seniority_level: SeniorityLevel
+    team_id: int
+    team_name: str
+    experience_level: ExperienceLevel
+    years_of_experience: Optional[float]
+    proficiency_score: float
+    is_primary_skill: bool
+
+
+class TeamSkillResponse(BaseModel):
+    team_id: int
+    team_name: str
+    member_count: int
+    max_proficiency: float
+    average_proficiency: float
+
+
+class SkillSearchResponse(BaseModel):
+    technology_name: str
+    min_proficiency: float
+    teams: List[TeamSkillResponse]
+    members: List[SkillMatchResponse]
+
+
+async def _load_team(db: AsyncSession, team_id: int) -> Optional[Team]:
+    """
+    Load a team, refreshing stored aggregates that an UPDATE may have changed.
+    """
+    result = await db.execute(
+        select(Team).where(Team.id == team_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _get_team_member(
+    db: AsyncSession, team_id: int, member_id: int
+) -> Optional[TeamMember]:
+    result = await db.execute(
+        select(TeamMember).where(
+            TeamMember.id == member_id, TeamMember.team_id == team_id
+        )
+    )
+    return result.scalar_one_or_none()
+
+
 @router.get("/", response_model=List[TeamResponse])
 async def list_teams(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    List all teams.
+    List all teams, paged by cursor.
     """
-    query = db.query(Team)
+    query = select(Team)
 
     if active_only:
-        query = query.filter(Team.is_active == True)
+        query = query.where(Team.is_active == True)
 
-    teams = query.offset(skip).limit(limit).all()
+    result = await db.execute(paginate(query, Team.id, skip, limit, cursor))
+    teams = page_rows(result.scalars().all(), limit, response)
     return teams
 
 
 @router.post("/", response_model=TeamResponse)
-async def create_team(team_data: TeamCreate, db: Session = Depends(get_db)):
+async def create_team(team_data: TeamCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new team.
     """
     # Check if team name already exists
-    existing_team = db.query(Team).filter(Team.name == team_data.name).first()
+    result = await db.execute(select(Team).where(Team.name == team_data.name))
+    existing_team = result.scalars().first()
     if existing_team:
         raise HTTPException(status_code=400, detail="Team name already exists")
 
@@ -139,18 +222,85 @@ async def create_team(team_data: TeamCreate, db: Session = Depends(get_db)):
     )
 
     db.add(team)
-    db.commit()
-    db.refresh(team)
+    await db.commit()
+    await analytics_cache.invalidate_teams(team.id)
 
-    return team
+    return await _load_team(db, team.id)
+
+
+@router.get("/skills", response_model=SkillSearchResponse)
+async def search_skills(
+    technology: str = Query(..., min_length=1),
+    min_proficiency: float = Query(0, ge=0, le=100),
+    active_only: bool = Query(True),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Find the members with a technology at or above a proficiency score, best
+    first, and the teams they belong to.
+    """
+    proficiency = TechnologyExperience.proficiency_score
+    filters = [
+        TechnologyExperience.technology_name == technology,
+        proficiency >= min_proficiency,
+    ]
+    if active_only:
+        filters += [TeamMember.is_active == True, Team.is_active == True]
+
+    def matches(*columns):
+        return (
+            select(*columns)
+            .select_from(TechnologyExperience)
+            .join(TeamMember)
+            .join(Team)
+            .where(*filters)
+        )
+
+    result = await db.execute(
+        matches(
+            Team.id.label("team_id"),
+            Team.name.label("team_name"),
+            func.count(func.distinct(TeamMember.id)).label("member_count"),
+            func.max(proficiency).label("max_proficiency"),
+            func.avg(proficiency).label("average_proficiency"),
+        )
+        .group_by(Team.id, Team.name)
+        .order_by(func.max(proficiency).desc(), Team.id)
+    )
+    teams = result.mappings().all()
+
+    result = await db.execute(
+        matches(
+            TeamMember.id.label("member_id"),
+            TeamMember.name.label("member_name"),
+            TeamMember.github_username,
+            TeamMember.seniority_level,
+            Team.id.label("team_id"),
+            Team.name.label("team_name"),
+            TechnologyExperience.experience_level,
+            TechnologyExperience.years_of_experience,
+            proficiency,
+            TechnologyExperience.is_primary_skill,
+        )
+        .order_by(proficiency.desc(), TechnologyExperience.id)
+        .limit(limit)
+    )
+
+    return {
+        "technology_name": technology,
+        "min_proficiency": min_proficiency,
+        "teams": teams,
+        "members": result.mappings().all(),
+    }
 
 
 @router.get("/{team_id}", response_model=TeamResponse)
-async def get_team(team_id: int, db: Session = Depends(get_db)):
+async def get_team(team_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a specific team by ID.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await _load_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
@@ -159,23 +309,22 @@ async def get_team(team_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{team_id}", response_model=TeamResponse)
 async def update_team(
-    team_id: int, team_update: TeamUpdate, db: Session = Depends(get_db)
+    team_id: int, team_update: TeamUpdate, db: AsyncSession = Depends(get_db)
 ):
     """
     Update a team.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await _load_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
     # Update fields if provided
     if team_update.name is not None:
         # Check if new name already exists (excluding current team)
-        existing_team = (
-            db.query(Team)
-            .filter(Team.name == team_update.name, Team.id != team_id)
-            .first()
+        result = await db.execute(
+            select(Team).where(Team.name == team_update.name, Team.id != team_id)
         )
+        existing_team = result.scalars().first()
         if existing_team:
             raise HTTPException(status_code=400, detail="Team name already exists")
         team.name = team_update.name
@@ -186,23 +335,24 @@ async def update_team(
     if team_update.is_active is not None:
         team.is_active = team_update.is_active
 
-    db.commit()
-    db.refresh(team)
+    await db.commit()
+    await analytics_cache.invalidate_teams(team_id)
 
-    return team
+    return await _load_team(db, team_id)
 
 
 @router.delete("/{team_id}")
-async def delete_team(team_id: int, db: Session = Depends(get_db)):
+async def delete_team(team_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a team (soft delete by setting is_active to False).
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await db.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
     team.is_active = False
-    db.commit()
+    await db.commit()
+    await analytics_cache.invalidate_teams(team_id)
 
     return {"message": f"Team {team.name} has been deactivated"}
 
@@ -211,46 +361,46 @@ async def delete_team(team_id: int, db: Session = Depends(get_db)):
 async def list_team_members(
     team_id: int,
     active_only: bool = Query(True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     List all members of a specific team.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await db.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    query = db.query(TeamMember).filter(TeamMember.team_id == team_id)
+    query = select(TeamMember).where(TeamMember.team_id == team_id)
 
     if active_only:
-        query = query.filter(TeamMember.is_active == True)
+        query = query.where(TeamMember.is_active == True)
 
-    members = query.all()
+    result = await db.execute(query)
+    members = result.scalars().all()
     return members
 
 
 @router.post("/{team_id}/members", response_model=TeamMemberResponse)
 async def add_team_member(
-    team_id: int, member_data: TeamMemberCreate, db: Session = Depends(get_db)
+    team_id: int, member_data: TeamMemberCreate, db: AsyncSession = Depends(get_db)
 ):
     """
     Add a new member to a team.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await db.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
     # Check if email already exists in the team
     if member_data.email:
-        existing_member = (
-            db.query(TeamMember)
-            .filter(
+        result = await db.execute(
+            select(TeamMember).where(
                 TeamMember.team_id == team_id,
                 TeamMember.email == member_data.email,
                 TeamMember.is_active == True,
             )
-            .first()
         )
+        existing_member = result.scalars().first()
         if existing_member:
             raise HTTPException(
                 status_code=400,
@@ -268,22 +418,23 @@ async def add_team_member(
     )
 
     db.add(member)
-    db.commit()
-    db.refresh(member)
+    await refresh_team_members(db, team_id)
+    await db.commit()
+    await db.refresh(member)
+    await feature_store.refresh_team(db, team_id)
+    await analytics_cache.invalidate_teams(team_id)
 
     return member
 
 
 @router.get("/{team_id}/members/{member_id}", response_model=TeamMemberResponse)
-async def get_team_member(team_id: int, member_id: int, db: Session = Depends(get_db)):
+async def get_team_member(
+    team_id: int, member_id: int, db: AsyncSession = Depends(get_db)
+):
     """
     Get a specific team member.
     """
-    member = (
-        db.query(TeamMember)
-        .filter(TeamMember.id == member_id, TeamMember.team_id == team_id)
-        .first()
-    )
+    member = await _get_team_member(db, team_id, member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Team member not found")
 
@@ -295,16 +446,12 @@ async def update_team_member(
     team_id: int,
     member_id: int,
     member_update: TeamMemberUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Update a team member.
     """
-    member = (
-        db.query(TeamMember)
-        .filter(TeamMember.id == member_id, TeamMember.team_id == team_id)
-        .first()
-    )
+    member = await _get_team_member(db, team_id, member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Team member not found")
 
@@ -313,30 +460,32 @@ async def update_team_member(
     for field, value in update_data.items():
         setattr(member, field, value)
 
-    db.commit()
-    db.refresh(member)
+    await refresh_team_members(db, team_id)
+    await db.commit()
+    await db.refresh(member)
+    await feature_store.refresh_team(db, team_id)
+    await analytics_cache.invalidate_teams(team_id)
 
     return member
 
 
 @router.delete("/{team_id}/members/{member_id}")
 async def remove_team_member(
-    team_id: int, member_id: int, db: Session = Depends(get_db)
+    team_id: int, member_id: int, db: AsyncSession = Depends(get_db)
 ):
     """
     Remove a member from a team (soft delete).
     """
-    member = (
-        db.query(TeamMember)
-        .filter(TeamMember.id == member_id, TeamMember.team_id == team_id)
-        .first()
-    )
+    member = await _get_team_member(db, team_id, member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Team member not found")
 
     member.is_active = False
     member.left_team_at = datetime.utcnow()
-    db.commit()
+    await refresh_team_members(db, team_id)
+    await db.commit()
+    await feature_store.refresh_team(db, team_id)
+    await analytics_cache.invalidate_teams(team_id)
 
     return {"message": f"Member {member.name} has been removed from the team"}
 
@@ -346,24 +495,21 @@ async def remove_team_member(
     response_model=List[TechnologyExperienceResponse],
 )
 async def list_member_technologies(
-    team_id: int, member_id: int, db: Session = Depends(get_db)
+    team_id: int, member_id: int, db: AsyncSession = Depends(get_db)
 ):
     """
     List technology experiences for a team member.
     """
-    member = (
-        db.query(TeamMember)
-        .filter(TeamMember.id == member_id, TeamMember.team_id == team_id)
-        .first()
-    )
+    member = await _get_team_member(db, team_id, member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Team member not found")
 
-    technologies = (
-        db.query(TechnologyExperience)
-        .filter(TechnologyExperience.team_member_id == member_id)
-        .all()
+    result = await db.execute(
+        select(TechnologyExperience).where(
+            TechnologyExperience.team_member_id == member_id
+        )
     )
+    technologies = result.scalars().all()
 
     return technologies
 
@@ -376,28 +522,23 @@ async def add_member_technology(
     team_id: int,
     member_id: int,
     tech_data: TechnologyExperienceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Add technology experience for a team member.
     """
-    member = (
-        db.query(TeamMember)
-        .filter(TeamMember.id == member_id, TeamMember.team_id == team_id)
-        .first()
-    )
+    member = await _get_team_member(db, team_id, member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Team member not found")
 
     # Check if technology already exists for this member
-    existing_tech = (
-        db.query(TechnologyExperience)
-        .filter(
+    result = await db.execute(
+        select(TechnologyExperience).where(
             TechnologyExperience.team_member_id == member_id,
             TechnologyExperience.technology_name == tech_data.technology_name,
         )
-        .first()
     )
+    existing_tech = result.scalars().first()
     if existing_tech:
         raise HTTPException(
             status_code=400,
@@ -416,66 +557,96 @@ async def add_member_technology(
     )
 
     db.add(technology)
-    db.commit()
-    db.refresh(technology)
+    await db.commit()
+    await db.refresh(technology)
 
     return technology
 
 
+@router.post("/{team_id}/sprints/{sprint_id}/complete", response_model=SprintResponse)
+async def complete_sprint(
+    team_id: int,
+    sprint_id: int,
+    completion: SprintCompletion,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Complete a sprint, recording the story points delivered as its velocity.
+    The team's average velocity is updated in the same transaction.
+    """
+    result = await db.execute(
+        select(Sprint).where(Sprint.id == sprint_id, Sprint.team_id == team_id)
+    )
+    sprint = result.scalar_one_or_none()
+    if not sprint:
+        raise HTTPException(status_code=404, detail="Sprint not found")
+    if sprint.is_completed:
+        raise HTTPException(status_code=409, detail="Sprint is already completed")
+
+    sprint.is_active = False
+    sprint.is_completed = True
+    sprint.completed_story_points = completion.completed_story_points
+    sprint.velocity = float(completion.completed_story_points)
+    if completion.actual_hours is not None:
+        sprint.actual_hours = completion.actual_hours
+
+    await record_sprint_completion(db, sprint)
+    await db.commit()
+    await feature_store.record_sprint_completion(db, sprint)
+    await analytics_cache.invalidate_teams(team_id)
+
+    return sprint
+
+
 @router.get("/{team_id}/analytics")
-async def get_team_analytics(team_id: int, db: Session = Depends(get_db)):
+async def get_team_analytics(team_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get analytics for a specific team.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await _load_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    # Get active members
-    active_members = (
-        db.query(TeamMember)
-        .filter(TeamMember.team_id == team_id, TeamMember.is_active == True)
-        .all()
-    )
-
     # Calculate seniority distribution
     seniority_dist = team.seniority_distribution
 
-    # Calculate average experience
-    avg_experience = None
-    if active_members:
-        experiences = [
-            m.years_of_experience for m in active_members if m.years_of_experience
-        ]
-        if experiences:
-            avg_experience = sum(experiences) / len(experiences)
-
-    # Get technology overview
-    all_techs = (
-        db.query(TechnologyExperience)
+    # Average experience of the active members who have one recorded
+    avg_experience = await db.scalar(
+        select(func.avg(TeamMember.years_of_experience)).where(
+            TeamMember.team_id == team_id,
+            TeamMember.is_active == True,
+            TeamMember.years_of_experience != 0,
+        )
+    )
+
+    # Technology overview, one row per technology in order of first appearance
+    result = await db.execute(
+        select(
+            TechnologyExperience.technology_name,
+            func.count(TechnologyExperience.id),
+            func.avg(TechnologyExperience.proficiency_score),
+            *(
+                func.count(case((TechnologyExperience.experience_level == level, 1)))
+                for level in ExperienceLevel
+            ),
+        )
         .join(TeamMember)
-        .filter(TeamMember.team_id == team_id, TeamMember.is_active == True)
-        .all()
+        .where(TeamMember.team_id == team_id, TeamMember.is_active == True)
+        .group_by(TechnologyExperience.technology_name)
+        .order_by(func.min(TechnologyExperience.id))
     )
 
     tech_summary = {}
-    for tech in all_techs:
-        if tech.technology_name not in tech_summary:
-            tech_summary[tech.technology_name] = {
-                "count": 0,
-                "avg_proficiency": 0,
-                "experience_levels": [],
-            }
-        tech_summary[tech.technology_name]["count"] += 1
-        tech_summary[tech.technology_name]["experience_levels"].append(
-            tech.experience_level.value
-        )
-        if tech.proficiency_score:
-            current_avg = tech_summary[tech.technology_name]["avg_proficiency"]
-            count = tech_summary[tech.technology_name]["count"]
-            tech_summary[tech.technology_name]["avg_proficiency"] = (
-                current_avg * (count - 1) + tech.proficiency_score
-            ) / count
+    for technology_name, count, avg_proficiency, *level_counts in result.all():
+        tech_summary[technology_name] = {
+            "count": count,
+            "avg_proficiency": avg_proficiency or 0,
+            "experience_levels": [
+                level.value
+                for level, level_count in zip(ExperienceLevel, level_counts)
+                for _ in range(level_count)
+            ],
+        }
 
     return {
         "team_name": team.name,
@@ -17,11 +17,28 @@ class Settings(BaseSettings):
     # Database settings
     database_url: str = "sqlite:///./app.db"
     database_echo: bool = False
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_recycle_seconds: int = 1800
+    database_pool_timeout_seconds: int = 30
+    database_pool_pre_ping: bool = True
+    database_bulk_batch_size: int = 1000
 
     # GitHub API settings
     github_token: Optional[str] = None
     github_api_url: str = "https://api.github.com"
     github_webhook_secret: Optional[str] = None
+    github_per_page: int = 100
+    github_sync_concurrency: int = 4
+    github_request_timeout_seconds: float = 30.0
+    github_rate_limit_min_remaining: int = 10
+    github_rate_limit_max_wait_seconds: int = 900
+    github_max_retries: int = 3
+    github_webhook_batch_size: int = 100
+    github_webhook_batch_wait_seconds: float = 1.0
+    sync_worker_concurrency: int = 2
+    sync_job_heartbeat_seconds: int = 30
+    sync_job_lease_seconds: int = 120
 
     # Security settings
     secret_key: str = "your-secret-key-change-this-in-production"
@@ -34,7 +51,25 @@ class Settings(BaseSettings):
     # ML Model settings
     model_version: str = "1.0"
     model_retrain_interval_hours: int = 24
+    model_training_enabled: bool = True
+    model_training_chunk_size: int = 5000
+    model_training_min_samples: int = 50
+    model_training_cv_folds: int = 5
+    model_training_workers: int = 2
     prediction_confidence_threshold: float = 0.7
+    model_registry_refresh_seconds: int = 30
+    prediction_cache_size: int = 10000
+    prediction_cache_ttl_seconds: int = 3600
+    shadow_scoring_batch_size: int = 100
+    shadow_scoring_batch_wait_seconds: float = 0.5
+    feature_store_refresh_seconds: int = 300
+    similarity_index_refresh_seconds: int = 60
+    similarity_index_probes: int = 8
+    similarity_top_k: int = 10
+
+    # Analytics response cache
+    analytics_cache_size: int = 1000
+    analytics_cache_ttl_seconds: int = 60
 
     # API rate limiting
     rate_limit_requests: int = 100
@@ -48,6 +83,8 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
+        # Allow the model_* settings without pydantic's namespace warnings
+        protected_namespaces = ("settings_",)
 
 
 # Create settings instance
@@ -1,22 +1,102 @@
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 import os
-from typing import Generator
+from typing import AsyncGenerator
 
 from app.core.config import settings
 
-# Create SQLAlchemy engine
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(
-        settings.database_url,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=settings.database_echo,
+# Async drivers used for the request path, keyed by the sync URL's backend
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Translate a configured database URL into its async-driver equivalent.
+    URLs that already name a driver (e.g. ``sqlite+aiosqlite://``) are kept as-is.
+    """
+    url = make_url(database_url)
+    if "+" not in url.drivername and url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.drivername}+{ASYNC_DRIVERS[url.drivername]}")
+    return url.render_as_string(hide_password=False)
+
+
+def get_sync_database_url(database_url: str) -> str:
+    """
+    Translate a configured database URL into a sync-driver URL for scripts.
+    """
+    url = make_url(database_url)
+    return url.set(drivername=url.get_backend_name()).render_as_string(
+        hide_password=False
     )
-else:
-    engine = create_engine(settings.database_url, echo=settings.database_echo)
+
+
+def _is_memory_sqlite(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _pool_options(database_url: str, poolclass=None) -> dict:
+    """Build engine pool arguments from settings for the given URL."""
+    if _is_memory_sqlite(database_url):
+        # An in-memory SQLite database only exists on a single connection
+        return {"poolclass": StaticPool}
+
+    options = {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+    if poolclass is not None:
+        options["poolclass"] = poolclass
+    return options
+
+
+def _connect_args(database_url: str) -> dict:
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {
+            "check_same_thread": False,
+            "timeout": settings.database_pool_timeout_seconds,
+        }
+    return {}
+
+
+ASYNC_DATABASE_URL = get_async_database_url(settings.database_url)
+SYNC_DATABASE_URL = get_sync_database_url(settings.database_url)
+
+# Create async SQLAlchemy engine used by the API request path.
+# SQLite file databases default to NullPool under aiosqlite, so the queue pool is
+# requested explicitly to keep connections warm between requests.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_connect_args(ASYNC_DATABASE_URL),
+    echo=settings.database_echo,
+    **_pool_options(ASYNC_DATABASE_URL, poolclass=AsyncAdaptedQueuePool),
+)
+
+# Create AsyncSessionLocal class
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Create sync SQLAlchemy engine for scripts, seeding and migrations
+engine = create_engine(
+    SYNC_DATABASE_URL,
+    connect_args=_connect_args(SYNC_DATABASE_URL),
+    echo=settings.database_echo,
+    **_pool_options(SYNC_DATABASE_URL),
+)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -28,16 +108,13 @@ Base = declarative_base()
 metadata = MetaData()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency function to get database session.
-    Yields a database session and ensures it's closed after use.
+    Dependency function to get an async database session.
+    Yields a session checked out from the pool and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 async def init_db() -> None:
@@ -49,21 +126,23 @@ async def init_db() -> None:
     from app.models import github, team, prediction
 
     # Create all tables
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     print("Database initialized successfully")
 
 
 def get_database_session() -> Session:
     """
-    Get a database session for non-dependency injection use cases.
+    Get a sync database session for non-dependency injection use cases.
     Remember to close the session when done.
     """
     return SessionLocal()
 
 
-def close_db_connection():
+async def close_db_connection():
     """
-    Close database connection.
+    Close database connections.
     Useful for cleanup in tests or shutdown procedures.
     """
+    await async_engine.dispose()
     engine.dispose()
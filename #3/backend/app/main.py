@@ -5,8 +5,16 @@ import uvicorn
 from contextlib import asynccontextmanager
 
 from app.api import github, teams, predictions, analytics
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, close_db_connection
+from app.services.feature_store import feature_store
+from app.services.github_webhooks import github_webhook_consumer
+from app.services.inference import model_registry
+from app.services.shadow_scoring import shadow_scorer
+from app.services.similarity_index import similarity_index
+from app.services.sync_jobs import sync_job_queue
+from app.services.training import training_scheduler
 
 
 @asynccontextmanager
@@ -14,9 +22,24 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting up...")
     await init_db()
+    await model_registry.start()
+    await feature_store.start()
+    await similarity_index.start()
+    await shadow_scorer.start()
+    await sync_job_queue.start()
+    await github_webhook_consumer.start()
+    await training_scheduler.start()
     yield
     # Shutdown
     print("Shutting down...")
+    await training_scheduler.stop()
+    await github_webhook_consumer.stop()
+    await sync_job_queue.stop()
+    await shadow_scorer.stop()
+    await similarity_index.stop()
+    await feature_store.stop()
+    await model_registry.stop()
+    await close_db_connection()
 
 
 app = FastAPI(
@@ -33,6 +56,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read the cursor of the next page
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -14,6 +14,9 @@ from app.models.github import (
     PullRequest,
     Commit,
     GitHubUser,
+    GitHubETag,
+    GitHubSyncState,
+    SyncJob,
 )
 
 from app.models.team import (
@@ -28,6 +31,7 @@ from app.models.prediction import (
     PredictionModel,
     EstimationAccuracy,
     TaskFeature,
+    TrainingClaim,
 )
 
 __all__ = [
@@ -37,6 +41,9 @@ __all__ = [
     "PullRequest",
     "Commit",
     "GitHubUser",
+    "GitHubETag",
+    "GitHubSyncState",
+    "SyncJob",
     # Team models
     "Team",
     "TeamMember",
@@ -47,4 +54,5 @@ __all__ = [
     "PredictionModel",
     "EstimationAccuracy",
     "TaskFeature",
+    "TrainingClaim",
 ]
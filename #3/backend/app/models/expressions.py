@@ -0,0 +1,76 @@
+"""
+Dialect-aware SQL expressions shared by model hybrid properties.
+
+Date arithmetic differs between SQLite and PostgreSQL, so the elapsed-time
+helpers below compile to the right functions for each backend.
+"""
+
+from sqlalchemy import Float, Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class seconds_between(FunctionElement):
+    """Elapsed seconds from the first datetime expression to the second."""
+
+    type = Float()
+    inherit_cache = True
+    name = "seconds_between"
+
+
+class whole_days_between(FunctionElement):
+    """Whole days from the first datetime to the second, floored like timedelta.days."""
+
+    type = Integer()
+    inherit_cache = True
+    name = "whole_days_between"
+
+
+def _sqlite_seconds(compiler, start, end, **kw) -> str:
+    start_sql = compiler.process(start, **kw)
+    end_sql = compiler.process(end, **kw)
+    # SQLite's date functions round to milliseconds, so whole seconds come from
+    # the 19-character "YYYY-MM-DD HH:MM:SS" prefix and the stored microseconds
+    # are added back separately. This also avoids julianday() float drift.
+    return (
+        f"((strftime('%s', substr({end_sql}, 1, 19)) - "
+        f"strftime('%s', substr({start_sql}, 1, 19))) + "
+        f"(CAST(substr({end_sql}, 20) AS REAL) - "
+        f"CAST(substr({start_sql}, 20) AS REAL)))"
+    )
+
+
+@compiles(seconds_between)
+def _compile_seconds_between(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "EXTRACT(EPOCH FROM (%s - %s))" % (
+        compiler.process(end, **kw),
+        compiler.process(start, **kw),
+    )
+
+
+@compiles(seconds_between, "sqlite")
+def _compile_seconds_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return _sqlite_seconds(compiler, start, end, **kw)
+
+
+@compiles(whole_days_between)
+def _compile_whole_days_between(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "CAST(FLOOR(EXTRACT(EPOCH FROM (%s - %s)) / 86400) AS INTEGER)" % (
+        compiler.process(end, **kw),
+        compiler.process(start, **kw),
+    )
+
+
+@compiles(whole_days_between, "sqlite")
+def _compile_whole_days_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    days = "(%s / 86400.0)" % _sqlite_seconds(compiler, start, end, **kw)
+    # SQLite has no portable FLOOR(); CAST truncates toward zero, so step
+    # negative fractional values down by one.
+    return (
+        f"(CAST({days} AS INTEGER) - "
+        f"(CASE WHEN {days} < CAST({days} AS INTEGER) THEN 1 ELSE 0 END))"
+    )
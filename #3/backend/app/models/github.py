@@ -7,13 +7,29 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Float,
+    JSON,
+    Index,
+    UniqueConstraint,
+    Enum as SqlEnum,
 )
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 
 from app.core.database import Base
+from app.models.expressions import seconds_between
+
+
+class SyncJobStatus(str, Enum):
+    """Enumeration for repository sync job status."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
 
 
 class GitHubUser(Base):
@@ -78,6 +94,15 @@ class Issue(Base):
     """GitHub issue model."""
 
     __tablename__ = "issues"
+    __table_args__ = (
+        # Repository issue listings and insights filter by state and created_at
+        Index(
+            "ix_issues_repository_state_created",
+            "repository_id",
+            "state",
+            "created_at",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     github_id = Column(Integer, unique=True, nullable=False, index=True)
@@ -112,7 +137,7 @@ class Issue(Base):
     author = relationship("GitHubUser", back_populates="issues")
     pull_requests = relationship("PullRequest", back_populates="linked_issue")
 
-    @property
+    @hybrid_property
     def resolution_time_hours(self) -> Optional[float]:
         """Calculate resolution time in hours if issue is closed."""
         if self.closed_at and self.created_at:
@@ -120,6 +145,11 @@ class Issue(Base):
             return delta.total_seconds() / 3600
         return None
 
+    @resolution_time_hours.expression
+    def resolution_time_hours(cls):
+        # NULL closed_at propagates through the arithmetic to a NULL result
+        return seconds_between(cls.created_at, cls.closed_at) / 3600
+
     @property
     def is_closed(self) -> bool:
         """Check if issue is closed."""
@@ -158,7 +188,9 @@ class PullRequest(Base):
     merged_at = Column(DateTime, nullable=True, index=True)
 
     # Foreign keys
-    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    repository_id = Column(
+        Integer, ForeignKey("repositories.id"), nullable=False, index=True
+    )
     author_id = Column(Integer, ForeignKey("github_users.id"), nullable=False)
     linked_issue_id = Column(Integer, ForeignKey("issues.id"), nullable=True)
 
@@ -208,7 +240,9 @@ class Commit(Base):
     created_at = Column(DateTime, nullable=False, default=func.now())
 
     # Foreign keys
-    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    repository_id = Column(
+        Integer, ForeignKey("repositories.id"), nullable=False, index=True
+    )
     author_id = Column(Integer, ForeignKey("github_users.id"), nullable=False)
     pull_request_id = Column(Integer, ForeignKey("pull_requests.id"), nullable=True)
 
@@ -221,3 +255,113 @@ class Commit(Base):
     def lines_changed(self) -> int:
         """Total lines changed in this commit."""
         return self.additions + self.deletions
+
+
+class GitHubETag(Base):
+    """Validators from GitHub API responses, used for conditional requests."""
+
+    __tablename__ = "github_etags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(1000), unique=True, nullable=False, index=True)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+
+    # Pagination seen with the cached response, since 304s carry no body
+    has_next_page = Column(Boolean, nullable=False, default=False)
+    last_page = Column(Integer, nullable=True)
+
+    # Time tracking
+    updated_at = Column(
+        DateTime, nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+
+class GitHubSyncState(Base):
+    """Per-resource incremental sync position for a repository."""
+
+    __tablename__ = "github_sync_states"
+    __table_args__ = (
+        UniqueConstraint(
+            "repository_id", "resource", name="uq_github_sync_states_resource"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    resource = Column(String(50), nullable=False)  # issues, pulls, commits
+
+    # Everything updated before the watermark is known to be synced
+    watermark = Column(DateTime, nullable=True)
+
+    # Position of an unfinished run, so a failed sync resumes where it stopped
+    cursor = Column(DateTime, nullable=True)
+    next_page = Column(Integer, nullable=True)
+
+    # Time tracking
+    updated_at = Column(
+        DateTime, nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+    # Relationships
+    repository = relationship("Repository")
+
+    @property
+    def in_progress(self) -> bool:
+        """Check if a previous run stopped before finishing."""
+        return self.next_page is not None
+
+
+# Stored enum names of the queued and running sync job statuses
+SYNC_JOB_ACTIVE = text("status IN ('QUEUED', 'RUNNING')")
+
+
+class SyncJob(Base):
+    """Background repository sync requested through the API."""
+
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        # Active job lookup when coalescing syncs of the same repository
+        Index("ix_sync_jobs_repository_status", "repository_full_name", "status"),
+        # At most one queued or running job per repository, across processes
+        Index(
+            "ix_sync_jobs_active_repository",
+            "repository_full_name",
+            unique=True,
+            sqlite_where=SYNC_JOB_ACTIVE,
+            postgresql_where=SYNC_JOB_ACTIVE,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    repository_full_name = Column(String(500), nullable=False)
+    status = Column(
+        SqlEnum(SyncJobStatus), nullable=False, default=SyncJobStatus.QUEUED
+    )
+    full_resync = Column(Boolean, nullable=False, default=False)
+
+    # Progress, updated as each page is committed
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=True)
+    issues_synced = Column(Integer, nullable=False, default=0)
+    pull_requests_synced = Column(Integer, nullable=False, default=0)
+    commits_synced = Column(Integer, nullable=False, default=0)
+
+    # Outcome
+    result = Column(JSON, nullable=True)  # Inserted/updated/unchanged per resource
+    error = Column(Text, nullable=True)
+
+    # Time tracking
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Renewed while a worker runs the job; a stale heartbeat means the lease
+    # has expired and another process may take the job over
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    repository = relationship("Repository")
+
+    @property
+    def is_active(self) -> bool:
+        """Check if the job is still waiting or running."""
+        return self.status in (SyncJobStatus.QUEUED, SyncJobStatus.RUNNING)
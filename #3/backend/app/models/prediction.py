@@ -8,8 +8,13 @@ from sqlalchemy import (
     ForeignKey,
     Float,
     JSON,
+    Index,
     Enum as SqlEnum,
+    and_,
+    case,
+    literal_column,
 )
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -33,6 +38,10 @@ class ModelStatus(str, Enum):
 
     TRAINING = "training"
     ACTIVE = "active"
+    # Candidates scored alongside the active model on live traffic; a canary
+    # also serves its traffic_percentage of requests
+    SHADOW = "shadow"
+    CANARY = "canary"
     DEPRECATED = "deprecated"
     FAILED = "failed"
 
@@ -50,6 +59,10 @@ class PredictionModel(Base):
     """Model for storing ML model metadata and versions."""
 
     __tablename__ = "prediction_models"
+    __table_args__ = (
+        # Active model lookup per prediction type
+        Index("ix_prediction_models_type_status", "prediction_type", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -81,6 +94,9 @@ class PredictionModel(Base):
     feature_scaler_path = Column(String(500), nullable=True)
     model_artifacts = Column(JSON, nullable=True)
 
+    # Live evaluation
+    traffic_percentage = Column(Float, nullable=True)  # Requests served as canary
+
     # Time tracking
     training_started_at = Column(DateTime, nullable=True)
     training_completed_at = Column(DateTime, nullable=True)
@@ -123,6 +139,12 @@ class Prediction(Base):
     """Model for storing predictions made by the system."""
 
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Team dashboards and performance filter by team over a created_at window
+        Index("ix_predictions_team_created", "team_id", "created_at"),
+        # Validated predictions by validation date (rollup backfill, accuracy)
+        Index("ix_predictions_status_validation", "status", "validation_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -170,19 +192,25 @@ class Prediction(Base):
     # Foreign keys
     model_id = Column(Integer, ForeignKey("prediction_models.id"), nullable=False)
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
-    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=True)
+    repository_id = Column(
+        Integer, ForeignKey("repositories.id"), nullable=True, index=True
+    )
     issue_id = Column(Integer, ForeignKey("issues.id"), nullable=True)
 
     # Relationships
     model = relationship("PredictionModel", back_populates="predictions")
     # Note: team, repository, issue relationships would be added when importing those models
 
-    @property
+    @hybrid_property
     def is_validated(self) -> bool:
         """Check if prediction has been validated with actual values."""
         return self.actual_value is not None and self.validation_date is not None
 
-    @property
+    @is_validated.expression
+    def is_validated(cls):
+        return and_(cls.actual_value.isnot(None), cls.validation_date.isnot(None))
+
+    @hybrid_property
     def accuracy_percentage(self) -> Optional[float]:
         """Calculate prediction accuracy if actual value is available."""
         if not self.is_validated:
@@ -196,13 +224,34 @@ class Prediction(Base):
         )
         return max(0, (1 - error_rate) * 100)
 
-    @property
+    @accuracy_percentage.expression
+    def accuracy_percentage(cls):
+        error = func.abs(cls.predicted_value - cls.actual_value)
+        actual = func.abs(cls.actual_value)
+        return case(
+            (~cls.is_validated, None),
+            (
+                cls.actual_value == 0,
+                case((cls.predicted_value == 0, 100.0), else_=0.0),
+            ),
+            (error < actual, (1 - error / actual) * 100),
+            else_=0.0,
+        )
+
+    @hybrid_property
     def absolute_error(self) -> Optional[float]:
         """Calculate absolute error if actual value is available."""
         if not self.is_validated:
             return None
         return abs(self.predicted_value - self.actual_value)
 
+    @absolute_error.expression
+    def absolute_error(cls):
+        return case(
+            (cls.is_validated, func.abs(cls.predicted_value - cls.actual_value)),
+            else_=None,
+        )
+
     @property
     def relative_error(self) -> Optional[float]:
         """Calculate relative error percentage if actual value is available."""
@@ -264,6 +313,33 @@ class EstimationAccuracy(Base):
         return (self.predictions_within_25_percent / self.validated_predictions) * 100
 
 
+# The dimensions of a rollup bucket. Unique indexes treat NULLs as distinct,
+# so the nullable ones are coalesced for the index to allow one row per bucket;
+# upserts name these expressions as their conflict target
+ESTIMATION_ACCURACY_BUCKET = (
+    EstimationAccuracy.prediction_type,
+    EstimationAccuracy.time_period,
+    func.coalesce(EstimationAccuracy.team_id, literal_column("0")),
+    func.coalesce(EstimationAccuracy.model_id, literal_column("0")),
+    func.coalesce(EstimationAccuracy.task_type, literal_column("''")),
+)
+Index("ix_estimation_accuracy_bucket", *ESTIMATION_ACCURACY_BUCKET, unique=True)
+
+
+class TrainingClaim(Base):
+    """
+    When the training pipeline was last claimed, and by which process.
+    Each process that may train claims a run with a conditional update of the
+    row, so only one of them trains per retrain interval.
+    """
+
+    __tablename__ = "training_claims"
+
+    name = Column(String(100), primary_key=True)
+    claimed_at = Column(DateTime, nullable=True)
+    claimed_by = Column(String(255), nullable=True)  # "hostname:pid"
+
+
 class TaskFeature(Base):
     """Model for storing extracted features from tasks for ML training."""
 
@@ -7,8 +7,12 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Float,
+    Index,
     Enum as SqlEnum,
+    and_,
+    case,
 )
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -16,6 +20,7 @@ from enum import Enum
 from typing import Optional
 
 from app.core.database import Base
+from app.models.expressions import whole_days_between
 
 
 class SeniorityLevel(str, Enum):
@@ -48,10 +53,20 @@ class Team(Base):
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
 
-    # Team metrics
+    # Team metrics, maintained by app.services.team_aggregates
     average_velocity = Column(Float, nullable=True)  # Story points per sprint
-    average_cycle_time_hours = Column(Float, nullable=True)
     estimation_accuracy_score = Column(Float, nullable=True)  # 0-1 scale
+    validated_prediction_count = Column(Integer, nullable=False, default=0)
+    # Entered with the team; not derived from issues or predictions
+    average_cycle_time_hours = Column(Float, nullable=True)
+
+    # Active team composition, maintained by app.services.team_aggregates
+    current_size = Column(Integer, nullable=False, default=0)
+    junior_count = Column(Integer, nullable=False, default=0)
+    mid_count = Column(Integer, nullable=False, default=0)
+    senior_count = Column(Integer, nullable=False, default=0)
+    lead_count = Column(Integer, nullable=False, default=0)
+    principal_count = Column(Integer, nullable=False, default=0)
 
     # Time tracking
     created_at = Column(DateTime, nullable=False, default=func.now())
@@ -59,30 +74,28 @@ class Team(Base):
         DateTime, nullable=False, default=func.now(), onupdate=func.now()
     )
 
-    # Relationships
-    members = relationship("TeamMember", back_populates="team")
-    sprints = relationship("Sprint", back_populates="team")
-
-    @property
-    def current_size(self) -> int:
-        """Get current active team size."""
-        return len([m for m in self.members if m.is_active])
+    # Relationships raise instead of lazy loading, so serializing a list can't
+    # run a query per row; queries that need them load them with selectinload
+    members = relationship("TeamMember", back_populates="team", lazy="raise")
+    sprints = relationship("Sprint", back_populates="team", lazy="raise")
 
     @property
     def seniority_distribution(self) -> dict:
         """Get distribution of seniority levels in the team."""
-        active_members = [m for m in self.members if m.is_active]
-        distribution = {}
-        for level in SeniorityLevel:
-            count = len([m for m in active_members if m.seniority_level == level])
-            distribution[level.value] = count
-        return distribution
+        return {
+            level.value: getattr(self, f"{level.value}_count") or 0
+            for level in SeniorityLevel
+        }
 
 
 class TeamMember(Base):
     """Team member model for storing individual team member information."""
 
     __tablename__ = "team_members"
+    __table_args__ = (
+        # Active member lookups per team
+        Index("ix_team_members_team_active", "team_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -115,10 +128,10 @@ class TeamMember(Base):
     # Foreign keys
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
 
-    # Relationships
-    team = relationship("Team", back_populates="members")
+    # Relationships, never loaded implicitly
+    team = relationship("Team", back_populates="members", lazy="raise")
     technology_experiences = relationship(
-        "TechnologyExperience", back_populates="team_member"
+        "TechnologyExperience", back_populates="team_member", lazy="raise"
     )
 
     @property
@@ -140,6 +153,14 @@ class TechnologyExperience(Base):
     """Model for storing team member experience with specific technologies."""
 
     __tablename__ = "technology_experiences"
+    __table_args__ = (
+        # Skills search by technology over a proficiency range
+        Index(
+            "ix_technology_experiences_name_proficiency",
+            "technology_name",
+            "proficiency_score",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     technology_name = Column(String(255), nullable=False, index=True)
@@ -165,10 +186,14 @@ class TechnologyExperience(Base):
     )
 
     # Foreign keys
-    team_member_id = Column(Integer, ForeignKey("team_members.id"), nullable=False)
+    team_member_id = Column(
+        Integer, ForeignKey("team_members.id"), nullable=False, index=True
+    )
 
-    # Relationships
-    team_member = relationship("TeamMember", back_populates="technology_experiences")
+    # Relationships, never loaded implicitly
+    team_member = relationship(
+        "TeamMember", back_populates="technology_experiences", lazy="raise"
+    )
 
     @property
     def is_current_skill(self) -> bool:
@@ -184,6 +209,15 @@ class Sprint(Base):
     """Model for storing sprint information and team composition."""
 
     __tablename__ = "sprints"
+    __table_args__ = (
+        # Completed sprints per team over a start_date window
+        Index(
+            "ix_sprints_team_completed_start",
+            "team_id",
+            "is_completed",
+            "start_date",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -221,14 +255,18 @@ class Sprint(Base):
     # Foreign keys
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
 
-    # Relationships
-    team = relationship("Team", back_populates="sprints")
+    # Relationships, never loaded implicitly
+    team = relationship("Team", back_populates="sprints", lazy="raise")
 
-    @property
+    @hybrid_property
     def duration_days(self) -> int:
         """Calculate sprint duration in days."""
         return (self.end_date - self.start_date).days
 
+    @duration_days.expression
+    def duration_days(cls):
+        return whole_days_between(cls.start_date, cls.end_date)
+
     @property
     def completion_percentage(self) -> Optional[float]:
         """Calculate completion percentage based on story points."""
@@ -246,7 +284,7 @@ class Sprint(Base):
             )
         return None
 
-    @property
+    @hybrid_property
     def story_points_estimation_accuracy(self) -> Optional[float]:
         """Calculate estimation accuracy for story points."""
         if self.planned_story_points and self.completed_story_points:
@@ -254,3 +292,18 @@ class Sprint(Base):
                 self.planned_story_points, self.completed_story_points
             )
         return None
+
+    @story_points_estimation_accuracy.expression
+    def story_points_estimation_accuracy(cls):
+        planned = cls.planned_story_points * 1.0
+        completed = cls.completed_story_points * 1.0
+        return case(
+            (
+                and_(cls.planned_story_points != 0, cls.completed_story_points != 0),
+                case(
+                    (planned <= completed, planned / completed),
+                    else_=completed / planned,
+                ),
+            ),
+            else_=None,
+        )
@@ -0,0 +1,22 @@
+"""
+Services package for the GitHub Predictive Analytics application.
+
+This package contains domain logic shared by the API routers and scripts:
+- accuracy_rollups: Incremental estimation accuracy rollups
+- analytics_cache: Analytics response cache with ETags and scoped invalidation
+- artifacts: Checksum-verified cache of memory-mapped model artifacts
+- batching: In-memory queue drained in batches by an asyncio task
+- bulk_upsert: Batched INSERT ... ON CONFLICT upserts with change counts
+- cache: Bounded LRU cache with expiry and hit/miss counters
+- feature_store: Precomputed historical and team features for inference
+- github_client: Async GitHub REST client with rate limiting and conditional requests
+- github_sync: Concurrent repository sync engine
+- github_webhooks: Signed webhook verification and batched event ingestion
+- inference: Model registry and in-memory inference for predictions
+- prediction_cache: Feature-hash deduplication of prediction requests
+- shadow_scoring: Background scoring of predictions by shadow and canary models
+- similarity_index: Nearest-neighbour index of completed tasks by text
+- sync_jobs: Background queue and worker pool for repository syncs
+- team_aggregates: Stored team member counts and performance aggregates
+- training: Scheduled model training over TaskFeature history
+"""
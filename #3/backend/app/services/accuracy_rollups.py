@@ -0,0 +1,245 @@
+"""
+Incremental maintenance of EstimationAccuracy rollups.
+
+Each rollup row aggregates validated predictions for one combination of team,
+model, prediction type and task type on a single UTC day (keyed by the
+validation date). Validating a prediction updates its row in O(1) with running
+means, so accuracy endpoints can read a handful of rollup rows instead of
+rescanning every prediction.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.prediction import (
+    ESTIMATION_ACCURACY_BUCKET,
+    EstimationAccuracy,
+    Prediction,
+    PredictionStatus,
+)
+from app.services.bulk_upsert import dialect_insert
+
+# Rollup granularity; the accuracy endpoints filter windows at this resolution
+ROLLUP_PERIOD_FORMAT = "%Y-%m-%d"
+
+
+def rollup_period(moment: datetime) -> Tuple[str, datetime, datetime]:
+    """
+    Get the rollup period label and its [start, end) bounds for a timestamp.
+    """
+    period_start = datetime(moment.year, moment.month, moment.day)
+    period_end = period_start + timedelta(days=1)
+    return period_start.strftime(ROLLUP_PERIOD_FORMAT), period_start, period_end
+
+
+def prediction_contribution(prediction: Prediction) -> Dict[str, Any]:
+    """
+    Get the metrics a validated prediction adds to its rollup.
+    """
+    accuracy = prediction.accuracy_percentage
+    error = prediction.absolute_error
+    relative_error = prediction.relative_error
+
+    return {
+        "accuracy": accuracy,
+        "absolute_error": error,
+        "squared_error": error * error,
+        "within_10_percent": accuracy >= 90,
+        "within_25_percent": accuracy >= 75,
+        "within_50_percent": accuracy >= 50,
+        "overestimation": relative_error
+        if relative_error is not None and relative_error > 0
+        else None,
+        "underestimation": abs(relative_error)
+        if relative_error is not None and relative_error < 0
+        else None,
+    }
+
+
+def _rollup_key(prediction: Prediction) -> Dict[str, Any]:
+    time_period, period_start, period_end = rollup_period(prediction.validation_date)
+    return {
+        "team_id": prediction.team_id,
+        "model_id": prediction.model_id,
+        "prediction_type": prediction.prediction_type,
+        # The bucket index doesn't tell a missing task type from an empty one
+        "task_type": prediction.task_type or None,
+        "time_period": time_period,
+        "period_start": period_start,
+        "period_end": period_end,
+    }
+
+
+def _new_rollup(key: Dict[str, Any]) -> EstimationAccuracy:
+    return EstimationAccuracy(
+        **key,
+        total_predictions=0,
+        validated_predictions=0,
+        predictions_within_10_percent=0,
+        predictions_within_25_percent=0,
+        predictions_within_50_percent=0,
+        overestimation_count=0,
+        underestimation_count=0,
+    )
+
+
+def _running_mean_value(mean: Optional[float], count: int, value: float) -> float:
+    return ((mean or 0.0) * count + value) / (count + 1)
+
+
+def _running_mean_expression(column, count_column, value: float):
+    return (func.coalesce(column, 0.0) * count_column + value) / (count_column + 1)
+
+
+def _count_expression(column, matched: bool):
+    return column + int(matched)
+
+
+def accumulate(rollup: EstimationAccuracy, contribution: Dict[str, Any]) -> None:
+    """
+    Fold one prediction's contribution into an in-memory rollup.
+    """
+    count = rollup.validated_predictions
+    rollup.average_accuracy_percentage = _running_mean_value(
+        rollup.average_accuracy_percentage, count, contribution["accuracy"]
+    )
+    rollup.mae = _running_mean_value(rollup.mae, count, contribution["absolute_error"])
+    rollup.mse = _running_mean_value(rollup.mse, count, contribution["squared_error"])
+    rollup.total_predictions += 1
+    rollup.validated_predictions += 1
+    rollup.predictions_within_10_percent += int(contribution["within_10_percent"])
+    rollup.predictions_within_25_percent += int(contribution["within_25_percent"])
+    rollup.predictions_within_50_percent += int(contribution["within_50_percent"])
+
+    if contribution["overestimation"] is not None:
+        rollup.average_overestimation_percentage = _running_mean_value(
+            rollup.average_overestimation_percentage,
+            rollup.overestimation_count,
+            contribution["overestimation"],
+        )
+        rollup.overestimation_count += 1
+
+    if contribution["underestimation"] is not None:
+        rollup.average_underestimation_percentage = _running_mean_value(
+            rollup.average_underestimation_percentage,
+            rollup.underestimation_count,
+            contribution["underestimation"],
+        )
+        rollup.underestimation_count += 1
+
+    rollup.calculated_at = datetime.utcnow()
+
+
+async def record_validation(db: AsyncSession, prediction: Prediction) -> None:
+    """
+    Apply a newly validated prediction to its rollup row.
+    The upsert runs in the caller's transaction; commit it with the prediction.
+    """
+    key = _rollup_key(prediction)
+    contribution = prediction_contribution(prediction)
+
+    # Every SET expression reads the row's previous values, so the update is a
+    # single atomic statement even with concurrent validations on one bucket
+    count = EstimationAccuracy.validated_predictions
+    values = {
+        "total_predictions": EstimationAccuracy.total_predictions + 1,
+        "validated_predictions": count + 1,
+        "average_accuracy_percentage": _running_mean_expression(
+            EstimationAccuracy.average_accuracy_percentage,
+            count,
+            contribution["accuracy"],
+        ),
+        "mae": _running_mean_expression(
+            EstimationAccuracy.mae, count, contribution["absolute_error"]
+        ),
+        "mse": _running_mean_expression(
+            EstimationAccuracy.mse, count, contribution["squared_error"]
+        ),
+        "predictions_within_10_percent": _count_expression(
+            EstimationAccuracy.predictions_within_10_percent,
+            contribution["within_10_percent"],
+        ),
+        "predictions_within_25_percent": _count_expression(
+            EstimationAccuracy.predictions_within_25_percent,
+            contribution["within_25_percent"],
+        ),
+        "predictions_within_50_percent": _count_expression(
+            EstimationAccuracy.predictions_within_50_percent,
+            contribution["within_50_percent"],
+        ),
+        "calculated_at": datetime.utcnow(),
+    }
+
+    if contribution["overestimation"] is not None:
+        values["average_overestimation_percentage"] = _running_mean_expression(
+            EstimationAccuracy.average_overestimation_percentage,
+            EstimationAccuracy.overestimation_count,
+            contribution["overestimation"],
+        )
+        values["overestimation_count"] = EstimationAccuracy.overestimation_count + 1
+
+    if contribution["underestimation"] is not None:
+        values["average_underestimation_percentage"] = _running_mean_expression(
+            EstimationAccuracy.average_underestimation_percentage,
+            EstimationAccuracy.underestimation_count,
+            contribution["underestimation"],
+        )
+        values["underestimation_count"] = EstimationAccuracy.underestimation_count + 1
+
+    # A new bucket starts from this prediction alone. Creating it and updating
+    # an existing one is one upsert against the bucket's unique index, so two
+    # validations opening the same bucket can't both insert it
+    new_rollup = _new_rollup(key)
+    accumulate(new_rollup, contribution)
+    insert = dialect_insert(db)
+    await db.execute(
+        insert(EstimationAccuracy)
+        .values(
+            {
+                column.key: getattr(new_rollup, column.key)
+                for column in EstimationAccuracy.__table__.columns
+                if column.key != "id"
+            }
+        )
+        .on_conflict_do_update(index_elements=ESTIMATION_ACCURACY_BUCKET, set_=values)
+    )
+
+
+def rebuild_accuracy_rollups(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rebuild all rollups from validated prediction history.
+    Predictions are streamed in batches, so memory stays proportional to the
+    number of rollup rows. Returns the number of rollups written.
+    """
+    db.execute(delete(EstimationAccuracy))
+
+    rollups: Dict[Tuple, EstimationAccuracy] = {}
+    predictions = db.scalars(
+        select(Prediction)
+        .where(
+            Prediction.status == PredictionStatus.VALIDATED,
+            Prediction.is_validated,
+        )
+        .execution_options(yield_per=batch_size)
+    )
+
+    for prediction in predictions:
+        key = _rollup_key(prediction)
+        rollup_id = (
+            key["team_id"],
+            key["model_id"],
+            key["prediction_type"],
+            key["task_type"],
+            key["time_period"],
+        )
+        if rollup_id not in rollups:
+            rollups[rollup_id] = _new_rollup(key)
+        accumulate(rollups[rollup_id], prediction_contribution(prediction))
+
+    db.add_all(rollups.values())
+    db.commit()
+    return len(rollups)
@@ -0,0 +1,183 @@
+"""
+Response cache for the analytics endpoints, with ETags and scoped invalidation.
+
+A cached endpoint's serialized response is stored under its name, its
+parameters and the current token of every scope the response reads: one
+team or repository, all teams or repositories, or the prediction models.
+Writes invalidate a scope by replacing its token, so only the responses that
+read it are computed again; the entries they orphan age out of the LRU.
+
+Entries and tokens both live in a ``CacheBackend``. The default keeps them in
+an in-process LRU with expiry. Installing a shared backend as
+``analytics_cache.backend`` lets workers share entries and invalidations.
+
+Every cached response carries an ETag of its body, so a polling client that
+sends it back in ``If-None-Match`` gets a 304 without a body.
+"""
+
+import functools
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import secrets
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.services.cache import LRUCache
+
+ALL_TEAMS = "teams"
+ALL_REPOSITORIES = "repositories"
+MODELS = "models"
+
+
+def team_scope(team_id: Optional[int]) -> str:
+    """The scope of one team's data, or of every team's when no ID is given."""
+    return f"team:{team_id}" if team_id else ALL_TEAMS
+
+
+def repository_scope(repository_id: Optional[int]) -> str:
+    """The scope of one repository's data, or of every repository's."""
+    return f"repository:{repository_id}" if repository_id else ALL_REPOSITORIES
+
+
+class CacheBackend(ABC):
+    """Storage for cached response bodies and scope tokens."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a stored value, or None when it's missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        """Store a value, replacing any previous one."""
+
+
+class MemoryBackend(CacheBackend):
+    """Keeps entries in an in-process LRU cache with expiry."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries.set(key, value)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+
+class AnalyticsCache:
+    """Caches endpoint responses per parameters and scope tokens."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or MemoryBackend(
+            max_size=settings.analytics_cache_size,
+            ttl_seconds=settings.analytics_cache_ttl_seconds,
+        )
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def _token(self, scope: str) -> bytes:
+        key = f"analytics:scope:{scope}"
+        token = await self.backend.get(key)
+        if token is None:
+            # A lost token can't be told apart from an invalidated one
+            token = await self._replace_token(scope)
+        return token
+
+    async def _replace_token(self, scope: str) -> bytes:
+        token = secrets.token_hex(8).encode()
+        await self.backend.set(f"analytics:scope:{scope}", token)
+        return token
+
+    async def _key(
+        self, endpoint: str, params: Dict[str, Any], scopes: List[str]
+    ) -> str:
+        tokens = {scope: (await self._token(scope)).decode() for scope in scopes}
+        canonical = json.dumps(
+            {"endpoint": endpoint, "params": params, "tokens": tokens},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return f"analytics:response:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    def cached(self, scopes: Callable[..., List[str]]):
+        """
+        Cache an endpoint's responses. The endpoint must take a ``request``
+        parameter; ``scopes`` is called with its other parameters, except the
+        session, and names the scopes its response reads.
+        """
+
+        def decorator(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(**kwargs):
+                request: Request = kwargs["request"]
+                params = {
+                    name: value
+                    for name, value in kwargs.items()
+                    if name not in ("request", "db")
+                }
+                key = await self._key(endpoint.__name__, params, scopes(**params))
+
+                body = await self.backend.get(key)
+                if body is None:
+                    self.misses += 1
+                    body = json.dumps(
+                        jsonable_encoder(await endpoint(**kwargs)),
+                        separators=(",", ":"),
+                    ).encode()
+                    await self.backend.set(key, body)
+                else:
+                    self.hits += 1
+
+                etag = _etag(body)
+                headers = {"ETag": etag, "Cache-Control": "no-cache"}
+                if _matches(request.headers.get("if-none-match"), etag):
+                    self.not_modified += 1
+                    return Response(status_code=304, headers=headers)
+                return Response(body, media_type="application/json", headers=headers)
+
+            return wrapper
+
+        return decorator
+
+    async def invalidate_teams(self, *team_ids: Optional[int]) -> None:
+        """Invalidate responses reading the given teams or every team."""
+        for scope in {ALL_TEAMS, *(team_scope(team_id) for team_id in team_ids)}:
+            await self._replace_token(scope)
+
+    async def invalidate_repositories(self, *repository_ids: Optional[int]) -> None:
+        """Invalidate responses reading the given repositories or all of them."""
+        scopes = {ALL_REPOSITORIES, *map(repository_scope, repository_ids)}
+        for scope in scopes:
+            await self._replace_token(scope)
+
+    async def invalidate_models(self) -> None:
+        await self._replace_token(MODELS)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,71 @@
+"""
+Shared on-disk cache of model artifacts, loaded through memory maps.
+
+Before a model artifact is loaded, it is copied into ``DATA_DIR/artifacts``
+under its SHA-256 checksum, re-dumped uncompressed so joblib can
+memory-map its NumPy arrays. Every worker process then loads the same
+cached file with ``mmap_mode="r"`` and shares its array pages through the
+OS page cache, instead of holding a private unpickled copy.
+
+A cache entry is only used once its own checksum matches the one recorded
+beside it, so a torn or corrupted copy is rebuilt rather than served. Since
+entries are keyed by content, a retrained artifact written to the same path
+gets a new entry.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+
+import joblib
+
+from app.core.config import DATA_DIR
+
+CACHE_DIR = DATA_DIR / "artifacts"
+
+# Bytes read at a time while hashing
+CHUNK_SIZE = 1 << 20
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomically(path: Path, write) -> None:
+    # Concurrent workers may build the same entry; the last rename wins and
+    # readers never see a partial file
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def cache_artifact(path: Path) -> Path:
+    """Get the verified cache entry of an artifact, creating it if needed."""
+    checksum = file_checksum(path)
+    cached = CACHE_DIR / f"{checksum}.joblib"
+    recorded = cached.with_suffix(".sha256")
+    if (
+        cached.exists()
+        and recorded.exists()
+        and recorded.read_text() == file_checksum(cached)
+    ):
+        return cached
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _write_atomically(cached, lambda target: joblib.dump(joblib.load(path), target))
+    _write_atomically(recorded, lambda target: target.write_text(file_checksum(cached)))
+    return cached
+
+
+def load_artifact(path: Path) -> Any:
+    """Load an artifact with its arrays memory-mapped from the shared cache."""
+    return joblib.load(cache_artifact(path), mmap_mode="r")
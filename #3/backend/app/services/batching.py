@@ -0,0 +1,110 @@
+"""
+In-memory queue drained in batches by a single asyncio task.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BatchConsumer(ABC):
+    """
+    Collects queued items for up to ``batch_wait_seconds`` or ``batch_size``
+    items, then hands them to ``apply`` together. Subclasses implement
+    ``apply`` and queue items with ``put``. If a batch fails, its items are
+    applied one at a time so a single bad item only loses itself; items that
+    still fail are passed to ``discard``.
+    """
+
+    # Used in the log message of a failed batch
+    item_name = "items"
+
+    def __init__(self, batch_size: int, batch_wait_seconds: float):
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+        # Created by start() so they bind to the application's event loop
+        self._queue: Optional["asyncio.Queue[Any]"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Apply the items already queued, then stop the consumer."""
+        if not self.running:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    def put(self, item: Any) -> None:
+        if not self.running:
+            raise RuntimeError(f"{type(self).__name__} has not been started")
+        self._queue.put_nowait(item)
+
+    @abstractmethod
+    async def apply(self, items: List[Any]) -> None:
+        """Apply a batch of items together."""
+
+    def discard(self, item: Any) -> None:
+        """Called with an item that failed to apply on its own."""
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            # Collect whatever else arrives within the batch window
+            batch = [item]
+            deadline = loop.time() + self.batch_wait_seconds
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._apply_batch(batch)
+
+    async def _apply_batch(self, batch: List[Any]) -> None:
+        try:
+            await self.apply(batch)
+            return
+        except Exception:
+            if len(batch) == 1:
+                logger.exception("Failed to apply 1 of the %s", self.item_name)
+                self.discard(batch[0])
+                return
+            logger.warning(
+                "Failed to apply %d %s together; applying them one at a time",
+                len(batch),
+                self.item_name,
+                exc_info=True,
+            )
+
+        for item in batch:
+            try:
+                await self.apply([item])
+            except Exception:
+                logger.exception("Failed to apply 1 of the %s", self.item_name)
+                self.discard(item)
@@ -0,0 +1,167 @@
+"""
+Batched INSERT ... ON CONFLICT DO UPDATE for SQLite and PostgreSQL.
+
+Rows are written with one multi-row statement per batch instead of one ORM
+object per row. Conflicting rows are only rewritten when a column actually
+differs, which lets each batch report how many rows were inserted, updated or
+left unchanged.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Dialect-specific insert constructs that support ON CONFLICT
+INSERT_BUILDERS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+# SQLite's default limit on bound parameters in one statement (since 3.32)
+MAX_BOUND_PARAMETERS = 32766
+
+
+@dataclass
+class UpsertCounts:
+    """How many rows a bulk upsert inserted, updated or left unchanged."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def __add__(self, other: "UpsertCounts") -> "UpsertCounts":
+        return UpsertCounts(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+        )
+
+
+@dataclass
+class UpsertResult:
+    """Row counts plus the primary key of every upserted row, by unique key."""
+
+    counts: UpsertCounts = field(default_factory=UpsertCounts)
+    ids: Dict[Any, int] = field(default_factory=dict)
+
+
+def dialect_insert(db: Union[AsyncSession, Session]):
+    """Get the insert construct supporting ON CONFLICT for the session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in INSERT_BUILDERS:
+        raise ValueError(f"Upserts are not supported for the {dialect} dialect")
+    return INSERT_BUILDERS[dialect]
+
+
+def _batches(rows: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+async def bulk_upsert(
+    db: AsyncSession,
+    model,
+    key: str,
+    rows: Sequence[Dict[str, Any]],
+    insert_only: Sequence[str] = (),
+    batch_size: Optional[int] = None,
+    newer_than: Optional[str] = None,
+) -> UpsertResult:
+    """
+    Insert rows, or update the existing rows sharing their unique ``key``.
+
+    Every row must have the same columns. Columns in ``insert_only`` are
+    written for new rows but never overwritten. When ``newer_than`` names a
+    timestamp column, existing rows are only updated by rows at least as recent,
+    so stale data delivered out of order is ignored. The statements run in the
+    caller's transaction; commit once the whole page has been written.
+    """
+    result = UpsertResult()
+    if not rows:
+        return result
+
+    insert = dialect_insert(db)
+
+    # A statement can't touch the same row twice, so duplicates are collapsed
+    # to the most recent one, or the last one without a timestamp column
+    latest: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        current = latest.get(row[key])
+        if (
+            current is None
+            or newer_than is None
+            or current[newer_than] is None
+            or (row[newer_than] is not None and row[newer_than] >= current[newer_than])
+        ):
+            latest[row[key]] = row
+    rows = list(latest.values())
+
+    table = model.__table__
+    columns = list(rows[0])
+    update_columns = [
+        column for column in columns if column != key and column not in insert_only
+    ]
+    batch_size = min(
+        batch_size or settings.database_bulk_batch_size,
+        MAX_BOUND_PARAMETERS // len(columns),
+    )
+
+    # One parameterized statement is compiled once and cached; SQLAlchemy's
+    # "insertmanyvalues" mode expands each batch into multi-row VALUES clauses
+    statement = insert(table)
+    if update_columns:
+        values = {column: statement.excluded[column] for column in update_columns}
+        if "updated_at" in table.c and "updated_at" not in values:
+            values["updated_at"] = func.now()
+        # Skip conflicting rows that are already up to date
+        changed = or_(
+            *(
+                table.c[column].is_distinct_from(statement.excluded[column])
+                for column in update_columns
+            )
+        )
+        if newer_than is not None:
+            changed = and_(
+                changed,
+                or_(
+                    table.c[newer_than].is_(None),
+                    table.c[newer_than] <= statement.excluded[newer_than],
+                ),
+            )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c[key]], set_=values, where=changed
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[table.c[key]])
+    statement = statement.returning(table.c[key], table.c.id)
+
+    for batch in _batches(rows, batch_size):
+        keys = [row[key] for row in batch]
+        existing = await db.execute(
+            select(table.c[key], table.c.id).where(table.c[key].in_(keys))
+        )
+        existing_ids = dict(existing.all())
+
+        written = await db.execute(statement, batch)
+        written_ids = dict(written.all())
+
+        inserted = sum(1 for value in written_ids if value not in existing_ids)
+        result.counts += UpsertCounts(
+            inserted=inserted,
+            updated=len(written_ids) - inserted,
+            unchanged=len(batch) - len(written_ids),
+        )
+        result.ids.update(existing_ids)
+        result.ids.update(written_ids)
+
+    return result
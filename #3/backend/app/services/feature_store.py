@@ -0,0 +1,304 @@
+"""
+In-memory feature store for the historical prediction features.
+
+TaskFeature declares historical and team context features that used to be
+left empty. The store precomputes them with a handful of grouped queries and
+keeps them in memory, so a prediction reads a ready-made vector:
+
+- similar-task averages of actual hours and story points: over the tasks
+  nearest to the task's text in the similarity index, or otherwise per
+  team, repository and task type, falling back to coarser groups when a
+  combination has no history
+- team size, average seniority, average member velocity and average
+  completed-sprint velocity, per team
+
+Validated predictions and new task features fold their actuals into the
+similar-task sums in O(1). Member changes and closed sprints refresh their
+team's row. A periodic full rebuild picks up writes made by other worker
+processes or scripts.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.prediction import (
+    Prediction,
+    PredictionStatus,
+    PredictionType,
+    TaskFeature,
+)
+from app.models.team import SeniorityLevel, Sprint, TeamMember
+from app.services.similarity_index import similarity_index
+
+logger = logging.getLogger(__name__)
+
+# Features provided by the store, in the order models list them
+STORE_FEATURE_COLUMNS = [
+    "similar_task_avg_hours",
+    "similar_task_avg_story_points",
+    "assignee_avg_velocity",
+    "team_avg_velocity",
+    "team_size_at_time",
+    "team_seniority_avg",
+]
+
+# Numeric scale used to average seniority levels
+SENIORITY_SCORES = {
+    SeniorityLevel.JUNIOR: 1,
+    SeniorityLevel.MID: 2,
+    SeniorityLevel.SENIOR: 3,
+    SeniorityLevel.LEAD: 4,
+    SeniorityLevel.PRINCIPAL: 5,
+}
+
+# Stands for "any value" in the coarser similar-task groups
+ANY = "*"
+
+TaskKey = Tuple[Any, Any, Any]
+
+
+def _rollup_keys(
+    team_id: Optional[int], repository_id: Optional[int], task_type: Optional[str]
+) -> List[TaskKey]:
+    """Similar-task groups for a task, from the most to the least specific."""
+    return [
+        (team_id, repository_id, task_type),
+        (team_id, ANY, task_type),
+        (ANY, ANY, task_type),
+        (ANY, ANY, ANY),
+    ]
+
+
+@dataclass
+class _Average:
+    total: float = 0.0
+    count: int = 0
+
+    def add(self, total: float, count: int = 1) -> None:
+        self.total += total
+        self.count += count
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class FeatureStore:
+    """Process-wide cache of the historical features used for inference."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        refresh_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.refresh_seconds = (
+            settings.feature_store_refresh_seconds
+            if refresh_seconds is None
+            else refresh_seconds
+        )
+        self._hours: Dict[TaskKey, _Average] = defaultdict(_Average)
+        self._story_points: Dict[TaskKey, _Average] = defaultdict(_Average)
+        self._teams: Dict[int, Dict[str, Optional[float]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def features(
+        self,
+        team_id: Optional[int] = None,
+        repository_id: Optional[int] = None,
+        task_type: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> Dict[str, Optional[float]]:
+        """
+        Get the precomputed feature vector for a task's context. Given the
+        task's text, similar-task averages come from its nearest neighbours.
+        """
+        keys = _rollup_keys(team_id, repository_id, task_type)
+        features = {
+            "similar_task_avg_hours": self._first_average(self._hours, keys),
+            "similar_task_avg_story_points": self._first_average(
+                self._story_points, keys
+            ),
+        }
+        if text:
+            for column, value in similarity_index.similar_averages(text).items():
+                if value is not None:
+                    features[column] = value
+        team = self._teams.get(team_id) or {}
+        for column in STORE_FEATURE_COLUMNS[2:]:
+            features[column] = team.get(column)
+        return features
+
+    @staticmethod
+    def _first_average(
+        averages: Dict[TaskKey, _Average], keys: List[TaskKey]
+    ) -> Optional[float]:
+        for key in keys:
+            average = averages.get(key)
+            if average is not None and average.count:
+                return round(average.value, 4)
+        return None
+
+    def record_actual(
+        self,
+        team_id: Optional[int],
+        repository_id: Optional[int],
+        task_type: Optional[str],
+        hours: Optional[float] = None,
+        story_points: Optional[float] = None,
+    ) -> None:
+        """Fold a completed task's actual effort into the similar-task averages."""
+        for key in _rollup_keys(team_id, repository_id, task_type):
+            if hours is not None:
+                self._hours[key].add(hours)
+            if story_points is not None:
+                self._story_points[key].add(story_points)
+
+    def record_validation(self, prediction: Prediction) -> None:
+        """Fold a validated prediction's actual value into the averages."""
+        if prediction.prediction_type == PredictionType.HOURS:
+            actuals = {"hours": prediction.actual_value}
+        elif prediction.prediction_type == PredictionType.STORY_POINTS:
+            actuals = {"story_points": prediction.actual_value}
+        else:
+            return
+        self.record_actual(
+            prediction.team_id,
+            prediction.repository_id,
+            prediction.task_type,
+            **actuals,
+        )
+
+    async def refresh_team(self, db: AsyncSession, team_id: int) -> None:
+        """Recompute one team's features, e.g. after a member change."""
+        teams = await self._load_teams(db, team_id)
+        self._teams = {**self._teams, team_id: teams.get(team_id, {})}
+
+    async def record_sprint_completion(self, db: AsyncSession, sprint: Sprint) -> None:
+        """Refresh a team's velocity once one of its sprints is completed."""
+        await self.refresh_team(db, sprint.team_id)
+
+    async def refresh(self) -> None:
+        """Rebuild every feature from the database."""
+        async with self.session_factory() as db:
+            hours: Dict[TaskKey, _Average] = defaultdict(_Average)
+            story_points: Dict[TaskKey, _Average] = defaultdict(_Average)
+
+            result = await db.execute(
+                select(
+                    TaskFeature.team_id,
+                    TaskFeature.repository_id,
+                    TaskFeature.task_type,
+                    func.sum(TaskFeature.actual_hours),
+                    func.count(TaskFeature.actual_hours),
+                    func.sum(TaskFeature.actual_story_points),
+                    func.count(TaskFeature.actual_story_points),
+                ).group_by(
+                    TaskFeature.team_id,
+                    TaskFeature.repository_id,
+                    TaskFeature.task_type,
+                )
+            )
+            for team_id, repository_id, task_type, *sums in result.all():
+                for key in _rollup_keys(team_id, repository_id, task_type):
+                    hours[key].add(sums[0] or 0.0, sums[1])
+                    story_points[key].add(sums[2] or 0.0, sums[3])
+
+            result = await db.execute(
+                select(
+                    Prediction.team_id,
+                    Prediction.repository_id,
+                    Prediction.task_type,
+                    Prediction.prediction_type,
+                    func.sum(Prediction.actual_value),
+                    func.count(Prediction.actual_value),
+                )
+                .where(
+                    Prediction.status == PredictionStatus.VALIDATED,
+                    Prediction.prediction_type.in_(
+                        [PredictionType.HOURS, PredictionType.STORY_POINTS]
+                    ),
+                )
+                .group_by(
+                    Prediction.team_id,
+                    Prediction.repository_id,
+                    Prediction.task_type,
+                    Prediction.prediction_type,
+                )
+            )
+            for team_id, repository_id, task_type, prediction_type, *sums in result:
+                averages = (
+                    hours if prediction_type == PredictionType.HOURS else story_points
+                )
+                for key in _rollup_keys(team_id, repository_id, task_type):
+                    averages[key].add(sums[0] or 0.0, sums[1])
+
+            teams = await self._load_teams(db)
+
+        self._hours, self._story_points, self._teams = hours, story_points, teams
+
+    @staticmethod
+    async def _load_teams(
+        db: AsyncSession, team_id: Optional[int] = None
+    ) -> Dict[int, Dict[str, Optional[float]]]:
+        seniority = case(
+            *(
+                (TeamMember.seniority_level == level, score)
+                for level, score in SENIORITY_SCORES.items()
+            )
+        )
+        members = select(
+            TeamMember.team_id,
+            func.count(TeamMember.id),
+            func.avg(seniority),
+            func.avg(TeamMember.average_story_points_per_sprint),
+        ).where(TeamMember.is_active == True)
+        sprints = select(Sprint.team_id, func.avg(Sprint.velocity)).where(
+            Sprint.is_completed == True
+        )
+        if team_id is not None:
+            members = members.where(TeamMember.team_id == team_id)
+            sprints = sprints.where(Sprint.team_id == team_id)
+
+        teams: Dict[int, Dict[str, Optional[float]]] = defaultdict(dict)
+        result = await db.execute(members.group_by(TeamMember.team_id))
+        for row_team_id, size, seniority_avg, member_velocity in result.all():
+            teams[row_team_id].update(
+                team_size_at_time=size,
+                team_seniority_avg=seniority_avg,
+                assignee_avg_velocity=member_velocity,
+            )
+        result = await db.execute(sprints.group_by(Sprint.team_id))
+        for row_team_id, velocity in result.all():
+            teams[row_team_id]["team_avg_velocity"] = velocity
+        return dict(teams)
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self.refresh_seconds and self._task is None:
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the feature store")
+
+
+feature_store = FeatureStore()
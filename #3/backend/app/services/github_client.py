@@ -0,0 +1,244 @@
+"""
+Async GitHub REST API client used by the repository sync engine.
+
+The client issues conditional requests from cached ETag/Last-Modified
+validators, follows Link-header pagination and backs off when the
+X-RateLimit-* headers say the budget is nearly spent.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+_LINK_PATTERN = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+_PAGE_PATTERN = re.compile(r"[?&]page=(\d+)")
+
+
+class GitHubAPIError(Exception):
+    """Raised when the GitHub API returns an error response."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+@dataclass
+class CachedValidators:
+    """Validators and pagination remembered from a previous response."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    has_next_page: bool = False
+    last_page: Optional[int] = None
+
+
+@dataclass
+class GitHubPage:
+    """A single GitHub API response, or a 304 for an unchanged resource."""
+
+    url: str
+    status_code: int
+    data: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    links: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        return self.data if isinstance(self.data, list) else []
+
+    @property
+    def next_url(self) -> Optional[str]:
+        return self.links.get("next")
+
+    @property
+    def last_page(self) -> Optional[int]:
+        last_url = self.links.get("last")
+        if last_url:
+            match = _PAGE_PATTERN.search(last_url)
+            if match:
+                return int(match.group(1))
+        return None
+
+    @property
+    def validators(self) -> CachedValidators:
+        return CachedValidators(
+            etag=self.etag,
+            last_modified=self.last_modified,
+            has_next_page=self.next_url is not None,
+            last_page=self.last_page,
+        )
+
+
+def parse_link_header(header: Optional[str]) -> Dict[str, str]:
+    """Parse a GitHub Link header into a rel -> URL mapping."""
+    if not header:
+        return {}
+    return {rel: url for url, rel in _LINK_PATTERN.findall(header)}
+
+
+class RateLimiter:
+    """
+    Tracks the X-RateLimit-* headers and pauses requests when the remaining
+    budget drops to the configured floor, until the window resets.
+    """
+
+    def __init__(
+        self,
+        min_remaining: int,
+        max_wait_seconds: float,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.min_remaining = min_remaining
+        self.max_wait_seconds = max_wait_seconds
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = asyncio.Lock()
+
+    def update(self, headers: httpx.Headers) -> None:
+        """Record the budget reported by a response."""
+        if "x-ratelimit-remaining" in headers:
+            self.remaining = int(headers["x-ratelimit-remaining"])
+        if "x-ratelimit-reset" in headers:
+            self.reset_at = float(headers["x-ratelimit-reset"])
+
+    def seconds_until_reset(self) -> float:
+        if self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - self._clock())
+
+    async def wait(self) -> None:
+        """Sleep until the window resets if the budget is nearly spent."""
+        async with self._lock:
+            if self.remaining is None or self.remaining > self.min_remaining:
+                return
+            delay = min(self.seconds_until_reset(), self.max_wait_seconds)
+            if delay > 0:
+                await self._sleep(delay)
+            # Assume a fresh window; the next response corrects the estimate
+            self.remaining = None
+
+    async def back_off(self, response: httpx.Response) -> None:
+        """Sleep after a primary or secondary rate limit rejection."""
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None:
+            delay = float(retry_after)
+        else:
+            delay = self.seconds_until_reset() or 60.0
+        await self._sleep(min(delay, self.max_wait_seconds))
+        self.remaining = None
+
+
+class GitHubClient:
+    """Minimal async client for the GitHub REST API endpoints used by sync."""
+
+    def __init__(
+        self,
+        token: str,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self.base_url = (base_url or settings.github_api_url).rstrip("/")
+        self.max_retries = (
+            settings.github_max_retries if max_retries is None else max_retries
+        )
+        self.rate_limiter = rate_limiter or RateLimiter(
+            min_remaining=settings.github_rate_limit_min_remaining,
+            max_wait_seconds=settings.github_rate_limit_max_wait_seconds,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github.v3+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            timeout=settings.github_request_timeout_seconds,
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "GitHubClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def build_url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build the absolute URL used both for requests and as the ETag key."""
+        url = httpx.URL(path if "://" in path else f"{self.base_url}{path}")
+        if params:
+            url = url.copy_merge_params(params)
+        return str(url)
+
+    async def get(
+        self, url: str, cached: Optional[CachedValidators] = None
+    ) -> GitHubPage:
+        """
+        GET a URL, sending If-None-Match/If-Modified-Since from cached validators.
+        A 304 response doesn't count against the rate limit.
+        """
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            elif cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.wait()
+            response = await self._client.get(url, headers=headers)
+            self.rate_limiter.update(response.headers)
+
+            if self._is_rate_limited(response) and attempt < self.max_retries:
+                await self.rate_limiter.back_off(response)
+                continue
+            break
+
+        if response.status_code == 304:
+            return GitHubPage(url=url, status_code=304)
+
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise GitHubAPIError(response.status_code, message)
+
+        return GitHubPage(
+            url=url,
+            status_code=response.status_code,
+            data=response.json(),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            links=parse_link_header(response.headers.get("link")),
+        )
+
+    @staticmethod
+    def _is_rate_limited(response: httpx.Response) -> bool:
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        return (
+            response.headers.get("x-ratelimit-remaining") == "0"
+            or "retry-after" in response.headers
+        )
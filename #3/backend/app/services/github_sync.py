@@ -0,0 +1,651 @@
+"""
+Repository sync engine that mirrors GitHub issues, pull requests and commits.
+
+Issues, pull requests and commits are synced concurrently, with the number of
+in-flight requests bounded by ``github_sync_concurrency``. Each resource keeps
+its own watermark in ``github_sync_states`` and only asks GitHub for changes
+made after it, so re-syncing a large repository costs a few requests. Every
+page is requested conditionally with the ETag stored from the previous sync,
+so unchanged pages come back as free 304 responses.
+
+Each page is written in its own transaction together with its ETag and the
+resource's new sync position. A sync that fails part way resumes from the
+last committed page, and the watermark only moves once a run completes.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.github import (
+    Commit,
+    GitHubETag,
+    GitHubSyncState,
+    GitHubUser,
+    Issue,
+    PullRequest,
+    Repository,
+)
+from app.services.bulk_upsert import UpsertCounts, UpsertResult, bulk_upsert
+from app.services.github_client import (
+    CachedValidators,
+    GitHubAPIError,
+    GitHubClient,
+    GitHubPage,
+)
+
+# GitHub's placeholder account for deleted users and unlinked commit authors
+GHOST_USER = {"id": 10137, "login": "ghost", "type": "User"}
+
+
+@dataclass
+class SyncResult:
+    """Outcome of syncing one repository."""
+
+    repository_id: int
+    issues: UpsertCounts = field(default_factory=UpsertCounts)
+    pull_requests: UpsertCounts = field(default_factory=UpsertCounts)
+    commits: UpsertCounts = field(default_factory=UpsertCounts)
+
+
+def parse_github_datetime(value: Union[str, int, None]) -> Optional[datetime]:
+    """
+    Parse a GitHub ISO 8601 timestamp into a naive UTC datetime.
+    Some webhook payloads send Unix timestamps instead, which are accepted too.
+    """
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_github_datetime(value: datetime) -> str:
+    """Format a naive UTC datetime as a GitHub ISO 8601 timestamp."""
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _state_values(
+    cursor: Optional[datetime], next_page: Optional[int], done: bool
+) -> Dict[str, Any]:
+    """Sync state column values after a page, or after the last page of a run."""
+    if done:
+        return {"watermark": cursor, "cursor": None, "next_page": None}
+    return {"cursor": cursor, "next_page": next_page}
+
+
+async def _gather_or_cancel(*coroutines: Awaitable[Any]) -> List[Any]:
+    """
+    Run coroutines concurrently, cancelling the rest as soon as one fails so
+    no page keeps writing after the sync has been reported as failed.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def user_github_id(user: Optional[Dict[str, Any]]) -> int:
+    return (user or GHOST_USER)["id"]
+
+
+def user_row(user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    user = user or GHOST_USER
+    return {
+        "github_id": user["id"],
+        "login": user["login"],
+        "avatar_url": user.get("avatar_url"),
+        "type": user.get("type") or "User",
+    }
+
+
+def repository_row(data: Dict[str, Any], owner_id: int) -> Dict[str, Any]:
+    return {
+        "github_id": data["id"],
+        "name": data["name"],
+        "full_name": data["full_name"],
+        "description": data.get("description"),
+        "url": data["html_url"],
+        "clone_url": data["clone_url"],
+        "default_branch": data.get("default_branch") or "main",
+        "language": data.get("language"),
+        "size": data.get("size") or 0,
+        "stargazers_count": data.get("stargazers_count") or 0,
+        "forks_count": data.get("forks_count") or 0,
+        "open_issues_count": data.get("open_issues_count") or 0,
+        "is_private": bool(data.get("private")),
+        "is_fork": bool(data.get("fork")),
+        "owner_id": owner_id,
+        "created_at": parse_github_datetime(data["created_at"]),
+        "updated_at": parse_github_datetime(data["updated_at"]),
+    }
+
+
+def issue_row(
+    data: Dict[str, Any], repository_id: int, author_id: int
+) -> Dict[str, Any]:
+    milestone = data.get("milestone")
+    return {
+        "github_id": data["id"],
+        "number": data["number"],
+        "title": data["title"],
+        "body": data.get("body"),
+        "state": data["state"],
+        "labels": json.dumps([label["name"] for label in data.get("labels") or []]),
+        "assignees": json.dumps(
+            [assignee["login"] for assignee in data.get("assignees") or []]
+        ),
+        "milestone": milestone["title"] if milestone else None,
+        "url": data["html_url"],
+        "created_at": parse_github_datetime(data["created_at"]),
+        "updated_at": parse_github_datetime(data["updated_at"]),
+        "closed_at": parse_github_datetime(data.get("closed_at")),
+        "repository_id": repository_id,
+        "author_id": author_id,
+    }
+
+
+def pull_request_row(
+    data: Dict[str, Any], repository_id: int, author_id: int
+) -> Dict[str, Any]:
+    merged_at = parse_github_datetime(data.get("merged_at"))
+    row = {
+        "github_id": data["id"],
+        "number": data["number"],
+        "title": data["title"],
+        "body": data.get("body"),
+        "state": "merged" if merged_at else data["state"],
+        "base_branch": data["base"]["ref"],
+        "head_branch": data["head"]["ref"],
+        "url": data["html_url"],
+        "created_at": parse_github_datetime(data["created_at"]),
+        "updated_at": parse_github_datetime(data["updated_at"]),
+        "closed_at": parse_github_datetime(data.get("closed_at")),
+        "merged_at": merged_at,
+        "repository_id": repository_id,
+        "author_id": author_id,
+    }
+    # Single pull request payloads (webhooks, /pulls/{number}) carry metrics
+    # that the list endpoint leaves out
+    if "additions" in data:
+        row.update(
+            additions=data["additions"],
+            deletions=data["deletions"],
+            changed_files=data["changed_files"],
+            commits_count=data["commits"],
+            comments_count=data["comments"],
+            review_comments_count=data["review_comments"],
+        )
+    return row
+
+
+def commit_row(
+    data: Dict[str, Any], repository_id: int, author_id: int
+) -> Dict[str, Any]:
+    details = data["commit"]
+    signature = details.get("committer") or details.get("author") or {}
+    stats = data.get("stats") or {}
+    return {
+        "sha": data["sha"],
+        "message": details["message"],
+        "url": data["html_url"],
+        "additions": stats.get("additions", 0),
+        "deletions": stats.get("deletions", 0),
+        "total_changes": stats.get("total", 0),
+        "committed_at": parse_github_datetime(signature.get("date")),
+        "repository_id": repository_id,
+        "author_id": author_id,
+    }
+
+
+async def upsert_users(
+    db: AsyncSession, users: List[Optional[Dict[str, Any]]]
+) -> UpsertResult:
+    # The list endpoints only return a user summary without the account creation
+    # date, so new users are stamped with the time they were first seen
+    now = datetime.utcnow()
+    rows = [{**user_row(user), "created_at": now} for user in users]
+    return await bulk_upsert(
+        db, GitHubUser, "github_id", rows, insert_only=("created_at",)
+    )
+
+
+class GitHubSyncEngine:
+    """
+    Mirrors one repository's GitHub data into the database.
+    Network requests run concurrently; database writes are serialized through a
+    lock so SQLite sees a single writer.
+    """
+
+    def __init__(
+        self,
+        client: GitHubClient,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        concurrency: Optional[int] = None,
+        per_page: Optional[int] = None,
+        on_progress: Optional[Callable[[str, UpsertCounts], Awaitable[None]]] = None,
+    ):
+        self.client = client
+        self.session_factory = session_factory
+        # Called with the resource name and counts after each committed page
+        self.on_progress = on_progress
+        self.per_page = per_page or settings.github_per_page
+        self._semaphore = asyncio.Semaphore(
+            concurrency or settings.github_sync_concurrency
+        )
+        self._write_lock = asyncio.Lock()
+        self._validators: Dict[str, CachedValidators] = {}
+
+    async def sync_repository(
+        self, full_name: str, full_resync: bool = False
+    ) -> SyncResult:
+        """
+        Sync a repository and its issues, pull requests and commits.
+        Only changes since each resource's watermark are fetched unless
+        ``full_resync`` is set.
+        """
+        if not full_resync:
+            # Without stored validators every request is unconditional
+            await self._load_validators(full_name)
+        repository_id = await self._sync_repository_metadata(full_name)
+        if full_resync:
+            await self._reset_sync_states(repository_id)
+
+        issues, pull_requests, commits = await _gather_or_cancel(
+            self._sync_issues(full_name, repository_id),
+            self._sync_pull_requests(full_name, repository_id),
+            self._sync_commits(full_name, repository_id),
+        )
+
+        async with self._write_lock, self.session_factory() as db:
+            repository = await db.get(Repository, repository_id)
+            repository.last_synced_at = datetime.utcnow()
+            await db.commit()
+
+        return SyncResult(
+            repository_id=repository_id,
+            issues=issues,
+            pull_requests=pull_requests,
+            commits=commits,
+        )
+
+    async def _load_validators(self, full_name: str) -> None:
+        prefix = self.client.build_url(f"/repos/{full_name}")
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(GitHubETag).where(GitHubETag.url.startswith(prefix))
+            )
+            self._validators = {
+                row.url: CachedValidators(
+                    etag=row.etag,
+                    last_modified=row.last_modified,
+                    has_next_page=row.has_next_page,
+                    last_page=row.last_page,
+                )
+                for row in result.scalars()
+            }
+
+    async def _fetch(self, url: str, conditional: bool = True) -> GitHubPage:
+        cached = self._validators.get(url) if conditional else None
+        async with self._semaphore:
+            return await self.client.get(url, cached)
+
+    async def _sync_repository_metadata(self, full_name: str) -> int:
+        url = self.client.build_url(f"/repos/{full_name}")
+        page = await self._fetch(url)
+
+        if page.not_modified:
+            async with self.session_factory() as db:
+                repository_id = await db.scalar(
+                    select(Repository.id).where(Repository.full_name == full_name)
+                )
+            if repository_id is not None:
+                return repository_id
+            # The validator outlived the row it described; fetch it again
+            page = await self._fetch(url, conditional=False)
+
+        async with self._write_lock, self.session_factory() as db:
+            owners = await upsert_users(db, [page.data["owner"]])
+            repositories = await bulk_upsert(
+                db,
+                Repository,
+                "github_id",
+                [repository_row(page.data, owners.ids[page.data["owner"]["id"]])],
+            )
+            await self._remember_validators(db, page)
+            await db.commit()
+
+        return repositories.ids[page.data["id"]]
+
+    async def _load_sync_state(
+        self, repository_id: int, resource: str
+    ) -> GitHubSyncState:
+        async with self._write_lock, self.session_factory() as db:
+            state = await db.scalar(
+                select(GitHubSyncState).where(
+                    GitHubSyncState.repository_id == repository_id,
+                    GitHubSyncState.resource == resource,
+                )
+            )
+            if state is None:
+                state = GitHubSyncState(repository_id=repository_id, resource=resource)
+                db.add(state)
+                await db.commit()
+        return state
+
+    async def _reset_sync_states(self, repository_id: int) -> None:
+        async with self._write_lock, self.session_factory() as db:
+            await db.execute(
+                update(GitHubSyncState)
+                .where(GitHubSyncState.repository_id == repository_id)
+                .values(watermark=None, cursor=None, next_page=None)
+            )
+            await db.commit()
+
+    async def _sync_issues(self, full_name: str, repository_id: int) -> UpsertCounts:
+        """
+        Sync issues updated since the watermark.
+        Issues are listed oldest-update first and paged by moving ``since`` to
+        the last committed update time, so issues edited mid-sync can't shift
+        unseen ones onto pages that were already read.
+        """
+        state = await self._load_sync_state(repository_id, "issues")
+        if state.in_progress:
+            since, page_number = state.cursor, state.next_page
+        else:
+            since, page_number = state.watermark, 1
+
+        synced = UpsertCounts()
+        while True:
+            params = {
+                "state": "all",
+                "sort": "updated",
+                "direction": "asc",
+                "per_page": self.per_page,
+                "page": page_number,
+            }
+            if since is not None:
+                params["since"] = format_github_datetime(since)
+            url = self.client.build_url(f"/repos/{full_name}/issues", params)
+
+            page = await self._fetch(url)
+            if page.not_modified and self._validators[url].has_next_page:
+                # A 304 has no body to take the next cursor from
+                page = await self._fetch(url, conditional=False)
+
+            last_updated = (
+                parse_github_datetime(page.items[-1]["updated_at"])
+                if page.items
+                else None
+            )
+            if last_updated is not None and last_updated != since:
+                next_since, next_page = last_updated, 1
+            else:
+                # Every issue on the page shares the cursor's timestamp
+                next_since, next_page = since, page_number + 1
+
+            done = page.not_modified or page.next_url is None
+            synced += await self._store_page(
+                page,
+                lambda db, items: self._store_issues(db, repository_id, items),
+                state,
+                _state_values(next_since, None if done else next_page, done),
+            )
+            if done:
+                return synced
+            since, page_number = next_since, next_page
+
+    async def _sync_pull_requests(
+        self, full_name: str, repository_id: int
+    ) -> UpsertCounts:
+        """
+        Sync pull requests updated since the watermark.
+        The pulls listing has no ``since`` filter, so pages are read newest-update
+        first until one reaches pull requests older than the watermark.
+        """
+        state = await self._load_sync_state(repository_id, "pulls")
+        floor = state.watermark
+        if state.in_progress:
+            high_water, page_number = state.cursor, state.next_page
+        else:
+            high_water, page_number = None, 1
+
+        synced = UpsertCounts()
+        while True:
+            url = self.client.build_url(
+                f"/repos/{full_name}/pulls",
+                {
+                    "state": "all",
+                    "sort": "updated",
+                    "direction": "desc",
+                    "per_page": self.per_page,
+                    "page": page_number,
+                },
+            )
+            page = await self._fetch(url)
+
+            if page.not_modified:
+                if page_number == 1:
+                    # Nothing has been updated since the last sync
+                    return synced
+                items = []
+                done = not self._validators[url].has_next_page
+            else:
+                items = [
+                    item
+                    for item in page.items
+                    if floor is None
+                    or parse_github_datetime(item["updated_at"]) >= floor
+                ]
+                if items and high_water is None:
+                    high_water = parse_github_datetime(items[0]["updated_at"])
+                done = len(items) < len(page.items) or page.next_url is None
+
+            synced += await self._store_page(
+                page,
+                lambda db, _: self._store_pull_requests(db, repository_id, items),
+                state,
+                _state_values(
+                    high_water or floor, None if done else page_number + 1, done
+                ),
+            )
+            if done:
+                return synced
+            page_number += 1
+
+    async def _sync_commits(self, full_name: str, repository_id: int) -> UpsertCounts:
+        """
+        Sync commits in the date range from the watermark to the start of the run.
+        The range is fixed for the whole run, so page numbers stay stable and the
+        remaining pages can be fetched concurrently once the last page is known.
+        """
+        state = await self._load_sync_state(repository_id, "commits")
+        if state.in_progress:
+            until, first_number = state.cursor, state.next_page
+        else:
+            until, first_number = datetime.utcnow(), 1
+
+        params = {"until": format_github_datetime(until), "per_page": self.per_page}
+        if state.watermark is not None:
+            params["since"] = format_github_datetime(state.watermark)
+
+        def page_url(number: int) -> str:
+            return self.client.build_url(
+                f"/repos/{full_name}/commits", {**params, "page": number}
+            )
+
+        committed = set()
+
+        def progress() -> Dict[str, Any]:
+            # Resume from the first page that hasn't been committed yet
+            next_page = first_number
+            while next_page in committed:
+                next_page += 1
+            return _state_values(until, next_page, done=False)
+
+        async def sync_page(
+            number: int, page: Optional[GitHubPage] = None
+        ) -> UpsertCounts:
+            page = page or await self._fetch(page_url(number))
+
+            def state_values() -> Dict[str, Any]:
+                committed.add(number)
+                return progress()
+
+            return await self._store_page(
+                page,
+                lambda db, items: self._store_commits(db, repository_id, items),
+                state,
+                state_values,
+            )
+
+        try:
+            first_page = await self._fetch(page_url(first_number))
+        except GitHubAPIError as e:
+            if e.status_code == 409:
+                # GitHub answers 409 Conflict for repositories without commits
+                return UpsertCounts()
+            raise
+
+        synced = await sync_page(first_number, first_page)
+        validators = self._validators.get(first_page.url, first_page.validators)
+
+        if validators.last_page:
+            counts = await _gather_or_cancel(
+                *(
+                    sync_page(number)
+                    for number in range(first_number + 1, validators.last_page + 1)
+                )
+            )
+            synced = sum(counts, synced)
+        else:
+            number, has_next = first_number, validators.has_next_page
+            while has_next:
+                number += 1
+                page = await self._fetch(page_url(number))
+                synced += await sync_page(number, page)
+                has_next = (
+                    self._validators[page.url].has_next_page
+                    if page.not_modified
+                    else page.next_url is not None
+                )
+
+        await self._save_sync_state(state, _state_values(until, None, done=True))
+        return synced
+
+    async def _store_page(
+        self,
+        page: GitHubPage,
+        store: Callable[[AsyncSession, List[Dict[str, Any]]], Awaitable[UpsertCounts]],
+        state: GitHubSyncState,
+        state_values,
+    ) -> UpsertCounts:
+        """
+        Write a page's rows, its validators and the resulting sync position in
+        one transaction. Pages answered with 304 only advance the position.
+        """
+        async with self._write_lock, self.session_factory() as db:
+            synced = UpsertCounts()
+            if not page.not_modified:
+                synced = await store(db, page.items)
+                await self._remember_validators(db, page)
+            values = state_values() if callable(state_values) else state_values
+            await db.execute(
+                update(GitHubSyncState)
+                .where(GitHubSyncState.id == state.id)
+                .values(**values)
+            )
+            await db.commit()
+
+        if self.on_progress is not None and synced.total:
+            await self.on_progress(state.resource, synced)
+        return synced
+
+    async def _save_sync_state(
+        self, state: GitHubSyncState, values: Dict[str, Any]
+    ) -> None:
+        async with self._write_lock, self.session_factory() as db:
+            await db.execute(
+                update(GitHubSyncState)
+                .where(GitHubSyncState.id == state.id)
+                .values(**values)
+            )
+            await db.commit()
+
+    async def _remember_validators(self, db: AsyncSession, page: GitHubPage) -> None:
+        if not (page.etag or page.last_modified):
+            return
+        validators = page.validators
+        await bulk_upsert(
+            db,
+            GitHubETag,
+            "url",
+            [
+                {
+                    "url": page.url,
+                    "etag": validators.etag,
+                    "last_modified": validators.last_modified,
+                    "has_next_page": validators.has_next_page,
+                    "last_page": validators.last_page,
+                    "updated_at": datetime.utcnow(),
+                }
+            ],
+        )
+        self._validators[page.url] = validators
+
+    async def _store_issues(
+        self, db: AsyncSession, repository_id: int, items: List[Dict[str, Any]]
+    ) -> UpsertCounts:
+        # The issues listing includes pull requests, which are synced separately
+        items = [item for item in items if "pull_request" not in item]
+        users = await upsert_users(db, [item.get("user") for item in items])
+        rows = [
+            issue_row(item, repository_id, users.ids[user_github_id(item.get("user"))])
+            for item in items
+        ]
+        return (
+            await bulk_upsert(db, Issue, "github_id", rows, newer_than="updated_at")
+        ).counts
+
+    async def _store_pull_requests(
+        self, db: AsyncSession, repository_id: int, items: List[Dict[str, Any]]
+    ) -> UpsertCounts:
+        users = await upsert_users(db, [item.get("user") for item in items])
+        rows = [
+            pull_request_row(
+                item, repository_id, users.ids[user_github_id(item.get("user"))]
+            )
+            for item in items
+        ]
+        return (
+            await bulk_upsert(
+                db, PullRequest, "github_id", rows, newer_than="updated_at"
+            )
+        ).counts
+
+    async def _store_commits(
+        self, db: AsyncSession, repository_id: int, items: List[Dict[str, Any]]
+    ) -> UpsertCounts:
+        # Commits whose author email isn't linked to an account have no user
+        users = await upsert_users(db, [item.get("author") for item in items])
+        rows = [
+            commit_row(
+                item, repository_id, users.ids[user_github_id(item.get("author"))]
+            )
+            for item in items
+        ]
+        return (await bulk_upsert(db, Commit, "sha", rows)).counts
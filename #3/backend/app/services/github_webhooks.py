@@ -0,0 +1,239 @@
+"""
+GitHub webhook ingestion for issues, pull requests and pushes.
+
+Deliveries are verified against ``github_webhook_secret`` and queued in memory.
+A single consumer drains the queue in batches and writes each batch with bulk
+upserts in one transaction, so only the entities named in the events are
+touched. A batch that fails is retried event by event, and the delivery IDs of
+events that still fail are forgotten so GitHub's redelivery is accepted.
+Deliveries can arrive out of order; issues and pull requests are only
+overwritten by payloads at least as recent as the stored row. Events lost in a
+restart are redelivered by GitHub or picked up by the next incremental sync.
+"""
+
+import hashlib
+import hmac
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.github import Commit, GitHubUser, Issue, PullRequest, Repository
+from app.services.analytics_cache import analytics_cache
+from app.services.batching import BatchConsumer
+from app.services.bulk_upsert import bulk_upsert
+from app.services.github_sync import (
+    GHOST_USER,
+    issue_row,
+    parse_github_datetime,
+    pull_request_row,
+    repository_row,
+    upsert_users,
+    user_github_id,
+)
+
+logger = logging.getLogger(__name__)
+
+# Webhook events that are applied to the database
+SUPPORTED_EVENTS = ("issues", "pull_request", "push")
+
+# Number of recent X-GitHub-Delivery IDs remembered to drop redeliveries
+DELIVERY_HISTORY_SIZE = 10000
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check an X-Hub-Signature-256 header against the raw request body."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature[len("sha256=") :], expected)
+
+
+@dataclass
+class WebhookEvent:
+    """A verified webhook delivery waiting to be applied."""
+
+    name: str
+    delivery_id: Optional[str]
+    payload: Dict[str, Any]
+
+
+class WebhookConsumer(BatchConsumer):
+    """In-memory event queue drained in batches by a single asyncio task."""
+
+    item_name = "GitHub webhook events"
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: Optional[int] = None,
+        batch_wait_seconds: Optional[float] = None,
+    ):
+        super().__init__(
+            batch_size or settings.github_webhook_batch_size,
+            settings.github_webhook_batch_wait_seconds
+            if batch_wait_seconds is None
+            else batch_wait_seconds,
+        )
+        self.session_factory = session_factory
+        self._deliveries: "OrderedDict[str, None]" = OrderedDict()
+
+    def enqueue(
+        self, name: str, payload: Dict[str, Any], delivery_id: Optional[str] = None
+    ) -> bool:
+        """
+        Queue an event for the next batch.
+        Returns False for a delivery that has already been queued.
+        """
+        if not self.running:
+            raise RuntimeError("Webhook consumer has not been started")
+
+        if delivery_id:
+            if delivery_id in self._deliveries:
+                return False
+            self._deliveries[delivery_id] = None
+            if len(self._deliveries) > DELIVERY_HISTORY_SIZE:
+                self._deliveries.popitem(last=False)
+
+        self.put(WebhookEvent(name, delivery_id, payload))
+        return True
+
+    def discard(self, event: WebhookEvent) -> None:
+        # Accept a redelivery of the event instead of dropping it as a duplicate
+        if event.delivery_id:
+            self._deliveries.pop(event.delivery_id, None)
+
+    async def apply(self, events: List[WebhookEvent]) -> None:
+        """Write the entities changed by a batch of events in one transaction."""
+        async with self.session_factory() as db:
+            repositories = [event.payload["repository"] for event in events]
+            users = [repository["owner"] for repository in repositories]
+            for event in events:
+                users.append(event.payload.get("sender"))
+                if event.name == "issues":
+                    users.append(event.payload["issue"].get("user"))
+                elif event.name == "pull_request":
+                    users.append(event.payload["pull_request"].get("user"))
+            user_ids = (await upsert_users(db, users)).ids
+
+            repository_ids = (
+                await bulk_upsert(
+                    db,
+                    Repository,
+                    "github_id",
+                    [
+                        repository_row(
+                            repository, user_ids[user_github_id(repository["owner"])]
+                        )
+                        for repository in repositories
+                    ],
+                    newer_than="updated_at",
+                )
+            ).ids
+
+            issues: List[Dict[str, Any]] = []
+            pull_requests: List[Dict[str, Any]] = []
+            pushes: List[WebhookEvent] = []
+            for event in events:
+                payload = event.payload
+                repository_id = repository_ids[payload["repository"]["id"]]
+                # Predictions reference issues, so deleted issues are kept
+                if event.name == "issues" and payload.get("action") != "deleted":
+                    issue = payload["issue"]
+                    issues.append(
+                        issue_row(
+                            issue,
+                            repository_id,
+                            user_ids[user_github_id(issue.get("user"))],
+                        )
+                    )
+                elif event.name == "pull_request":
+                    pull_request = payload["pull_request"]
+                    pull_requests.append(
+                        pull_request_row(
+                            pull_request,
+                            repository_id,
+                            user_ids[user_github_id(pull_request.get("user"))],
+                        )
+                    )
+                elif event.name == "push":
+                    pushes.append(event)
+
+            await bulk_upsert(db, Issue, "github_id", issues, newer_than="updated_at")
+            await bulk_upsert(
+                db, PullRequest, "github_id", pull_requests, newer_than="updated_at"
+            )
+            await bulk_upsert(
+                db,
+                Commit,
+                "sha",
+                await self._push_commit_rows(db, pushes, repository_ids, user_ids),
+                # A synced commit's author is exact; keep it over the login match
+                insert_only=("author_id",),
+            )
+            await db.commit()
+        await analytics_cache.invalidate_repositories(*repository_ids.values())
+
+    @staticmethod
+    async def _push_commit_rows(
+        db: AsyncSession,
+        pushes: List[WebhookEvent],
+        repository_ids: Dict[int, int],
+        user_ids: Dict[int, int],
+    ) -> List[Dict[str, Any]]:
+        """
+        Commit rows for pushes to each repository's default branch. Push
+        payloads only name commit authors, so they are matched by login.
+        """
+        pushed = []
+        for event in pushes:
+            repository = event.payload["repository"]
+            if event.payload.get("ref") != f"refs/heads/{repository['default_branch']}":
+                continue
+            for commit in event.payload.get("commits") or []:
+                pushed.append((event, repository_ids[repository["id"]], commit))
+        if not pushed:
+            return []
+
+        logins = {
+            commit["author"]["username"]
+            for _, _, commit in pushed
+            if commit["author"].get("username")
+        }
+        result = await db.execute(
+            select(GitHubUser.login, GitHubUser.id).where(GitHubUser.login.in_(logins))
+        )
+        users_by_login = dict(result.all())
+        ghost_id = user_ids.get(GHOST_USER["id"])
+        if ghost_id is None:
+            ghost_id = (await upsert_users(db, [GHOST_USER])).ids[GHOST_USER["id"]]
+
+        rows = []
+        for event, repository_id, commit in pushed:
+            sender = event.payload.get("sender") or {}
+            username = commit["author"].get("username")
+            if username and username == sender.get("login"):
+                author_id = user_ids[sender["id"]]
+            else:
+                author_id = users_by_login.get(username, ghost_id)
+            rows.append(
+                {
+                    "sha": commit["id"],
+                    "message": commit["message"],
+                    "url": commit["url"],
+                    "committed_at": parse_github_datetime(commit["timestamp"])
+                    or datetime.utcnow(),
+                    "repository_id": repository_id,
+                    "author_id": author_id,
+                }
+            )
+        return rows
+
+
+github_webhook_consumer = WebhookConsumer()
@@ -0,0 +1,363 @@
+"""
+In-process inference for effort predictions.
+
+The ACTIVE PredictionModel of each prediction type is loaded once into a
+process-wide registry: its scikit-learn estimator and feature scaler are
+loaded from ``model_file_path`` and ``feature_scaler_path`` through the
+shared, memory-mapped artifact cache, and its ``feature_columns`` fix the
+order of the input vector. Serving a prediction
+only builds that vector and calls the in-memory estimator, with no database or
+disk access. Deploying a model loads its artifacts before the registry entry is
+replaced in a single assignment, so requests see either the old or the new
+model and never a half-loaded one.
+
+Models without artifacts (the seeded and default models) are served by the
+word-count heuristic the API started with.
+
+SHADOW and CANARY models are held next to the active model as candidates.
+A canary serves a fixed share of requests, bucketed by a hash of the request
+so a repeated request reaches the same model.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import DATA_DIR, settings
+from app.core.database import AsyncSessionLocal
+from app.models.prediction import ModelStatus, PredictionModel, PredictionType
+from app.services.artifacts import load_artifact
+
+logger = logging.getLogger(__name__)
+
+# Story points are estimated on the usual 1-13 planning scale
+STORY_POINTS_RANGE = (1, 13)
+
+# Statuses of models evaluated on live traffic next to the active one
+CANDIDATE_STATUSES = (ModelStatus.SHADOW, ModelStatus.CANARY)
+
+
+class ModelLoadError(Exception):
+    """Raised when a model's artifacts can't be loaded."""
+
+
+def extract_features(
+    task_title: str, task_description: Optional[str] = None
+) -> Dict[str, float]:
+    """Extract the request-time features of a task."""
+    title_word_count = len(task_title.split())
+    description_word_count = len(task_description.split()) if task_description else 0
+    return {
+        "title_word_count": title_word_count,
+        "description_word_count": description_word_count,
+        "task_complexity": title_word_count + description_word_count,
+    }
+
+
+@dataclass
+class Estimate:
+    """A predicted value with its confidence score and interval."""
+
+    value: float
+    confidence: float
+    lower: float
+    upper: float
+
+
+class HeuristicEstimator:
+    """Word-count estimate used by models that have no trained artifacts."""
+
+    feature_columns = ["task_complexity"]
+
+    def __init__(self, prediction_type: PredictionType):
+        self.prediction_type = prediction_type
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        base = X[:, 0] * 0.5
+        if self.prediction_type == PredictionType.STORY_POINTS:
+            return base
+        return np.maximum(0.5, base * 2)
+
+    @staticmethod
+    def confidence(X: np.ndarray) -> np.ndarray:
+        return np.minimum(0.95, 0.7 + X[:, 0] / 100)
+
+
+@dataclass
+class LoadedModel:
+    """A PredictionModel with its artifacts loaded and ready to serve."""
+
+    model_id: int
+    name: str
+    version: str
+    prediction_type: PredictionType
+    feature_columns: List[str]
+    estimator: Any
+    scaler: Any = None
+    mae: Optional[float] = None
+    confidence: Optional[float] = None
+    status: ModelStatus = ModelStatus.ACTIVE
+    traffic_percentage: float = 0.0
+
+    @property
+    def is_heuristic(self) -> bool:
+        return isinstance(self.estimator, HeuristicEstimator)
+
+    def vectorize(self, features: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Build the input matrix, one row per task; missing features are 0."""
+        return np.array(
+            [
+                [float(row.get(column) or 0.0) for column in self.feature_columns]
+                for row in features
+            ],
+            dtype=np.float64,
+        )
+
+    def predict(self, features: Sequence[Dict[str, Any]]) -> List[Estimate]:
+        """Predict every task in one estimator call."""
+        X = self.vectorize(features)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        values = np.asarray(self.estimator.predict(X), dtype=np.float64)
+
+        if self.prediction_type == PredictionType.STORY_POINTS:
+            values = np.clip(np.round(values), *STORY_POINTS_RANGE)
+        else:
+            values = np.maximum(values, 0.0)
+
+        if self.is_heuristic:
+            confidence = self.estimator.confidence(X)
+            lower, upper = values * 0.8, values * 1.2
+        else:
+            confidence = np.full(len(values), self.confidence)
+            margin = self.mae if self.mae is not None else values * 0.2
+            lower, upper = np.maximum(values - margin, 0.0), values + margin
+
+        return [
+            Estimate(*map(float, estimate))
+            for estimate in zip(values, confidence, lower, upper)
+        ]
+
+
+def _artifact_path(path: str) -> Path:
+    """Resolve an artifact path; relative paths live under DATA_DIR."""
+    resolved = Path(path)
+    return resolved if resolved.is_absolute() else DATA_DIR / resolved
+
+
+def _read_artifacts(model_path: str, scaler_path: Optional[str]) -> tuple:
+    try:
+        estimator = load_artifact(_artifact_path(model_path))
+        scaler = load_artifact(_artifact_path(scaler_path)) if scaler_path else None
+    except Exception as e:
+        raise ModelLoadError(f"Could not load model artifacts: {e}") from e
+    return estimator, scaler
+
+
+async def load_model(model: PredictionModel) -> LoadedModel:
+    """
+    Load a model's artifacts. Hashing and unpickling run in a worker thread so
+    a large model doesn't stall the event loop.
+    """
+    prediction_type = PredictionType(model.prediction_type)
+    loaded = LoadedModel(
+        model_id=model.id,
+        name=model.name,
+        version=model.version,
+        prediction_type=prediction_type,
+        feature_columns=HeuristicEstimator.feature_columns,
+        estimator=HeuristicEstimator(prediction_type),
+        status=ModelStatus(model.status),
+        traffic_percentage=model.traffic_percentage or 0.0,
+    )
+    if not model.model_file_path:
+        return loaded
+
+    feature_columns = model.feature_columns
+    # The seeder stores the column list as an encoded JSON string
+    if isinstance(feature_columns, str):
+        feature_columns = json.loads(feature_columns)
+    if not feature_columns:
+        raise ModelLoadError(f"Model {model.id} has no feature columns")
+
+    loaded.feature_columns = list(feature_columns)
+    loaded.estimator, loaded.scaler = await asyncio.to_thread(
+        _read_artifacts, model.model_file_path, model.feature_scaler_path
+    )
+    loaded.mae = model.mae
+    score = model.accuracy_score if model.accuracy_score is not None else model.r2_score
+    loaded.confidence = min(0.95, max(0.05, score)) if score is not None else 0.5
+    return loaded
+
+
+class ModelRegistry:
+    """
+    Process-wide map of prediction type to its loaded ACTIVE model, and to
+    its SHADOW and CANARY candidates. A background task re-reads the models
+    periodically so every worker process picks up deployments made through
+    another one.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        refresh_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.refresh_seconds = (
+            settings.model_registry_refresh_seconds
+            if refresh_seconds is None
+            else refresh_seconds
+        )
+        self._models: Dict[PredictionType, LoadedModel] = {}
+        self._candidates: Dict[PredictionType, List[LoadedModel]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, prediction_type: PredictionType) -> Optional[LoadedModel]:
+        return self._models.get(prediction_type)
+
+    def candidates(self, prediction_type: PredictionType) -> List[LoadedModel]:
+        return self._candidates.get(prediction_type, [])
+
+    def route(self, active: LoadedModel, routing_key: str) -> LoadedModel:
+        """
+        Pick the model serving a request: a canary when the request's bucket
+        falls in its traffic share, the active model otherwise.
+        """
+        canaries = [
+            candidate
+            for candidate in self.candidates(active.prediction_type)
+            if candidate.status == ModelStatus.CANARY
+        ]
+        if not canaries:
+            return active
+
+        digest = hashlib.sha256(routing_key.encode()).digest()
+        bucket = int.from_bytes(digest[:4], "big") % 10000 / 100
+        threshold = 0.0
+        for canary in canaries:
+            threshold += canary.traffic_percentage
+            if bucket < threshold:
+                return canary
+        return active
+
+    def activate(self, loaded: LoadedModel) -> None:
+        """Swap in a loaded model for its prediction type."""
+        # Copy on write: readers always see a complete mapping
+        self._models = {**self._models, loaded.prediction_type: loaded}
+        self._candidates = {
+            prediction_type: [
+                candidate
+                for candidate in candidates
+                if candidate.model_id != loaded.model_id
+            ]
+            for prediction_type, candidates in self._candidates.items()
+        }
+
+    async def deploy(self, model: PredictionModel) -> LoadedModel:
+        loaded = await load_model(model)
+        self.activate(loaded)
+        return loaded
+
+    async def refresh(self) -> None:
+        """Load the ACTIVE model of each type if it isn't the one being served."""
+        # Entries swapped by a deploy while this runs are newer than what the
+        # query saw, so only entries still matching the snapshot are replaced
+        snapshot = self._models
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(PredictionModel)
+                .where(
+                    PredictionModel.status.in_(
+                        [ModelStatus.ACTIVE, *CANDIDATE_STATUSES]
+                    )
+                )
+                .order_by(
+                    PredictionModel.deployed_at.asc().nulls_first(), PredictionModel.id
+                )
+            )
+            models = result.scalars().all()
+            # The most recently deployed model wins if several are active
+            active = {
+                model.prediction_type: model
+                for model in models
+                if model.status == ModelStatus.ACTIVE
+            }
+
+            for prediction_type, model in active.items():
+                current = snapshot.get(prediction_type)
+                if current is not None and current.model_id == model.id:
+                    continue
+                try:
+                    loaded = await load_model(model)
+                except ModelLoadError:
+                    logger.exception("Failed to load prediction model %s", model.id)
+                    continue
+                if self._models.get(prediction_type) is current:
+                    self.activate(loaded)
+
+        self._models = {
+            prediction_type: loaded
+            for prediction_type, loaded in self._models.items()
+            if prediction_type in active or loaded is not snapshot.get(prediction_type)
+        }
+        await self._refresh_candidates(
+            [model for model in models if model.status in CANDIDATE_STATUSES]
+        )
+
+    async def _refresh_candidates(self, models: List[PredictionModel]) -> None:
+        # Artifacts of models that are already loaded are reused; only their
+        # status and traffic share may have changed
+        loaded_by_id = {
+            candidate.model_id: candidate
+            for candidates in self._candidates.values()
+            for candidate in candidates
+        }
+        candidates: Dict[PredictionType, List[LoadedModel]] = {}
+        for model in models:
+            loaded = loaded_by_id.get(model.id)
+            if loaded is not None and loaded.version == model.version:
+                loaded = dataclasses.replace(
+                    loaded,
+                    status=ModelStatus(model.status),
+                    traffic_percentage=model.traffic_percentage or 0.0,
+                )
+            else:
+                try:
+                    loaded = await load_model(model)
+                except ModelLoadError:
+                    logger.exception("Failed to load candidate model %s", model.id)
+                    continue
+            candidates.setdefault(loaded.prediction_type, []).append(loaded)
+        self._candidates = candidates
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self.refresh_seconds and self._task is None:
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the model registry")
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,116 @@
+"""
+Deduplication of repeated prediction requests.
+
+Each prediction is stored with a ``feature_hash`` of its canonicalized inputs
+and the model that served it. A request with the same hash is answered with
+the stored prediction: first from an in-memory LRU/TTL cache, then by an
+indexed lookup on ``predictions.feature_hash``. Since the model ID and version
+are part of the hash, a deployment starts a fresh set of keys; deploying also
+clears the in-memory cache.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.prediction import Prediction, PredictionModel
+from app.services.cache import LRUCache
+from app.services.inference import LoadedModel
+
+
+def feature_hash(
+    inputs: Dict[str, Any], features: Dict[str, Any], model: LoadedModel
+) -> str:
+    """Hash a prediction's request inputs, features and serving model."""
+    canonical = json.dumps(
+        {
+            "inputs": inputs,
+            "features": features,
+            "model_id": model.model_id,
+            "model_version": model.version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PredictionCache:
+    """In-memory cache of predictions by feature hash, backed by the database."""
+
+    def __init__(
+        self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None
+    ):
+        self._entries = LRUCache(
+            max_size=max_size or settings.prediction_cache_size,
+            ttl_seconds=ttl_seconds or settings.prediction_cache_ttl_seconds,
+        )
+        self.database_hits = 0
+
+    def get(self, key: str) -> Optional[Prediction]:
+        """Get a prediction from memory only."""
+        return self._entries.get(key)
+
+    async def lookup(self, db: AsyncSession, key: str) -> Optional[Prediction]:
+        """Find the latest stored prediction with a feature hash."""
+        result = await db.execute(
+            select(Prediction, PredictionModel.name)
+            .outerjoin(PredictionModel, Prediction.model_id == PredictionModel.id)
+            .where(Prediction.feature_hash == key)
+            .order_by(Prediction.id.desc())
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        prediction, model_name = row
+        prediction.model_name = model_name if model_name else "Unknown"
+        self.database_hits += 1
+        self.store(prediction)
+        return prediction
+
+    async def lookup_many(
+        self, db: AsyncSession, keys: Iterable[str]
+    ) -> Dict[str, Prediction]:
+        """Find the latest stored prediction of each feature hash, in one query."""
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        result = await db.execute(
+            select(Prediction, PredictionModel.name)
+            .outerjoin(PredictionModel, Prediction.model_id == PredictionModel.id)
+            .where(Prediction.feature_hash.in_(keys))
+            .order_by(Prediction.id)
+        )
+        found: Dict[str, Prediction] = {}
+        for prediction, model_name in result:
+            prediction.model_name = model_name if model_name else "Unknown"
+            found[prediction.feature_hash] = prediction
+        self.database_hits += len(found)
+        for prediction in found.values():
+            self.store(prediction)
+        return found
+
+    def store(self, prediction: Prediction) -> None:
+        if prediction.feature_hash:
+            self._entries.set(prediction.feature_hash, prediction)
+
+    def discard(self, key: Optional[str]) -> None:
+        if key:
+            self._entries.discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._entries.stats(), "database_hits": self.database_hits}
+
+
+prediction_cache = PredictionCache()
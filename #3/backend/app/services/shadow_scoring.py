@@ -0,0 +1,119 @@
+"""
+Background scoring of served predictions by candidate models.
+
+After a prediction is returned, the SHADOW and CANARY candidates of its type
+score the same features off the request path, as does the active model when
+a canary served the request. Queued predictions are scored in batches with
+one vectorized call per model, and their ``secondary_predictions`` are
+written with a single bulk UPDATE. Validation then compares every secondary
+estimate with the actual value. A restart only loses the comparisons still
+queued.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.prediction import Prediction, PredictionType
+from app.services.batching import BatchConsumer
+from app.services.inference import LoadedModel, model_registry
+
+
+@dataclass
+class ScoringRequest:
+    """A served prediction waiting to be scored by the other models."""
+
+    prediction_id: int
+    prediction_type: PredictionType
+    features: Dict[str, Any]
+    served_model_id: int
+
+
+def secondary_models(
+    prediction_type: PredictionType, served_model_id: int
+) -> List[LoadedModel]:
+    """The loaded models of a type, other than the one that served a request."""
+    models = list(model_registry.candidates(prediction_type))
+    active = model_registry.get(prediction_type)
+    if active is not None:
+        models.append(active)
+    return [model for model in models if model.model_id != served_model_id]
+
+
+class ShadowScorer(BatchConsumer):
+    """Scores served predictions with candidate models in batches."""
+
+    item_name = "shadow scoring requests"
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: Optional[int] = None,
+        batch_wait_seconds: Optional[float] = None,
+    ):
+        super().__init__(
+            batch_size or settings.shadow_scoring_batch_size,
+            settings.shadow_scoring_batch_wait_seconds
+            if batch_wait_seconds is None
+            else batch_wait_seconds,
+        )
+        self.session_factory = session_factory
+
+    def enqueue(
+        self,
+        prediction_id: int,
+        prediction_type: PredictionType,
+        features: Dict[str, Any],
+        served_model_id: int,
+    ) -> bool:
+        """
+        Queue a served prediction for scoring. Returns False when there is no
+        other model to score it, or the scorer isn't running.
+        """
+        if not self.running or not secondary_models(prediction_type, served_model_id):
+            return False
+        self.put(
+            ScoringRequest(prediction_id, prediction_type, features, served_model_id)
+        )
+        return True
+
+    async def apply(self, requests: List[ScoringRequest]) -> None:
+        groups: Dict[Tuple[PredictionType, int], List[ScoringRequest]] = {}
+        for request in requests:
+            key = (request.prediction_type, request.served_model_id)
+            groups.setdefault(key, []).append(request)
+
+        secondary: Dict[int, List[Dict[str, Any]]] = {}
+        for (prediction_type, served_model_id), group in groups.items():
+            for model in secondary_models(prediction_type, served_model_id):
+                estimates = model.predict([request.features for request in group])
+                for request, estimate in zip(group, estimates):
+                    secondary.setdefault(request.prediction_id, []).append(
+                        {
+                            "model_id": model.model_id,
+                            "model_name": model.name,
+                            "model_version": model.version,
+                            "model_status": model.status.value,
+                            "predicted_value": estimate.value,
+                            "confidence_score": estimate.confidence,
+                        }
+                    )
+        if not secondary:
+            return
+
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Prediction),
+                [
+                    {"id": prediction_id, "secondary_predictions": entries}
+                    for prediction_id, entries in secondary.items()
+                ],
+            )
+            await db.commit()
+
+
+shadow_scorer = ShadowScorer()
@@ -0,0 +1,619 @@
+"""
+Nearest-neighbour index over completed tasks, for similar-task features.
+
+Every TaskFeature and Issue with an actual effort value is indexed by its
+title and description. Text becomes a hashed bag of word unigrams and
+bigrams: each n-gram adds ±1 to one of ``DIMENSIONS`` slots, and the vector
+is L2-normalized and quantized to int8. Cosine similarity is then a dot
+product.
+
+Vectors, row metadata and cluster assignments are appended to raw files
+under ``DATA_DIR/similarity`` and memory-mapped on startup, so a restart
+doesn't re-vectorize history. Small indexes are searched exhaustively. Past
+``IVF_MIN_ROWS`` rows, spherical k-means clusters the vectors and a query
+only scans the rows of its closest clusters (an inverted file), plus the
+rows added since the cluster lists were last sorted.
+
+A background task appends rows added to the database since the last sync,
+tracked by an ID watermark per table. Only one process writes the files: the
+one holding a lock on ``writer.lock``. It records the row count in
+``state.json``, which is replaced atomically, and the other processes re-map
+that many rows read-only whenever the state changes. Retraining writes the
+centroids and cluster assignments as a new generation of files, named by
+the row count they were trained on, so a reader never pairs one
+generation's centroids with another's assignments. If the writer exits, the
+next process to try the lock takes over.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import DATA_DIR, settings
+from app.core.database import AsyncSessionLocal
+from app.models.github import Issue
+from app.models.prediction import TaskFeature
+
+if os.name == "nt":  # Windows
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+# Width of the hashed n-gram vectors; a power of two
+DIMENSIONS = 256
+
+# Below this many rows every query scans the whole index
+IVF_MIN_ROWS = 20000
+
+# Rows added after the inverted lists were sorted are scanned exhaustively;
+# past this many, the lists are rebuilt
+MAX_UNLISTED_ROWS = 10000
+
+# Hash collisions give unrelated texts small positive similarities; weaker
+# matches than this aren't neighbours
+MIN_SIMILARITY = 0.3
+
+# Rows sampled to fit the cluster centroids, and the k-means iterations
+TRAINING_SAMPLE_SIZE = 100000
+TRAINING_ITERATIONS = 10
+
+# Rows vectorized and appended per sync step
+SYNC_CHUNK_SIZE = 5000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+ROW_DTYPE = np.dtype(
+    [
+        ("source", np.uint8),
+        ("source_id", np.int64),
+        ("hours", np.float32),
+        ("story_points", np.float32),
+    ]
+)
+
+# Indexed tables: source code and the id, title, description, actual hours
+# and actual story points columns
+SOURCES = {
+    "task_feature": (
+        0,
+        TaskFeature.id,
+        TaskFeature.task_title,
+        TaskFeature.task_description,
+        TaskFeature.actual_hours,
+        TaskFeature.actual_story_points,
+    ),
+    "issue": (
+        1,
+        Issue.id,
+        Issue.title,
+        Issue.body,
+        Issue.actual_hours,
+        Issue.story_points,
+    ),
+}
+
+
+def vectorize(text: str) -> np.ndarray:
+    """Hash a text's word unigrams and bigrams into a unit vector."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    grams = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for gram in grams:
+        hashed = zlib.crc32(gram.encode())
+        vector[hashed & (DIMENSIONS - 1)] += 1.0 if hashed & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _quantize(vectors: np.ndarray) -> np.ndarray:
+    return np.round(vectors * 127).astype(np.int8)
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid of each row, in bounded chunks."""
+    return np.concatenate(
+        [
+            np.argmax(
+                vectors[start : start + 65536].astype(np.float32) @ centroids.T,
+                axis=1,
+            ).astype(np.int32)
+            for start in range(0, len(vectors), 65536)
+        ]
+    )
+
+
+def train_centroids(vectors: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Fit spherical k-means centroids to a sample of the vectors."""
+    rng = np.random.default_rng(seed)
+    count = len(vectors)
+    sample_size = min(count, TRAINING_SAMPLE_SIZE)
+    sample = vectors[np.sort(rng.choice(count, sample_size, replace=False))]
+    sample = sample.astype(np.float32) / 127
+    n_lists = int(min(4096, max(1, 2 * np.sqrt(count))))
+
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)]
+    for _ in range(TRAINING_ITERATIONS):
+        assignments = _nearest(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        # Clusters that lost every row restart from a random sample row
+        empty = np.bincount(assignments, minlength=n_lists) == 0
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms == 0, 1.0, norms)
+    return centroids.astype(np.float32)
+
+
+@dataclass
+class _Snapshot:
+    """An immutable view of the index that searches read."""
+
+    vectors: np.ndarray
+    rows: np.ndarray
+    centroids: Optional[np.ndarray] = None
+    # Row numbers sorted by cluster, and where each cluster starts in them
+    order: Optional[np.ndarray] = None
+    starts: Optional[np.ndarray] = None
+
+    @property
+    def listed_rows(self) -> int:
+        return 0 if self.order is None else len(self.order)
+
+    def candidates(self, query: np.ndarray, probes: int) -> Optional[np.ndarray]:
+        """Row numbers to scan for a query, or None to scan them all."""
+        if self.order is None:
+            return None
+        closest = np.argsort(self.centroids @ query)[-probes:]
+        listed = [self.order[self.starts[c] : self.starts[c + 1]] for c in closest]
+        unlisted = np.arange(self.listed_rows, len(self.rows))
+        return np.concatenate(listed + [unlisted])
+
+
+@dataclass
+class _Files:
+    directory: Path
+    vectors: Path = field(init=False)
+    rows: Path = field(init=False)
+    state: Path = field(init=False)
+    writer_lock: Path = field(init=False)
+
+    def __post_init__(self):
+        self.vectors = self.directory / "vectors.i8"
+        self.rows = self.directory / "rows.bin"
+        self.state = self.directory / "state.json"
+        self.writer_lock = self.directory / "writer.lock"
+
+    # Clusters trained on the first ``trained_rows`` rows
+    def centroids(self, trained_rows: int) -> Path:
+        return self.directory / f"centroids-{trained_rows}.npy"
+
+    def assignments(self, trained_rows: int) -> Path:
+        return self.directory / f"assignments-{trained_rows}.i4"
+
+    def generations(self) -> List[Path]:
+        return [
+            *self.directory.glob("centroids*.npy"),
+            *self.directory.glob("assignments*.i4"),
+        ]
+
+
+def _map(path: Path, dtype, count: int, width: Optional[int] = None) -> np.ndarray:
+    shape = (count, width) if width else (count,)
+    if count == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _stored_count(path: Path, itemsize: int) -> int:
+    return path.stat().st_size // itemsize if path.exists() else 0
+
+
+def _append(path: Path, array: np.ndarray) -> None:
+    with open(path, "ab") as f:
+        f.write(np.ascontiguousarray(array).tobytes())
+
+
+def _truncate(path: Path, size: int) -> None:
+    if path.exists() and path.stat().st_size > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+def _try_lock(file) -> bool:
+    """Take an exclusive lock on an open file without waiting."""
+    try:
+        if os.name == "nt":
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class SimilarityIndex:
+    """Process-wide nearest-neighbour index of completed tasks."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        refresh_seconds: Optional[float] = None,
+    ):
+        self.files = _Files(directory or DATA_DIR / "similarity")
+        self.session_factory = session_factory
+        self.refresh_seconds = (
+            settings.similarity_index_refresh_seconds
+            if refresh_seconds is None
+            else refresh_seconds
+        )
+        self.watermarks: Dict[str, int] = {name: 0 for name in SOURCES}
+        self.trained_rows = 0
+        # Open while this process holds the writer lock
+        self._writer_lock_file = None
+        self._state: Dict = {}
+        self._snapshot = _Snapshot(
+            vectors=np.empty((0, DIMENSIONS), dtype=np.int8),
+            rows=np.empty(0, dtype=ROW_DTYPE),
+        )
+        self._lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.rows)
+
+    @property
+    def is_writer(self) -> bool:
+        return self._writer_lock_file is not None
+
+    def search(self, text: str, k: Optional[int] = None) -> List[Tuple[float, np.void]]:
+        """Find the k indexed tasks most similar to a text, best first."""
+        k = k or settings.similarity_top_k
+        snapshot = self._snapshot
+        query = vectorize(text)
+        if not len(snapshot.rows) or not query.any():
+            return []
+
+        candidates = snapshot.candidates(query, settings.similarity_index_probes)
+        vectors = (
+            snapshot.vectors if candidates is None else snapshot.vectors[candidates]
+        )
+        scores = vectors.astype(np.float32) @ query / 127
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = top if candidates is None else candidates[top]
+        return [
+            (float(scores[i]), snapshot.rows[row])
+            for i, row in zip(top, rows)
+            if scores[i] >= MIN_SIMILARITY
+        ]
+
+    def similar_averages(
+        self, text: str, k: Optional[int] = None
+    ) -> Dict[str, Optional[float]]:
+        """Average actual effort of the k most similar completed tasks."""
+        neighbours = [row for _, row in self.search(text, k)]
+        averages = {}
+        for feature, column in (
+            ("similar_task_avg_hours", "hours"),
+            ("similar_task_avg_story_points", "story_points"),
+        ):
+            values = [row[column] for row in neighbours if not np.isnan(row[column])]
+            averages[feature] = round(float(np.mean(values)), 4) if values else None
+        return averages
+
+    def acquire_writer(self) -> bool:
+        """
+        Become the process that writes the index, if no other process is.
+        The lock is held until ``release_writer`` or the process exits.
+        """
+        if self.is_writer:
+            return True
+        self.files.directory.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.files.writer_lock, "a+b")
+        if not _try_lock(lock_file):
+            lock_file.close()
+            return False
+        self._writer_lock_file = lock_file
+        return True
+
+    def release_writer(self) -> None:
+        if self._writer_lock_file is not None:
+            # Closing the file releases the lock
+            self._writer_lock_file.close()
+            self._writer_lock_file = None
+
+    def load(self) -> None:
+        """
+        Map the persisted index as its writer, dropping rows a crash left
+        half-written.
+        """
+        state = self._read_state()
+        if state.get("dimensions", DIMENSIONS) != DIMENSIONS:
+            logger.warning("Similarity index dimensions changed; rebuilding it")
+            for path in (self.files.vectors, self.files.rows, self.files.state):
+                path.unlink(missing_ok=True)
+            state = {}
+
+        self.watermarks.update(state.get("watermarks", {}))
+        self.trained_rows = state.get("trained_rows", 0)
+        centroids_path = self.files.centroids(self.trained_rows)
+        centroids = (
+            np.load(centroids_path)
+            if self.trained_rows and centroids_path.exists()
+            else None
+        )
+
+        count = min(
+            _stored_count(self.files.vectors, DIMENSIONS),
+            _stored_count(self.files.rows, ROW_DTYPE.itemsize),
+        )
+        if "rows" in state:
+            # Rows appended after the state was last saved are synced again
+            count = min(count, state["rows"])
+        _truncate(self.files.vectors, count * DIMENSIONS)
+        _truncate(self.files.rows, count * ROW_DTYPE.itemsize)
+        assignments_path = self.files.assignments(self.trained_rows)
+        if centroids is None or _stored_count(assignments_path, 4) < count:
+            # Assignments lag behind the vectors; the clusters are retrained
+            centroids = None
+            self.trained_rows = 0
+        else:
+            _truncate(assignments_path, count * 4)
+        self._remove_generations(keep=self.trained_rows)
+
+        self._remap(count, centroids, self.trained_rows, sort=True)
+        self._save_state()
+        if centroids is None and count >= IVF_MIN_ROWS:
+            self.add(np.empty((0, DIMENSIONS)), np.empty(0, dtype=ROW_DTYPE))
+
+    def refresh(self) -> bool:
+        """
+        Re-map the index as the writer process last saved it.
+        Returns False when nothing changed or the files moved on meanwhile.
+        """
+        state = self._read_state()
+        if (
+            state == self._state
+            or state.get("dimensions") != DIMENSIONS
+            or "rows" not in state
+        ):
+            return False
+
+        trained_rows = state["trained_rows"]
+        retrained = trained_rows != self.trained_rows
+        centroids = self._snapshot.centroids
+        unlisted = state["rows"] - self._snapshot.listed_rows
+        try:
+            if retrained:
+                centroids = (
+                    np.load(self.files.centroids(trained_rows))
+                    if trained_rows
+                    else None
+                )
+            self._remap(
+                state["rows"],
+                centroids,
+                trained_rows,
+                sort=retrained or unlisted > MAX_UNLISTED_ROWS,
+            )
+        except FileNotFoundError:
+            # The writer retrained since the state was read; the next
+            # refresh maps the new generation
+            return False
+        self.watermarks.update(state["watermarks"])
+        self.trained_rows = trained_rows
+        self._state = state
+        return True
+
+    def _read_state(self) -> Dict:
+        if not self.files.state.exists():
+            return {}
+        return json.loads(self.files.state.read_text())
+
+    def _remove_generations(self, keep: int) -> None:
+        """Delete the cluster files of every generation but ``keep``."""
+        current = {self.files.centroids(keep), self.files.assignments(keep)}
+        for path in self.files.generations():
+            if path not in current:
+                path.unlink(missing_ok=True)
+
+    def _remap(
+        self,
+        count: int,
+        centroids: Optional[np.ndarray],
+        trained_rows: int,
+        sort: bool = False,
+    ) -> None:
+        previous = self._snapshot
+        snapshot = _Snapshot(
+            vectors=_map(self.files.vectors, np.int8, count, DIMENSIONS),
+            rows=_map(self.files.rows, ROW_DTYPE, count),
+            centroids=centroids,
+        )
+        if centroids is not None:
+            if sort or previous.order is None:
+                assignments = _map(
+                    self.files.assignments(trained_rows), np.int32, count
+                )
+                snapshot.order = np.argsort(assignments, kind="stable")
+                snapshot.starts = np.searchsorted(
+                    assignments[snapshot.order], np.arange(len(centroids) + 1)
+                )
+            else:
+                snapshot.order, snapshot.starts = previous.order, previous.starts
+        self._snapshot = snapshot
+
+    def _save_state(self) -> None:
+        """Record the mapped rows for readers, replacing the file atomically."""
+        self._state = {
+            "dimensions": DIMENSIONS,
+            "rows": len(self),
+            "watermarks": self.watermarks,
+            "trained_rows": self.trained_rows,
+        }
+        temporary = self.files.state.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self._state))
+        os.replace(temporary, self.files.state)
+
+    def add(
+        self,
+        vectors: np.ndarray,
+        rows: np.ndarray,
+        watermarks: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        Append vectorized rows, reorganizing the clusters when due. The sync
+        watermarks are saved with the rows, so a restart neither skips nor
+        repeats any. Only the writer process may add rows.
+        """
+        if not self.is_writer:
+            raise RuntimeError("Only the similarity index writer can add rows")
+
+        count = len(self) + len(rows)
+        centroids = self._snapshot.centroids
+        if len(rows):
+            quantized = _quantize(vectors)
+            _append(self.files.vectors, quantized)
+            _append(self.files.rows, rows)
+            if centroids is not None:
+                _append(
+                    self.files.assignments(self.trained_rows),
+                    _nearest(quantized, centroids),
+                )
+
+        if count >= IVF_MIN_ROWS and count >= 4 * self.trained_rows:
+            # Searches keep using the current snapshot while this trains
+            stored = _map(self.files.vectors, np.int8, count, DIMENSIONS)
+            centroids = train_centroids(stored)
+            self.files.assignments(count).unlink(missing_ok=True)
+            _append(self.files.assignments(count), _nearest(stored, centroids))
+            np.save(self.files.centroids(count), centroids)
+            self.trained_rows = count
+            self._remap(count, centroids, count, sort=True)
+        else:
+            unlisted = count - self._snapshot.listed_rows
+            self._remap(
+                count,
+                centroids,
+                self.trained_rows,
+                sort=unlisted > MAX_UNLISTED_ROWS,
+            )
+        self.watermarks.update(watermarks or {})
+        self._save_state()
+        # Readers mapping the previous generation keep their open mappings
+        self._remove_generations(keep=self.trained_rows)
+
+    async def sync(self) -> int:
+        """
+        Index the completed tasks added to the database since the last sync.
+        In a process that isn't the writer, re-map the writer's rows instead.
+        """
+        added = 0
+        async with self._lock:
+            if not self.is_writer:
+                if await asyncio.to_thread(self.acquire_writer):
+                    logger.info("Took over writing the similarity index")
+                    await asyncio.to_thread(self.load)
+                else:
+                    await asyncio.to_thread(self.refresh)
+                    return 0
+
+            for name, (source, id_column, *columns) in SOURCES.items():
+                hours, story_points = columns[2:]
+                while True:
+                    async with self.session_factory() as db:
+                        result = await db.execute(
+                            select(id_column, *columns)
+                            .where(
+                                id_column > self.watermarks[name],
+                                or_(hours.isnot(None), story_points.isnot(None)),
+                            )
+                            .order_by(id_column)
+                            .limit(SYNC_CHUNK_SIZE)
+                        )
+                        batch = result.all()
+                    if not batch:
+                        break
+                    vectors, rows = await asyncio.to_thread(
+                        self._vectorize_batch, source, batch
+                    )
+                    await asyncio.to_thread(
+                        self.add, vectors, rows, {name: batch[-1][0]}
+                    )
+                    added += len(rows)
+        return added
+
+    @staticmethod
+    def _vectorize_batch(source: int, batch: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+        batch = list(batch)
+        vectors = np.array(
+            [vectorize(f"{title} {body or ''}") for _, title, body, _, _ in batch],
+            dtype=np.float32,
+        ).reshape(len(batch), DIMENSIONS)
+        rows = np.array(
+            [
+                (
+                    source,
+                    source_id,
+                    np.nan if hours is None else hours,
+                    np.nan if story_points is None else story_points,
+                )
+                for source_id, _, _, hours, story_points in batch
+            ],
+            dtype=ROW_DTYPE,
+        )
+        return vectors, rows
+
+    def notify(self) -> None:
+        """Ask the background task to sync now, e.g. after a task completes."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        if await asyncio.to_thread(self.acquire_writer):
+            await asyncio.to_thread(self.load)
+        else:
+            await asyncio.to_thread(self.refresh)
+        # History is indexed in the background, so startup never waits on it
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.release_writer()
+
+    async def _sync_periodically(self) -> None:
+        while True:
+            try:
+                added = await self.sync()
+                if added:
+                    logger.info("Indexed %s completed tasks", added)
+            except Exception:
+                logger.exception("Failed to sync the similarity index")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,286 @@
+"""
+In-process background queue for repository syncs.
+
+Sync requests are persisted as SyncJob rows and handed to a pool of asyncio
+workers, so the API can answer immediately with a job ID. A repository has at
+most one queued or running job; further requests for it coalesce into that
+job, which a partial unique index enforces across processes. Workers claim a
+job with a conditional update, so only one of them runs it, and renew a
+heartbeat while it runs. Queued jobs, and running jobs whose heartbeat is
+older than the lease, are picked up again on the next start, and the sync
+engine resumes them from their last committed page.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.github import SyncJob, SyncJobStatus
+from app.services.analytics_cache import analytics_cache
+from app.services.bulk_upsert import UpsertCounts
+from app.services.github_client import GitHubAPIError, GitHubClient
+from app.services.github_sync import GitHubSyncEngine
+
+# SyncJob progress column for each sync engine resource
+PROGRESS_COLUMNS = {
+    "issues": "issues_synced",
+    "pulls": "pull_requests_synced",
+    "commits": "commits_synced",
+}
+
+ACTIVE_STATUSES = (SyncJobStatus.QUEUED, SyncJobStatus.RUNNING)
+
+logger = logging.getLogger(__name__)
+
+
+class SyncJobQueue:
+    """Persisted job queue processed by a pool of asyncio workers."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        concurrency: Optional[int] = None,
+        client_factory: Callable[[str], GitHubClient] = GitHubClient,
+        lease_seconds: Optional[int] = None,
+        heartbeat_seconds: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.sync_worker_concurrency
+        self.client_factory = client_factory
+        self.lease = timedelta(seconds=lease_seconds or settings.sync_job_lease_seconds)
+        self.heartbeat_seconds = (
+            heartbeat_seconds or settings.sync_job_heartbeat_seconds
+        )
+        # Created by start() so it binds to the application's event loop
+        self._queue: Optional["asyncio.Queue[int]"] = None
+        self._workers: List[asyncio.Task] = []
+        # Tokens passed with a request are kept in memory only, never persisted
+        self._tokens: Dict[int, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def _claimable(self, now: datetime):
+        """Jobs that are queued, or running under an expired lease."""
+        last_seen = func.coalesce(
+            SyncJob.heartbeat_at, SyncJob.started_at, SyncJob.created_at
+        )
+        return or_(
+            SyncJob.status == SyncJobStatus.QUEUED,
+            and_(
+                SyncJob.status == SyncJobStatus.RUNNING,
+                last_seen < now - self.lease,
+            ),
+        )
+
+    async def start(self) -> None:
+        """
+        Re-queue queued jobs and jobs whose worker stopped renewing its lease,
+        then start the workers.
+        """
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(SyncJob.id)
+                .where(self._claimable(datetime.utcnow()))
+                .order_by(SyncJob.id)
+            )
+            for job_id in result.scalars():
+                self._queue.put_nowait(job_id)
+
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers. Interrupted jobs stay running in the database and
+        are re-queued by the next start once their lease has expired.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self,
+        repository_full_name: str,
+        github_token: Optional[str] = None,
+        full_resync: bool = False,
+    ) -> Tuple[SyncJob, bool]:
+        """
+        Queue a sync, or return the repository's active job if it has one.
+        Returns the job and whether it was newly created.
+        """
+        if not self.running:
+            raise RuntimeError("Sync job queue has not been started")
+
+        async with self.session_factory() as db:
+            while True:
+                job = await db.scalar(
+                    select(SyncJob).where(
+                        SyncJob.repository_full_name == repository_full_name,
+                        SyncJob.status.in_(ACTIVE_STATUSES),
+                    )
+                )
+                if job is not None:
+                    return job, False
+
+                job = SyncJob(
+                    repository_full_name=repository_full_name,
+                    status=SyncJobStatus.QUEUED,
+                    full_resync=full_resync,
+                    created_at=datetime.utcnow(),
+                )
+                db.add(job)
+                try:
+                    await db.commit()
+                    break
+                except IntegrityError:
+                    # Another request queued a job for the repository first
+                    await db.rollback()
+
+        if github_token:
+            self._tokens[job.id] = github_token
+        self._queue.put_nowait(job.id)
+        return job, True
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                try:
+                    await self._finish(job_id, SyncJobStatus.FAILED, error=str(e))
+                except Exception:
+                    # The lease expires and the job is re-queued on a restart
+                    logger.exception("Failed to record sync job %s as failed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, job_id: int) -> Optional[SyncJob]:
+        """
+        Mark the job running if it's still claimable. Returns None when another
+        worker, in this or another process, claimed or finished it first.
+        """
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(SyncJob)
+                .where(SyncJob.id == job_id, self._claimable(now))
+                .values(status=SyncJobStatus.RUNNING, started_at=now, heartbeat_at=now)
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                return None
+            return await db.get(SyncJob, job_id)
+
+    async def _heartbeat(self, job_id: int) -> None:
+        """Renew the job's lease until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(SyncJob)
+                        .where(
+                            SyncJob.id == job_id,
+                            SyncJob.status == SyncJobStatus.RUNNING,
+                        )
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    await db.commit()
+            except Exception:
+                logger.exception("Failed to renew the lease of sync job %s", job_id)
+
+    async def _run(self, job_id: int) -> None:
+        job = await self._claim(job_id)
+        if job is None:
+            self._tokens.pop(job_id, None)
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await self._sync(job)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _sync(self, job: SyncJob) -> None:
+        job_id = job.id
+        token = self._tokens.pop(job_id, None) or settings.github_token
+        if not token:
+            await self._finish(
+                job_id, SyncJobStatus.FAILED, error="GitHub token is required"
+            )
+            return
+
+        async def record_progress(resource: str, counts: UpsertCounts) -> None:
+            column = getattr(SyncJob, PROGRESS_COLUMNS[resource])
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(SyncJob)
+                    .where(SyncJob.id == job_id)
+                    .values({column: column + counts.total})
+                )
+                await db.commit()
+
+        try:
+            async with self.client_factory(token) as client:
+                engine = GitHubSyncEngine(
+                    client,
+                    session_factory=self.session_factory,
+                    on_progress=record_progress,
+                )
+                result = await engine.sync_repository(
+                    job.repository_full_name, full_resync=job.full_resync
+                )
+        except GitHubAPIError as e:
+            await self._finish(
+                job_id, SyncJobStatus.FAILED, error=f"GitHub API error: {e.message}"
+            )
+            return
+        except httpx.HTTPError as e:
+            await self._finish(
+                job_id, SyncJobStatus.FAILED, error=f"GitHub API unreachable: {e}"
+            )
+            return
+
+        await analytics_cache.invalidate_repositories(result.repository_id)
+        await self._finish(
+            job_id,
+            SyncJobStatus.COMPLETED,
+            repository_id=result.repository_id,
+            result={
+                "issues": asdict(result.issues),
+                "pull_requests": asdict(result.pull_requests),
+                "commits": asdict(result.commits),
+            },
+        )
+
+    async def _finish(self, job_id: int, status: SyncJobStatus, **values) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                update(SyncJob)
+                .where(SyncJob.id == job_id)
+                .values(status=status, finished_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+
+sync_job_queue = SyncJobQueue()
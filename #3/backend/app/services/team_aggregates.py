@@ -0,0 +1,130 @@
+"""
+Stored team aggregates, kept current as the data behind them changes.
+
+Team rows carry their active member count and seniority counts, average
+completed-sprint velocity and estimation accuracy, so a team serializes
+without loading its members or rescanning its history:
+
+- member changes recount the team's active members with correlated counts
+  over the ``(team_id, is_active)`` index
+- completing a sprint re-averages the velocity of the team's completed sprints
+- validating a prediction folds it into the accuracy's running mean in O(1)
+
+The average cycle time is kept as stored: issues aren't linked to teams, and
+a prediction's actual hours measure effort, not cycle time.
+
+Each update is a single atomic UPDATE in the caller's transaction; commit it
+with the change. ``rebuild_team_aggregates`` recomputes every team from
+scratch, keeping a stored metric for teams with no history behind it.
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.prediction import Prediction, PredictionStatus
+from app.models.team import SeniorityLevel, Sprint, Team, TeamMember
+
+
+def _running_mean_expression(column, count_column, value: float):
+    return (func.coalesce(column, 0.0) * count_column + value) / (count_column + 1)
+
+
+def _member_values() -> Dict[str, Any]:
+    """SET values recounting the active members of each updated team."""
+    active = select(func.count(TeamMember.id)).where(
+        TeamMember.team_id == Team.id, TeamMember.is_active == True
+    )
+    values = {"current_size": active.scalar_subquery()}
+    for level in SeniorityLevel:
+        values[f"{level.value}_count"] = active.where(
+            TeamMember.seniority_level == level
+        ).scalar_subquery()
+    return values
+
+
+def _velocity_value():
+    """SET value averaging the velocity of each updated team's completed sprints."""
+    velocity = select(func.avg(Sprint.velocity)).where(
+        Sprint.team_id == Team.id, Sprint.is_completed == True
+    )
+    return func.coalesce(velocity.scalar_subquery(), Team.average_velocity)
+
+
+async def refresh_team_members(db: AsyncSession, team_id: int) -> None:
+    """
+    Recount a team's active members after members join, leave or change level.
+    Pending member changes are flushed first so the counts include them.
+    """
+    await db.flush()
+    await db.execute(
+        update(Team)
+        .where(Team.id == team_id)
+        .values(**_member_values())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_sprint_completion(db: AsyncSession, sprint: Sprint) -> None:
+    """Re-average a team's velocity once one of its sprints is completed."""
+    await db.flush()
+    await db.execute(
+        update(Team)
+        .where(Team.id == sprint.team_id)
+        .values(average_velocity=_velocity_value())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_team_validation(db: AsyncSession, prediction: Prediction) -> None:
+    """Fold a newly validated prediction into its team's accuracy."""
+    if prediction.team_id is None:
+        return
+
+    count = Team.validated_prediction_count
+    await db.execute(
+        update(Team)
+        .where(Team.id == prediction.team_id)
+        .values(
+            estimation_accuracy_score=_running_mean_expression(
+                Team.estimation_accuracy_score,
+                count,
+                prediction.accuracy_percentage / 100,
+            ),
+            validated_prediction_count=count + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_team_aggregates(db: Session) -> int:
+    """
+    Recompute every team's aggregates from its members, sprints and validated
+    predictions. Returns the number of teams updated.
+    """
+    validated = and_(
+        Prediction.team_id == Team.id,
+        Prediction.status == PredictionStatus.VALIDATED,
+        Prediction.is_validated,
+    )
+
+    def aggregate(expression, criteria):
+        return select(expression).where(criteria).scalar_subquery()
+
+    result = db.execute(
+        update(Team)
+        .values(
+            **_member_values(),
+            average_velocity=_velocity_value(),
+            estimation_accuracy_score=func.coalesce(
+                aggregate(func.avg(Prediction.accuracy_percentage) / 100, validated),
+                Team.estimation_accuracy_score,
+            ),
+            validated_prediction_count=aggregate(func.count(Prediction.id), validated),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
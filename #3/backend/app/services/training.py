@@ -0,0 +1,391 @@
+"""
+Offline training of prediction models from TaskFeature history.
+
+For each prediction type with a target column, completed task features are
+streamed from the database in chunks into NumPy arrays. Candidate
+scikit-learn estimators are cross-validated in parallel worker processes, and
+the best one is refit, scored on a holdout split and written to
+``DATA_DIR/models`` with its feature scaler. Each run is recorded as a new
+PredictionModel. It is deployed when it beats the active model's holdout
+MAE; the API's model registry picks it up on its next refresh.
+
+The scheduler runs the pipeline in a separate process every
+``model_retrain_interval_hours``, so training never competes with request
+handling on the API's event loop. Every API worker runs a scheduler; a run
+starts by claiming the TrainingClaim row, committed before any data is
+loaded, so only one process trains per interval.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, cross_val_score, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import DATA_DIR, settings
+from app.core.database import get_database_session
+from app.services.analytics_cache import analytics_cache
+from app.services.artifacts import cache_artifact
+from app.services.bulk_upsert import dialect_insert
+from app.services.feature_store import STORE_FEATURE_COLUMNS
+from app.models.prediction import (
+    ModelStatus,
+    PredictionModel,
+    PredictionType,
+    TaskFeature,
+    TrainingClaim,
+)
+
+logger = logging.getLogger(__name__)
+
+# Features recorded on TaskFeature that are also available at request time,
+# from extract_features or the feature store; training on anything else would
+# skew served predictions
+FEATURE_COLUMNS = [
+    "title_word_count",
+    "description_word_count",
+    *STORE_FEATURE_COLUMNS,
+]
+
+# Target column for each prediction type that can be trained
+TARGET_COLUMNS = {
+    PredictionType.STORY_POINTS: "actual_story_points",
+    PredictionType.HOURS: "actual_hours",
+}
+
+# Candidate estimators and their hyperparameters, keyed by model_type
+CANDIDATES = {
+    "linear_regression": (LinearRegression, {}),
+    "ridge": (Ridge, {"alpha": 1.0}),
+    "random_forest": (
+        RandomForestRegressor,
+        {
+            "n_estimators": 100,
+            "max_depth": 10,
+            "min_samples_split": 5,
+            "random_state": 0,
+        },
+    ),
+    "gradient_boosting": (
+        GradientBoostingRegressor,
+        {
+            "n_estimators": 100,
+            "max_depth": 3,
+            "learning_rate": 0.1,
+            "random_state": 0,
+        },
+    ),
+}
+
+# Share of the data held out to score the selected model
+HOLDOUT_FRACTION = 0.2
+
+# TrainingClaim row claimed by the scheduler and the training script
+TRAINING_CLAIM_NAME = "model_training"
+
+
+@dataclass
+class TrainingResult:
+    """Outcome of training one prediction type."""
+
+    prediction_type: PredictionType
+    model_id: int
+    model_type: str
+    cross_validation_score: float
+    mae: float
+    deployed: bool
+
+
+def _build_estimator(model_type: str):
+    estimator_class, hyperparameters = CANDIDATES[model_type]
+    return estimator_class(**hyperparameters)
+
+
+def load_training_data(
+    db: Session, prediction_type: PredictionType, chunk_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stream task features with a known target into a feature matrix and a
+    target vector. Missing feature values become 0.
+    """
+    target = getattr(TaskFeature, TARGET_COLUMNS[prediction_type])
+    result = db.execute(
+        select(*(getattr(TaskFeature, column) for column in FEATURE_COLUMNS), target)
+        .where(target.isnot(None))
+        .order_by(TaskFeature.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    chunks = [
+        np.array(partition, dtype=np.float64) for partition in result.partitions()
+    ]
+    if not chunks:
+        return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0)
+
+    data = np.nan_to_num(np.concatenate(chunks))
+    return data[:, :-1], data[:, -1]
+
+
+def cross_validate(
+    model_type: str, X: np.ndarray, y: np.ndarray, folds: int
+) -> Tuple[str, float]:
+    """Mean cross-validated R² of a candidate; runs in a worker process."""
+    pipeline = make_pipeline(StandardScaler(), _build_estimator(model_type))
+    scores = cross_val_score(
+        pipeline, X, y, cv=KFold(folds, shuffle=True, random_state=0), scoring="r2"
+    )
+    return model_type, float(np.mean(scores))
+
+
+def select_candidate(
+    X: np.ndarray, y: np.ndarray, folds: int, max_workers: int
+) -> Tuple[str, float]:
+    """Cross-validate every candidate in a process pool and pick the best."""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        count = len(CANDIDATES)
+        scores = list(
+            executor.map(
+                cross_validate, CANDIDATES, [X] * count, [y] * count, [folds] * count
+            )
+        )
+    return max(scores, key=lambda score: score[1])
+
+
+def _deploy(db: Session, model: PredictionModel) -> None:
+    # Shadow and canary models keep being evaluated against the new model
+    db.execute(
+        update(PredictionModel)
+        .where(
+            PredictionModel.prediction_type == model.prediction_type,
+            PredictionModel.status == ModelStatus.ACTIVE,
+            PredictionModel.id != model.id,
+        )
+        .values(status=ModelStatus.DEPRECATED)
+    )
+    model.status = ModelStatus.ACTIVE
+    model.deployed_at = datetime.utcnow()
+
+
+def _should_deploy(db: Session, model: PredictionModel) -> bool:
+    """A trained model replaces an untrained active model, or a worse one."""
+    active = db.scalar(
+        select(PredictionModel)
+        .where(
+            PredictionModel.prediction_type == model.prediction_type,
+            PredictionModel.status == ModelStatus.ACTIVE,
+        )
+        .order_by(PredictionModel.deployed_at.desc().nulls_last())
+        .limit(1)
+    )
+    if active is None or not active.model_file_path or active.mae is None:
+        return True
+    return model.mae <= active.mae
+
+
+def train_model(
+    db: Session,
+    prediction_type: PredictionType,
+    chunk_size: Optional[int] = None,
+    folds: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> Optional[TrainingResult]:
+    """
+    Train, record and possibly deploy a model for one prediction type.
+    Returns None when there isn't enough training data.
+    """
+    X, y = load_training_data(
+        db, prediction_type, chunk_size or settings.model_training_chunk_size
+    )
+    if len(y) < settings.model_training_min_samples:
+        return None
+
+    started_at = datetime.utcnow()
+    version = started_at.strftime("%Y%m%d.%H%M%S")
+    model = PredictionModel(
+        name=f"{prediction_type.value.replace('_', ' ').title()} Estimator",
+        version=version,
+        model_type="pending",
+        prediction_type=prediction_type,
+        status=ModelStatus.TRAINING,
+        feature_columns=FEATURE_COLUMNS,
+        training_started_at=started_at,
+    )
+    db.add(model)
+    db.commit()
+
+    try:
+        folds = min(folds or settings.model_training_cv_folds, len(y))
+        model_type, cv_score = select_candidate(
+            X, y, folds, max_workers or settings.model_training_workers
+        )
+
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=HOLDOUT_FRACTION, random_state=0
+        )
+        scaler = StandardScaler().fit(X_train)
+        estimator = _build_estimator(model_type).fit(scaler.transform(X_train), y_train)
+        predicted = estimator.predict(scaler.transform(X_test))
+
+        # Paths are stored relative to DATA_DIR, where inference resolves them
+        model_path = f"models/{prediction_type.value}-{version}.joblib"
+        scaler_path = f"models/{prediction_type.value}-{version}-scaler.joblib"
+        (DATA_DIR / "models").mkdir(parents=True, exist_ok=True)
+        joblib.dump(estimator, DATA_DIR / model_path)
+        joblib.dump(scaler, DATA_DIR / scaler_path)
+        # Build the shared cache entries once, rather than in every API worker
+        cache_artifact(DATA_DIR / model_path)
+        cache_artifact(DATA_DIR / scaler_path)
+
+        model.model_type = model_type
+        model.description = f"{model_type} trained on {len(y)} task features"
+        model.hyperparameters = CANDIDATES[model_type][1]
+        model.model_file_path = model_path
+        model.feature_scaler_path = scaler_path
+        model.cross_validation_score = cv_score
+        model.mae = float(mean_absolute_error(y_test, predicted))
+        model.mse = float(mean_squared_error(y_test, predicted))
+        model.r2_score = float(r2_score(y_test, predicted))
+        model.training_data_size = len(y_train)
+        model.validation_data_size = len(y_test)
+        model.training_completed_at = datetime.utcnow()
+
+        deployed = _should_deploy(db, model)
+        if deployed:
+            _deploy(db, model)
+        else:
+            model.status = ModelStatus.DEPRECATED
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        model.status = ModelStatus.FAILED
+        model.description = f"Training failed: {e}"
+        db.commit()
+        raise
+
+    return TrainingResult(
+        prediction_type=prediction_type,
+        model_id=model.id,
+        model_type=model_type,
+        cross_validation_score=cv_score,
+        mae=model.mae,
+        deployed=deployed,
+    )
+
+
+def claim_training(db: Session, interval: timedelta, force: bool = False) -> bool:
+    """
+    Claim a training run unless one was claimed within the interval, and
+    commit the claim. The claim is a single conditional UPDATE, so of several
+    processes checking at once exactly one succeeds. ``force`` claims a run
+    regardless of the interval.
+    """
+    now = datetime.utcnow()
+    # Until the first claim, the last training run stands in for it
+    last_started = db.scalar(
+        select(PredictionModel.training_started_at)
+        .order_by(PredictionModel.training_started_at.desc().nulls_last())
+        .limit(1)
+    )
+    db.execute(
+        dialect_insert(db)(TrainingClaim)
+        .values(name=TRAINING_CLAIM_NAME, claimed_at=last_started)
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+
+    claim = update(TrainingClaim).where(TrainingClaim.name == TRAINING_CLAIM_NAME)
+    if not force:
+        claim = claim.where(
+            or_(
+                TrainingClaim.claimed_at.is_(None),
+                TrainingClaim.claimed_at <= now - interval,
+            )
+        )
+    claimed = (
+        db.execute(
+            claim.values(
+                claimed_at=now, claimed_by=f"{socket.gethostname()}:{os.getpid()}"
+            )
+        ).rowcount
+        == 1
+    )
+    db.commit()
+    return claimed
+
+
+def run_training(force: bool = False) -> List[TrainingResult]:
+    """
+    Train every prediction type that has a target, unless a run was already
+    claimed within the retrain interval (e.g. by another API worker).
+    ``force`` trains regardless, still claiming the run.
+    """
+    db = get_database_session()
+    try:
+        interval = timedelta(hours=settings.model_retrain_interval_hours)
+        if not claim_training(db, interval, force=force):
+            return []
+
+        results = []
+        for prediction_type in TARGET_COLUMNS:
+            result = train_model(db, prediction_type)
+            if result is not None:
+                results.append(result)
+        return results
+    finally:
+        db.close()
+
+
+class TrainingScheduler:
+    """Runs the training pipeline in a child process on a fixed interval."""
+
+    def __init__(self, interval_hours: Optional[float] = None):
+        self.interval_hours = interval_hours or settings.model_retrain_interval_hours
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None or not settings.model_training_enabled:
+            return
+        # A spawned process doesn't inherit the API's event loop or connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._task = None
+        self._executor = None
+
+    async def _run_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                results = await loop.run_in_executor(self._executor, run_training)
+                for result in results:
+                    logger.info("Trained prediction model: %s", result)
+                if results:
+                    await analytics_cache.invalidate_models()
+            except Exception:
+                logger.exception("Scheduled model training failed")
+            await asyncio.sleep(self.interval_hours * 3600)
+
+
+training_scheduler = TrainingScheduler()
@@ -0,0 +1,118 @@
+"""
+Shared fixtures for the backend tests.
+
+The tests run against a throwaway SQLite database. It is configured before
+``app`` is imported so the engines bind to it, and the working directory
+moves to the same temporary directory so the app's ``data`` and ``logs``
+directories stay out of the tree.
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["MODEL_TRAINING_ENABLED"] = "false"
+os.chdir(TEST_DIR)
+sys.path.insert(0, str(BACKEND_DIR))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models  # noqa: F401  (registers every table)
+from app.core.config import settings
+from app.core.database import (
+    Base,
+    SessionLocal,
+    async_engine,
+    close_db_connection,
+    engine,
+)
+from app.main import app
+from app.services.analytics_cache import MemoryBackend, analytics_cache
+from app.services.inference import model_registry
+from app.services.prediction_cache import prediction_cache
+from fake_github import FakeGitHub
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """Give every test empty tables."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    """A sync session for arranging test data."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@asynccontextmanager
+async def _without_services(_app):
+    # The background services would run queries of their own mid-request
+    yield
+    await close_db_connection()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """
+    An API client for the app, without its background services, with empty
+    analytics and prediction caches and no models loaded.
+    """
+    monkeypatch.setattr(app.router, "lifespan_context", _without_services)
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_candidates", {})
+    prediction_cache.clear()
+    monkeypatch.setattr(
+        analytics_cache,
+        "backend",
+        MemoryBackend(
+            max_size=settings.analytics_cache_size,
+            ttl_seconds=settings.analytics_cache_ttl_seconds,
+        ),
+    )
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Record the statements the API's async engine runs inside a block, as
+    ``(statement, parameters)`` pairs.
+    """
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    return counter
+
+
+@pytest.fixture
+def fake_github():
+    """A fake GitHub API serving ``octocat/hello``; see ``fake_github.py``."""
+    return FakeGitHub(issues=45, pulls=25, commits=35)
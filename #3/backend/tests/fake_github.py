@@ -0,0 +1,174 @@
+"""
+A fake GitHub REST API for the sync tests, served through httpx.MockTransport.
+
+It serves one repository's metadata, issues, pull requests and commits with
+the behaviour the sync engine relies on: ``per_page``/``page`` pagination
+with Link headers, the ``since``/``until`` filters and sort orders of each
+listing, ETags with 304 answers to matching ``If-None-Match`` headers (which
+don't count against the rate limit), and X-RateLimit-* headers. Responses
+queued with ``reject_next`` are returned before any real answer.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import httpx
+
+API_URL = "https://api.github.test"
+OWNER = {"id": 1, "login": "octocat", "type": "User"}
+USERS = [{"id": 100 + i, "login": f"user{i}", "type": "User"} for i in range(3)]
+START = datetime(2024, 1, 1)
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeGitHub:
+    """In-memory GitHub serving the ``octocat/hello`` repository."""
+
+    full_name = "octocat/hello"
+
+    def __init__(self, issues: int = 0, pulls: int = 0, commits: int = 0):
+        self.repository = {
+            "id": 10,
+            "name": "hello",
+            "full_name": self.full_name,
+            "html_url": f"https://github.com/{self.full_name}",
+            "clone_url": f"https://github.com/{self.full_name}.git",
+            "owner": OWNER,
+            "created_at": _timestamp(START),
+            "updated_at": _timestamp(START),
+        }
+        self.issues = [self._issue(number) for number in range(1, issues + 1)]
+        self.pulls = [self._pull(number) for number in range(1, pulls + 1)]
+        self.commits = [self._commit(index) for index in range(commits)]
+        self.requests: List[httpx.Request] = []
+        self.responses: List[httpx.Response] = []
+        self.rate_limit_remaining = 5000
+        self.rate_limit_reset = 0
+        self._rejections: List[httpx.Response] = []
+
+    def _issue(self, number: int) -> Dict[str, Any]:
+        created = START + timedelta(hours=number)
+        return {
+            "id": 1000 + number,
+            "number": number,
+            "title": f"Issue {number}",
+            "state": "open",
+            "html_url": f"https://github.com/{self.full_name}/issues/{number}",
+            "created_at": _timestamp(created),
+            "updated_at": _timestamp(created),
+            "user": USERS[number % len(USERS)],
+        }
+
+    def _pull(self, number: int) -> Dict[str, Any]:
+        created = START + timedelta(hours=number, minutes=30)
+        return {
+            "id": 2000 + number,
+            "number": 500 + number,
+            "title": f"Pull request {number}",
+            "state": "open",
+            "base": {"ref": "main"},
+            "head": {"ref": f"feature-{number}"},
+            "html_url": f"https://github.com/{self.full_name}/pull/{500 + number}",
+            "created_at": _timestamp(created),
+            "updated_at": _timestamp(created),
+            "user": USERS[number % len(USERS)],
+        }
+
+    def _commit(self, index: int) -> Dict[str, Any]:
+        committed = {"date": _timestamp(START + timedelta(minutes=index))}
+        sha = hashlib.sha1(str(index).encode()).hexdigest()
+        return {
+            "sha": sha,
+            "html_url": f"https://github.com/{self.full_name}/commit/{sha}",
+            "commit": {
+                "message": f"Commit {index}",
+                "author": committed,
+                "committer": committed,
+            },
+            "author": USERS[index % len(USERS)],
+        }
+
+    def reject_next(self, *responses: httpx.Response) -> None:
+        """Answer the next requests with these responses, in order."""
+        self._rejections.extend(responses)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self._respond(request)
+        self.responses.append(response)
+        return response
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        if self._rejections:
+            return self._rejections.pop(0)
+
+        path = request.url.path
+        params = request.url.params
+        prefix = f"/repos/{self.full_name}"
+        links = {}
+        if path == prefix:
+            body = self.repository
+        elif path in (f"{prefix}/issues", f"{prefix}/pulls", f"{prefix}/commits"):
+            items = self._listing(path.rsplit("/", 1)[1], params)
+            per_page = int(params.get("per_page", 30))
+            page = int(params.get("page", 1))
+            last_page = max(1, -(-len(items) // per_page))
+            body = items[(page - 1) * per_page : page * per_page]
+            if page < last_page:
+                links["next"] = request.url.copy_merge_params({"page": page + 1})
+                links["last"] = request.url.copy_merge_params({"page": last_page})
+        else:
+            return httpx.Response(404, json={"message": "Not Found"})
+
+        content = json.dumps(body, sort_keys=True).encode()
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers=self._rate_limit_headers(etag))
+
+        self.rate_limit_remaining -= 1
+        headers = self._rate_limit_headers(etag)
+        if links:
+            headers["link"] = ", ".join(
+                f'<{url}>; rel="{rel}"' for rel, url in links.items()
+            )
+        return httpx.Response(
+            200,
+            content=content,
+            headers={**headers, "content-type": "application/json"},
+        )
+
+    def _listing(self, resource: str, params: httpx.QueryParams) -> List[dict]:
+        if resource == "commits":
+            dated = [
+                (commit["commit"]["committer"]["date"], commit)
+                for commit in self.commits
+            ]
+            newest_first = True
+        else:
+            dated = [
+                (item["updated_at"], item)
+                for item in (self.issues if resource == "issues" else self.pulls)
+            ]
+            newest_first = params.get("direction", "desc") == "desc"
+
+        if "since" in params:
+            dated = [(date, item) for date, item in dated if date >= params["since"]]
+        if "until" in params:
+            dated = [(date, item) for date, item in dated if date <= params["until"]]
+        dated.sort(key=lambda pair: pair[0], reverse=newest_first)
+        return [item for _, item in dated]
+
+    def _rate_limit_headers(self, etag: str) -> Dict[str, str]:
+        return {
+            "etag": etag,
+            "x-ratelimit-remaining": str(self.rate_limit_remaining),
+            "x-ratelimit-reset": str(self.rate_limit_reset),
+        }
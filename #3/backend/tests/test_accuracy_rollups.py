@@ -0,0 +1,140 @@
+"""Tests for the incremental estimation accuracy rollups."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.prediction import (
+    EstimationAccuracy,
+    Prediction,
+    PredictionModel,
+    PredictionStatus,
+    PredictionType,
+)
+from app.services.accuracy_rollups import (
+    rebuild_accuracy_rollups,
+    record_validation,
+)
+
+
+@pytest_asyncio.fixture
+async def model_id():
+    async with AsyncSessionLocal() as session:
+        model = PredictionModel(
+            name="Model",
+            version="1",
+            model_type="random_forest",
+            prediction_type=PredictionType.HOURS,
+        )
+        session.add(model)
+        await session.commit()
+        yield model.id
+    await async_engine.dispose()
+
+
+async def _validate(model_id: int, predicted: float, actual: float) -> None:
+    """Validate a new prediction in its own transaction, like the API does."""
+    async with AsyncSessionLocal() as session:
+        prediction = Prediction(
+            task_title="Task",
+            input_features={},
+            prediction_type=PredictionType.HOURS,
+            predicted_value=predicted,
+            actual_value=actual,
+            validation_date=datetime(2026, 10, 18, 12),
+            status=PredictionStatus.VALIDATED,
+            model_id=model_id,
+        )
+        session.add(prediction)
+        await session.flush()
+        await record_validation(session, prediction)
+        await session.commit()
+
+
+async def _rollups():
+    async with AsyncSessionLocal() as session:
+        return (await session.scalars(select(EstimationAccuracy))).all()
+
+
+@pytest.mark.asyncio
+async def test_validations_in_one_bucket_share_a_rollup(model_id):
+    # No team or task type: the bucket has NULL dimensions
+    await _validate(model_id, predicted=10, actual=10)
+    await _validate(model_id, predicted=15, actual=10)
+
+    (rollup,) = await _rollups()
+    assert rollup.team_id is None and rollup.task_type is None
+    assert rollup.validated_predictions == 2
+    assert rollup.average_accuracy_percentage == pytest.approx(75)
+    assert rollup.mae == pytest.approx(2.5)
+    assert rollup.predictions_within_10_percent == 1
+    assert rollup.overestimation_count == 1
+
+
+@pytest.mark.asyncio
+async def test_a_bucket_cannot_have_two_rollups(model_id):
+    await _validate(model_id, predicted=10, actual=10)
+    (rollup,) = await _rollups()
+
+    async with AsyncSessionLocal() as session:
+        session.add(
+            EstimationAccuracy(
+                model_id=model_id,
+                prediction_type=rollup.prediction_type,
+                time_period=rollup.time_period,
+                period_start=rollup.period_start,
+                period_end=rollup.period_end,
+            )
+        )
+        with pytest.raises(IntegrityError):
+            await session.commit()
+
+
+def test_accuracy_analytics_cover_whole_days_in_the_window(client, db):
+    model = PredictionModel(
+        name="Model",
+        version="1",
+        model_type="random_forest",
+        prediction_type=PredictionType.HOURS,
+    )
+    db.add(model)
+    db.flush()
+    now = datetime.utcnow()
+    yesterday = datetime(now.year, now.month, now.day) - timedelta(days=1)
+
+    def validated(predicted, actual, validation_date):
+        return Prediction(
+            task_title="Task",
+            input_features={},
+            prediction_type=PredictionType.HOURS,
+            predicted_value=predicted,
+            actual_value=actual,
+            validation_date=validation_date,
+            status=PredictionStatus.VALIDATED,
+            model_id=model.id,
+        )
+
+    db.add_all(
+        [
+            # Exact and completely missed predictions count towards the means
+            validated(10, 10, now),
+            validated(30, 10, now),
+            # The day a one-day window starts in is left out
+            validated(5, 10, yesterday + timedelta(seconds=1)),
+        ]
+    )
+    db.commit()
+    rebuild_accuracy_rollups(db)
+
+    response = client.get("/api/v1/predictions/analytics/accuracy", params={"days": 1})
+
+    assert response.status_code == 200
+    analytics = response.json()
+    assert analytics["validated_predictions"] == 2
+    assert analytics["average_accuracy_percentage"] == 50
+    assert analytics["average_absolute_error"] == 10
+    assert analytics["predictions_within_10_percent"] == 1
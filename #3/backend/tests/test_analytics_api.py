@@ -0,0 +1,304 @@
+"""
+Tests for the analytics API.
+
+The endpoints aggregate in SQL; each test seeds rows and checks the response
+against the per-row Python arithmetic they replaced, run on the same ORM
+objects. Timestamps carry microseconds and sprints last fractional days, so
+the SQLite ``seconds_between`` and ``whole_days_between`` expressions are
+compared with ``timedelta`` arithmetic.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.github import GitHubUser, Issue, Repository
+from app.models.prediction import (
+    Prediction,
+    PredictionModel,
+    PredictionStatus,
+    PredictionType,
+)
+from app.models.team import Sprint, Team
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+@pytest.fixture
+def now():
+    return datetime.utcnow()
+
+
+@pytest.fixture
+def team(db):
+    team = Team(name="Frontend Team")
+    db.add_all([team, Team(name="Backend Team")])
+    db.commit()
+    return team
+
+
+@pytest.fixture
+def sprints(db, team, now):
+    sprints = [
+        # 13 days 19 hours: whole_days_between floors to 13
+        Sprint(
+            name="Sprint 1",
+            start_date=now - timedelta(days=20, hours=3, microseconds=250),
+            end_date=now - timedelta(days=6, hours=8),
+            is_completed=True,
+            planned_story_points=20,
+            completed_story_points=15,
+            actual_hours=40.5,
+            team_id=team.id,
+        ),
+        Sprint(
+            name="Sprint 2",
+            start_date=now - timedelta(days=12, minutes=1),
+            end_date=now - timedelta(days=2, hours=5, seconds=30),
+            is_completed=True,
+            planned_story_points=10,
+            completed_story_points=12,
+            team_id=team.id,
+        ),
+        # Ends half a day before it starts: floors to -1, like timedelta.days
+        Sprint(
+            name="Sprint 3",
+            start_date=now - timedelta(days=4),
+            end_date=now - timedelta(days=4, hours=12),
+            is_completed=True,
+            planned_story_points=0,
+            completed_story_points=3,
+            team_id=team.id,
+        ),
+        Sprint(
+            name="Sprint 4",
+            start_date=now - timedelta(days=3),
+            end_date=now + timedelta(days=11),
+            is_completed=False,
+            planned_story_points=8,
+            team_id=team.id,
+        ),
+    ]
+    db.add_all(sprints)
+    db.commit()
+    return sprints
+
+
+@pytest.fixture
+def predictions(db, team, now):
+    model = PredictionModel(
+        name="Model",
+        version="1",
+        model_type="ridge",
+        prediction_type=PredictionType.HOURS,
+    )
+    db.add(model)
+    db.flush()
+
+    def prediction(days_ago, prediction_type, predicted, actual=None, team_id=None):
+        return Prediction(
+            task_title="Task",
+            input_features={},
+            prediction_type=prediction_type,
+            predicted_value=predicted,
+            actual_value=actual,
+            validation_date=None if actual is None else now,
+            status=PredictionStatus.COMPLETED
+            if actual is None
+            else PredictionStatus.VALIDATED,
+            created_at=now - timedelta(days=days_ago, hours=3),
+            model_id=model.id,
+            team_id=team.id if team_id is None else team_id,
+        )
+
+    predictions = [
+        prediction(1, PredictionType.HOURS, 8, 10),
+        prediction(2, PredictionType.HOURS, 30, 10),  # 0% accuracy
+        prediction(3, PredictionType.STORY_POINTS, 0, 0),  # exact zero
+        prediction(9, PredictionType.STORY_POINTS, 5, 0),  # zero actual
+        prediction(10, PredictionType.HOURS, 12.5),
+        prediction(17, PredictionType.COMPLEXITY, 4, 5),
+        prediction(25, PredictionType.HOURS, 6, 4),
+        prediction(40, PredictionType.HOURS, 6, 6),  # outside the period
+        prediction(5, PredictionType.HOURS, 6, 6, team_id=team.id + 1),
+    ]
+    db.add_all(predictions)
+    db.commit()
+    return predictions
+
+
+def test_team_velocity_matches_per_sprint_arithmetic(client, sprints, team, now):
+    response = client.get("/api/v1/analytics/teams/velocity", params={"days": 30})
+
+    assert response.status_code == 200
+    velocity = {row["team_id"]: row for row in response.json()}
+    completed = [sprint for sprint in sprints if sprint.is_completed]
+    total_days = sum(sprint.duration_days for sprint in completed)
+    assert [sprint.duration_days for sprint in completed] == [13, 9, -1]
+    assert velocity[team.id]["total_story_points_completed"] == 30
+    assert velocity[team.id]["total_hours_logged"] == pytest.approx(40.5)
+    assert velocity[team.id]["velocity_per_day"] == pytest.approx(30 / total_days)
+    assert velocity[team.id]["estimation_accuracy"] == pytest.approx(
+        _mean(sprint.story_points_estimation_accuracy for sprint in completed)
+    )
+    # A team without sprints is still listed, without data
+    assert velocity[team.id + 1]["total_story_points_completed"] is None
+    assert velocity[team.id + 1]["velocity_per_day"] is None
+
+
+def test_repository_insights_match_per_issue_arithmetic(client, db, now):
+    user = GitHubUser(github_id=1, login="octocat", created_at=now)
+    other = GitHubUser(github_id=2, login="hubot", created_at=now)
+    db.add_all([user, other])
+    db.flush()
+    repository = Repository(
+        github_id=1,
+        name="hello",
+        full_name="octocat/hello",
+        url="https://github.com/octocat/hello",
+        clone_url="https://github.com/octocat/hello.git",
+        owner_id=user.id,
+        created_at=now,
+    )
+    db.add(repository)
+    db.flush()
+
+    def issue(number, created, closed=None, author=user):
+        return Issue(
+            github_id=number,
+            number=number,
+            title=f"Issue {number}",
+            state="open" if closed is None else "closed",
+            url=f"https://github.com/octocat/hello/issues/{number}",
+            created_at=created,
+            closed_at=closed,
+            repository_id=repository.id,
+            author_id=author.id,
+        )
+
+    created = now - timedelta(days=10, microseconds=750000)
+    issues = [
+        issue(1, created, created + timedelta(hours=50, microseconds=123456)),
+        issue(2, created + timedelta(seconds=59.9), now - timedelta(seconds=0.5)),
+        issue(3, now - timedelta(days=2), author=other),
+        issue(4, now - timedelta(days=60), now - timedelta(days=59)),
+    ]
+    db.add_all(issues)
+    db.commit()
+
+    response = client.get("/api/v1/analytics/repositories/insights")
+
+    assert response.status_code == 200
+    (insights,) = response.json()
+    closed = [issue.resolution_time_hours for issue in issues[:2]]
+    assert insights["total_issues"] == 3
+    assert insights["open_issues"] == 1
+    assert insights["closed_issues"] == 2
+    assert insights["contributor_count"] == 2
+    assert insights["average_resolution_time_hours"] == pytest.approx(
+        _mean(closed), abs=1e-9
+    )
+
+
+def test_prediction_analytics_match_per_prediction_arithmetic(
+    client, predictions, team
+):
+    response = client.get(
+        "/api/v1/analytics/predictions/analytics",
+        params={"team_id": team.id, "days": 30},
+    )
+
+    assert response.status_code == 200
+    analytics = response.json()
+    in_period = [
+        prediction for prediction in predictions[:-2] if prediction.team_id == team.id
+    ]
+    validated = [
+        prediction
+        for prediction in in_period
+        if prediction.status == PredictionStatus.VALIDATED
+    ]
+    assert analytics["total_predictions"] == len(in_period) == 7
+    assert analytics["validated_predictions"] == len(validated) == 6
+    assert analytics["average_accuracy"] == pytest.approx(
+        _mean(prediction.accuracy_percentage for prediction in validated)
+    )
+    assert analytics["accuracy_by_type"] == pytest.approx(
+        {
+            prediction_type.value: _mean(
+                prediction.accuracy_percentage
+                for prediction in validated
+                if prediction.prediction_type == prediction_type
+            )
+            for prediction_type in (
+                PredictionType.STORY_POINTS,
+                PredictionType.HOURS,
+                PredictionType.COMPLEXITY,
+            )
+        }
+    )
+
+    # Five buckets: four whole weeks from the period start and a 2-day tail
+    trends = analytics["accuracy_trends"]
+    assert len(trends) == 5
+    for week in trends:
+        start = datetime.fromisoformat(week["week_start"])
+        end = datetime.fromisoformat(week["week_end"])
+        in_week = [
+            prediction
+            for prediction in validated
+            if start <= prediction.created_at < end
+        ]
+        assert week["predictions_count"] == len(in_week)
+        if in_week:
+            assert week["average_accuracy"] == pytest.approx(
+                _mean(prediction.accuracy_percentage for prediction in in_week)
+            )
+        else:
+            assert week["average_accuracy"] is None
+    assert [week["predictions_count"] for week in trends] == [1, 1, 1, 2, 1]
+
+
+def test_team_performance_matches_per_prediction_arithmetic(
+    client, predictions, sprints, team
+):
+    response = client.get(f"/api/v1/analytics/teams/{team.id}/performance")
+
+    assert response.status_code == 200
+    metrics = response.json()["prediction_metrics"]
+    in_period = [
+        prediction for prediction in predictions[:-2] if prediction.team_id == team.id
+    ]
+    validated = [
+        prediction
+        for prediction in in_period
+        if prediction.status == PredictionStatus.VALIDATED
+    ]
+    assert metrics["total_predictions"] == 7
+    assert metrics["validated_predictions"] == 6
+    assert metrics["validation_rate"] == pytest.approx(6 / 7 * 100)
+    assert metrics["average_accuracy"] == pytest.approx(
+        _mean(prediction.accuracy_percentage for prediction in validated)
+    )
+    # Types in order of first appearance, like the per-row loop built them
+    distribution = {}
+    for prediction in in_period:
+        key = prediction.prediction_type.value
+        distribution[key] = distribution.get(key, 0) + 1
+    assert list(metrics["prediction_distribution"].items()) == list(
+        distribution.items()
+    )
+
+    sprint_metrics = response.json()["sprint_metrics"]
+    assert {
+        sprint["sprint_name"]: sprint["estimation_accuracy"]
+        for sprint in sprint_metrics
+    } == {
+        "Sprint 1": pytest.approx(0.75),
+        "Sprint 2": pytest.approx(10 / 12),
+        "Sprint 3": None,
+        "Sprint 4": None,
+    }
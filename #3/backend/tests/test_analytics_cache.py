@@ -0,0 +1,62 @@
+"""Tests for the analytics response cache through the API."""
+
+import pytest
+
+from app.models.team import Team
+
+
+@pytest.fixture
+def team_ids(db):
+    teams = [Team(name="Frontend Team"), Team(name="Backend Team")]
+    db.add_all(teams)
+    db.commit()
+    return [team.id for team in teams]
+
+
+def _performance(client, team_id, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(f"/api/v1/analytics/teams/{team_id}/performance", headers=headers)
+
+
+def _stats(client):
+    return client.get("/api/v1/analytics/cache/stats").json()
+
+
+def test_a_matching_etag_gets_304(client, team_ids):
+    before = _stats(client)
+    first = _performance(client, team_ids[0])
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    revalidated = _performance(client, team_ids[0], etag)
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert _stats(client)["not_modified"] == before["not_modified"] + 1
+
+    stale = _performance(client, team_ids[0], '"another-etag"')
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_a_team_write_only_invalidates_that_team(client, team_ids):
+    first_team, second_team = team_ids
+    etags = {
+        team_id: _performance(client, team_id).headers["ETag"] for team_id in team_ids
+    }
+    before = _stats(client)
+
+    response = client.post(
+        f"/api/v1/teams/{first_team}/members", json={"name": "Ada Lovelace"}
+    )
+    assert response.status_code == 200
+
+    # The other team's response is still cached and still current
+    assert _performance(client, second_team, etags[second_team]).status_code == 304
+    after_other = _stats(client)
+    assert after_other["hits"] == before["hits"] + 1
+    assert after_other["misses"] == before["misses"]
+
+    # The changed team's response is computed again
+    assert _performance(client, first_team).status_code == 200
+    assert _stats(client)["misses"] == before["misses"] + 1
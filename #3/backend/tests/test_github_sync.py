@@ -0,0 +1,127 @@
+"""Tests for the GitHub sync engine and client against a fake GitHub API."""
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.github import Commit, Issue, PullRequest
+from app.services.github_client import GitHubClient, RateLimiter
+from app.services.github_sync import GitHubSyncEngine
+from fake_github import API_URL
+
+
+@pytest_asyncio.fixture
+async def sleeps():
+    """Delays requested by the rate limiter; nothing actually sleeps."""
+    delays = []
+    yield delays
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def github(fake_github, sleeps):
+    async def sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    return GitHubClient(
+        "token",
+        base_url=API_URL,
+        transport=fake_github.transport(),
+        rate_limiter=RateLimiter(
+            min_remaining=10, max_wait_seconds=120, sleep=sleep, clock=lambda: 0
+        ),
+        max_retries=3,
+    )
+
+
+async def _count(model) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.asyncio
+async def test_sync_follows_link_pagination(github, fake_github):
+    engine = GitHubSyncEngine(github, per_page=10)
+
+    result = await engine.sync_repository(fake_github.full_name)
+
+    assert result.issues.inserted == 45
+    assert result.pull_requests.inserted == 25
+    assert result.commits.inserted == 35
+    assert await _count(Issue) == 45
+    assert await _count(PullRequest) == 25
+    assert await _count(Commit) == 35
+    # Four commit pages follow the first, read from its ``last`` link
+    commit_pages = sorted(
+        int(request.url.params.get("page", 1))
+        for request in fake_github.requests
+        if request.url.path.endswith("/commits")
+    )
+    assert commit_pages == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_resync_revalidates_with_conditional_requests(github, fake_github):
+    engine = GitHubSyncEngine(github, per_page=10)
+    await engine.sync_repository(fake_github.full_name)
+    fake_github.requests.clear()
+    fake_github.responses.clear()
+    remaining = fake_github.rate_limit_remaining
+
+    result = await engine.sync_repository(fake_github.full_name)
+
+    assert result.pull_requests.inserted == result.pull_requests.updated == 0
+    assert result.commits.inserted == result.commits.updated == 0
+    not_modified = [
+        request.url.path
+        for request, response in zip(fake_github.requests, fake_github.responses)
+        if response.status_code == 304
+    ]
+    assert "/repos/octocat/hello" in not_modified
+    assert "/repos/octocat/hello/pulls" in not_modified
+    assert all(
+        "if-none-match" in request.headers
+        for request, response in zip(fake_github.requests, fake_github.responses)
+        if response.status_code == 304
+    )
+    # 304s are free; only the requests whose URLs moved with the watermarks count
+    assert fake_github.rate_limit_remaining == remaining - (
+        len(fake_github.requests) - len(not_modified)
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_retries_after_rate_limit_rejections(github, fake_github, sleeps):
+    fake_github.reject_next(
+        httpx.Response(
+            403,
+            json={"message": "API rate limit exceeded"},
+            headers={"x-ratelimit-remaining": "0", "x-ratelimit-reset": "30"},
+        ),
+        httpx.Response(
+            429,
+            json={"message": "You have exceeded a secondary rate limit"},
+            headers={"retry-after": "5"},
+        ),
+    )
+
+    page = await github.get(github.build_url("/repos/octocat/hello"))
+
+    assert page.status_code == 200
+    assert page.data["full_name"] == fake_github.full_name
+    assert len(fake_github.requests) == 3
+    assert sleeps == [30, 5]
+
+
+@pytest.mark.asyncio
+async def test_client_waits_for_reset_when_budget_is_spent(github, fake_github, sleeps):
+    fake_github.rate_limit_remaining = 11
+    fake_github.rate_limit_reset = 45
+
+    await github.get(github.build_url("/repos/octocat/hello"))
+    assert sleeps == []
+    await github.get(github.build_url("/repos/octocat/hello"))
+
+    assert sleeps == [45]
@@ -0,0 +1,128 @@
+"""Tests for the GitHub webhook endpoint and its batched consumer."""
+
+import hashlib
+import hmac
+import json
+from urllib.parse import urlencode
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.github import Issue
+from app.services.github_webhooks import WebhookConsumer, github_webhook_consumer
+
+
+@pytest_asyncio.fixture
+async def consumer():
+    # A long batch window so every event queued by a test lands in one batch
+    webhook_consumer = WebhookConsumer(batch_size=10, batch_wait_seconds=60)
+    await webhook_consumer.start()
+    yield webhook_consumer
+    await webhook_consumer.stop()
+    await async_engine.dispose()
+
+
+def _issue_event(fake_github, issue):
+    return {
+        "action": "opened",
+        "issue": issue,
+        "repository": fake_github.repository,
+        "sender": issue["user"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_a_malformed_event_only_loses_itself(consumer, fake_github):
+    first, second = fake_github.issues[:2]
+    malformed = _issue_event(fake_github, first)
+    del malformed["issue"]
+
+    consumer.enqueue("issues", _issue_event(fake_github, first), "delivery-1")
+    consumer.enqueue("issues", malformed, "delivery-2")
+    consumer.enqueue("issues", _issue_event(fake_github, second), "delivery-3")
+    # Stopping applies the queued batch
+    await consumer.stop()
+    await consumer.start()
+
+    async with AsyncSessionLocal() as db:
+        stored = (await db.scalars(select(Issue.github_id))).all()
+    assert sorted(stored) == [first["id"], second["id"]]
+    # Applied deliveries stay deduplicated; the failed one can be redelivered
+    assert (
+        consumer.enqueue("issues", _issue_event(fake_github, first), "delivery-1")
+        is False
+    )
+    assert (
+        consumer.enqueue("issues", _issue_event(fake_github, first), "delivery-2")
+        is True
+    )
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Payloads the webhook endpoint queues."""
+    payloads = []
+    monkeypatch.setattr(
+        github_webhook_consumer,
+        "enqueue",
+        lambda name, payload, delivery_id=None: payloads.append(payload) or True,
+    )
+    return payloads
+
+
+@pytest.fixture
+def signed(monkeypatch):
+    """Headers of a signed issues delivery with the given body."""
+    monkeypatch.setattr(settings, "github_webhook_secret", "secret")
+
+    def sign(body: bytes, content_type: str) -> dict:
+        digest = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+        return {
+            "Content-Type": content_type,
+            "X-GitHub-Event": "issues",
+            "X-Hub-Signature-256": f"sha256={digest}",
+        }
+
+    return sign
+
+
+def test_webhook_accepts_json_and_form_payloads(client, signed, queued, fake_github):
+    event = _issue_event(fake_github, fake_github.issues[0])
+    body = json.dumps(event).encode()
+    form = urlencode({"payload": json.dumps(event)}).encode()
+
+    as_json = client.post(
+        "/api/v1/github/webhooks",
+        content=body,
+        headers=signed(body, "application/json"),
+    )
+    as_form = client.post(
+        "/api/v1/github/webhooks",
+        content=form,
+        headers=signed(form, "application/x-www-form-urlencoded"),
+    )
+
+    assert as_json.status_code == as_form.status_code == 202
+    assert queued == [event, event]
+
+
+def test_webhook_rejects_other_content(client, signed, queued):
+    text = b"not json"
+
+    plain = client.post(
+        "/api/v1/github/webhooks",
+        content=text,
+        headers=signed(text, "text/plain"),
+    )
+    malformed = client.post(
+        "/api/v1/github/webhooks",
+        content=text,
+        headers=signed(text, "application/json"),
+    )
+
+    assert plain.status_code == 415
+    assert malformed.status_code == 400
+    assert queued == []
@@ -0,0 +1,190 @@
+"""Tests for the predictions API."""
+
+import csv
+import io
+import json
+
+from app.api import export
+from app.models.prediction import (
+    ModelStatus,
+    Prediction,
+    PredictionModel,
+    PredictionType,
+)
+from app.services.prediction_cache import prediction_cache
+
+
+def _add_predictions(db, count: int) -> None:
+    models = [
+        PredictionModel(
+            name=f"Model {i}",
+            version=str(i),
+            model_type="random_forest",
+            prediction_type=PredictionType.HOURS,
+            status=ModelStatus.ACTIVE if i == 0 else ModelStatus.DEPRECATED,
+        )
+        for i in range(5)
+    ]
+    db.add_all(models)
+    db.flush()
+    db.add_all(
+        Prediction(
+            task_title=f"Task {i}",
+            input_features={},
+            prediction_type=PredictionType.HOURS,
+            predicted_value=float(i),
+            model_id=models[i % len(models)].id,
+        )
+        for i in range(count)
+    )
+    db.commit()
+
+
+def test_list_predictions_query_count_does_not_grow_with_page_size(
+    client, db, count_queries
+):
+    _add_predictions(db, 150)
+
+    statement_counts = {}
+    for limit in (1, 100):
+        with count_queries() as statements:
+            response = client.get("/api/v1/predictions/", params={"limit": limit})
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        statement_counts[limit] = len(statements)
+
+    assert statement_counts[1] == statement_counts[100]
+
+
+def test_list_predictions_includes_model_names(client, db):
+    _add_predictions(db, 10)
+
+    response = client.get("/api/v1/predictions/", params={"limit": 10})
+
+    assert response.status_code == 200
+    assert [prediction["model_name"] for prediction in response.json()] == [
+        f"Model {i % 5}" for i in range(10)
+    ]
+
+
+def test_batch_predictions_follow_request_order_and_share_repeats(
+    client, db, count_queries
+):
+    tasks = [
+        {"task_title": "Add login page", "prediction_type": "story_points"},
+        {"task_title": "Fix flaky export", "prediction_type": "hours"},
+        {"task_title": "Write migration guide", "prediction_type": "story_points"},
+        {"task_title": "Add login page", "prediction_type": "story_points"},
+        {"task_title": "Fix flaky export", "prediction_type": "hours"},
+    ]
+
+    with count_queries() as statements:
+        response = client.post(
+            "/api/v1/predictions/predict/batch", json={"tasks": tasks}
+        )
+
+    assert response.status_code == 200
+    # The new predictions of both models are stored by one INSERT
+    inserts = [s for s, _ in statements if s.startswith("INSERT INTO predictions")]
+    assert len(inserts) == 1
+    predictions = response.json()
+    assert [
+        (prediction["task_title"], prediction["prediction_type"])
+        for prediction in predictions
+    ] == [(task["task_title"], task["prediction_type"]) for task in tasks]
+    ids = [prediction["id"] for prediction in predictions]
+    assert ids[0] == ids[3] and ids[1] == ids[4]
+    assert len(set(ids)) == 3
+    assert db.query(Prediction).count() == 3
+
+    # Repeating the batch reuses the stored predictions
+    again = client.post("/api/v1/predictions/predict/batch", json={"tasks": tasks})
+    assert [prediction["id"] for prediction in again.json()] == ids
+    assert db.query(Prediction).count() == 3
+
+
+def test_repeated_predictions_are_served_from_the_cache_then_the_database(
+    client, db, count_queries
+):
+    task = {"task_title": "Add login page", "task_description": "OAuth and SSO"}
+
+    def stats():
+        return client.get("/api/v1/predictions/cache/stats").json()
+
+    before = stats()
+    first = client.post("/api/v1/predictions/predict", json=task).json()
+    with count_queries() as statements:
+        repeated = client.post("/api/v1/predictions/predict", json=task).json()
+
+    assert repeated["id"] == first["id"]
+    assert stats()["hits"] == before["hits"] + 1
+    assert not any(statement.startswith("INSERT") for statement, _ in statements)
+
+    # Another worker's empty cache finds the stored prediction by its hash
+    prediction_cache.clear()
+    stored = client.post("/api/v1/predictions/predict", json=task).json()
+    assert stored["id"] == first["id"]
+    assert stats()["database_hits"] == before["database_hits"] + 1
+
+    other = client.post(
+        "/api/v1/predictions/predict", json={**task, "task_title": "Add logout"}
+    ).json()
+    assert other["id"] != first["id"]
+    assert db.query(Prediction).count() == 2
+
+
+def test_list_predictions_pages_by_cursor(client, db):
+    _add_predictions(db, 100)
+
+    ids, page_sizes, cursor = [], [], None
+    while True:
+        params = {"limit": 40, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/predictions/", params=params)
+        assert response.status_code == 200
+        ids.extend(prediction["id"] for prediction in response.json())
+        page_sizes.append(len(response.json()))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert page_sizes == [40, 40, 20]
+    assert ids == sorted(ids) and len(set(ids)) == 100
+    # Offset paging without a cursor returns the same rows
+    skipped = client.get("/api/v1/predictions/", params={"skip": 40, "limit": 40})
+    assert [prediction["id"] for prediction in skipped.json()] == ids[40:80]
+
+    invalid = client.get("/api/v1/predictions/", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+
+def test_export_streams_every_matching_prediction(client, db, monkeypatch):
+    # Several cursor partitions per export
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 10)
+    _add_predictions(db, 25)
+
+    with client.stream("GET", "/api/v1/predictions/export") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert (
+            'filename="predictions.ndjson"' in response.headers["content-disposition"]
+        )
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [row["task_title"] for row in rows] == [f"Task {i}" for i in range(25)]
+    assert rows[0]["prediction_type"] == "hours"
+    assert rows[0]["input_features"] == {}
+    assert [row["model_name"] for row in rows[:5]] == [f"Model {i}" for i in range(5)]
+
+    response = client.get("/api/v1/predictions/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    table = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["task_title"] for row in table] == [f"Task {i}" for i in range(25)]
+    assert table[0]["input_features"] == "{}"
+
+    # Filters apply to the export as to the list
+    filtered = client.get(
+        "/api/v1/predictions/export",
+        params={"format": "csv", "prediction_type": "story_points"},
+    )
+    assert filtered.text.splitlines()[1:] == []
@@ -0,0 +1,176 @@
+"""
+Query plan tests for the composite indexes behind the router filters.
+
+Each endpoint is called with its filters, and every statement it ran is
+explained with ``EXPLAIN QUERY PLAN`` on SQLite. The filtered table must be
+searched through the expected index, never scanned. Issues and members are
+spread over several repositories and teams, and the database is analyzed
+first, so the planner has statistics like a production database does.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import engine
+from app.models.github import GitHubUser, Issue, Repository
+from app.models.prediction import PredictionModel, PredictionType
+from app.models.team import Team, TeamMember
+
+REPOSITORIES = 20
+ISSUES_PER_REPOSITORY = 100
+TEAMS = 10
+MEMBERS_PER_TEAM = 20
+
+
+@pytest.fixture
+def analyzed_database(db):
+    now = datetime.utcnow()
+    user = GitHubUser(github_id=1, login="octocat", created_at=now)
+    db.add(user)
+    db.flush()
+    db.execute(
+        insert(Repository),
+        [
+            {
+                "github_id": i,
+                "name": f"repo-{i}",
+                "full_name": f"octocat/repo-{i}",
+                "url": f"https://github.com/octocat/repo-{i}",
+                "clone_url": f"https://github.com/octocat/repo-{i}.git",
+                "owner_id": user.id,
+                "created_at": now,
+            }
+            for i in range(1, REPOSITORIES + 1)
+        ],
+    )
+    db.execute(
+        insert(Issue),
+        [
+            {
+                "github_id": i,
+                "number": i,
+                "title": f"Issue {i}",
+                "state": "closed" if i % 3 else "open",
+                "url": f"https://github.com/octocat/issues/{i}",
+                "repository_id": i % REPOSITORIES + 1,
+                "author_id": user.id,
+                "created_at": now - timedelta(hours=i),
+                "closed_at": now if i % 3 else None,
+            }
+            for i in range(REPOSITORIES * ISSUES_PER_REPOSITORY)
+        ],
+    )
+    db.execute(insert(Team), [{"name": f"Team {i}"} for i in range(TEAMS)])
+    db.execute(
+        insert(TeamMember),
+        [
+            {"team_id": i % TEAMS + 1, "name": f"Member {i}", "is_active": i % 5 > 0}
+            for i in range(TEAMS * MEMBERS_PER_TEAM)
+        ],
+    )
+    db.add(
+        PredictionModel(
+            name="Model",
+            version="1",
+            model_type="random_forest",
+            prediction_type=PredictionType.HOURS,
+        )
+    )
+    db.commit()
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def _plans(statements):
+    with engine.connect() as conn:
+        return [
+            [
+                row[3]
+                for row in conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+            ]
+            for statement, parameters in statements
+        ]
+
+
+@pytest.mark.parametrize(
+    "path, params, table, index",
+    [
+        (
+            "/api/v1/analytics/teams/1/performance",
+            {},
+            "predictions",
+            "ix_predictions_team_created",
+        ),
+        (
+            "/api/v1/predictions/models/1/evaluation",
+            {},
+            "predictions",
+            "ix_predictions_status_validation",
+        ),
+        (
+            "/api/v1/predictions/",
+            {"repository_id": 1},
+            "predictions",
+            "ix_predictions_repository_id",
+        ),
+        (
+            "/api/v1/predictions/models/",
+            {"status": "active", "prediction_type": "hours"},
+            "prediction_models",
+            "ix_prediction_models_type_status",
+        ),
+        (
+            "/api/v1/predictions/analytics/accuracy",
+            {"prediction_type": "hours"},
+            "estimation_accuracy",
+            "ix_estimation_accuracy_bucket",
+        ),
+        (
+            "/api/v1/github/repositories/1/issues",
+            {"state": "open"},
+            "issues",
+            "ix_issues_repository_state_created",
+        ),
+        (
+            "/api/v1/github/repositories/1/analytics",
+            {},
+            "issues",
+            "ix_issues_repository_state_created",
+        ),
+        (
+            "/api/v1/analytics/teams/velocity",
+            {"team_id": 1},
+            "sprints",
+            "ix_sprints_team_completed_start",
+        ),
+        (
+            "/api/v1/teams/1/members",
+            {},
+            "team_members",
+            "ix_team_members_team_active",
+        ),
+        (
+            "/api/v1/teams/1/members/1/technologies",
+            {},
+            "technology_experiences",
+            "ix_technology_experiences_team_member_id",
+        ),
+    ],
+)
+def test_router_filters_search_their_index(
+    client, analyzed_database, count_queries, path, params, table, index
+):
+    with count_queries() as statements:
+        response = client.get(path, params=params)
+    assert response.status_code == 200
+
+    steps = [step for plan in _plans(statements) for step in plan]
+    searches = re.compile(rf"SEARCH {table} USING (COVERING )?INDEX {index} \(")
+    assert any(searches.match(step) for step in steps), steps
+    assert not any(step.startswith(f"SCAN {table}") for step in steps), steps
@@ -0,0 +1,81 @@
+"""Tests for sharing the similarity index files between processes."""
+
+import numpy as np
+import pytest
+
+from app.services import similarity_index as similarity
+from app.services.similarity_index import ROW_DTYPE, SimilarityIndex, vectorize
+
+TOPICS = ["login page", "payment api", "search filters", "email reports"]
+
+
+def _batch(start: int, count: int):
+    texts = [
+        f"fix the {TOPICS[i % len(TOPICS)]} bug {i}"
+        for i in range(start, start + count)
+    ]
+    vectors = np.array([vectorize(text) for text in texts], dtype=np.float32)
+    rows = np.array(
+        [(0, i, float(i % len(TOPICS)), np.nan) for i in range(start, start + count)],
+        dtype=ROW_DTYPE,
+    )
+    return vectors, rows
+
+
+@pytest.fixture
+def indexes(tmp_path):
+    """The writer and a reader of one index directory, like two API workers."""
+    writer, reader = SimilarityIndex(tmp_path), SimilarityIndex(tmp_path)
+    assert writer.acquire_writer()
+    writer.load()
+    yield writer, reader
+    writer.release_writer()
+    reader.release_writer()
+
+
+def test_only_one_process_writes(indexes):
+    writer, reader = indexes
+
+    assert not reader.acquire_writer()
+    with pytest.raises(RuntimeError):
+        reader.add(*_batch(0, 1))
+
+    # The next process to try the lock takes over once the writer exits
+    writer.release_writer()
+    assert reader.acquire_writer()
+
+
+def test_readers_map_the_rows_the_writer_saved(indexes):
+    writer, reader = indexes
+    writer.add(*_batch(0, 20), watermarks={"task_feature": 20})
+
+    assert reader.refresh()
+    assert len(reader) == 20
+    assert reader.watermarks["task_feature"] == 20
+    assert reader.similar_averages("payment api bug") == writer.similar_averages(
+        "payment api bug"
+    )
+    assert not reader.refresh()
+
+
+def test_retraining_writes_a_new_generation(indexes, monkeypatch, tmp_path):
+    monkeypatch.setattr(similarity, "IVF_MIN_ROWS", 40)
+    writer, reader = indexes
+    writer.add(*_batch(0, 40))
+    assert reader.refresh()
+    first = reader._snapshot
+
+    writer.add(*_batch(40, 120))
+
+    assert writer.trained_rows == 160
+    assert sorted(path.name for path in tmp_path.glob("*-*")) == [
+        "assignments-160.i4",
+        "centroids-160.npy",
+    ]
+    # Until it refreshes, the reader keeps searching its old mappings
+    assert first.listed_rows == 40 and len(reader.search("login page bug 3")) > 0
+    assert reader.refresh()
+    assert reader.trained_rows == 160 and reader._snapshot.listed_rows == 160
+    assert [row["source_id"] for _, row in reader.search("login page bug 3")] == [
+        row["source_id"] for _, row in writer.search("login page bug 3")
+    ]
@@ -0,0 +1,138 @@
+"""Tests for the persisted sync job queue shared by several processes."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.github import SyncJob, SyncJobStatus
+from app.services.github_client import GitHubClient
+from app.services.sync_jobs import SyncJobQueue
+from fake_github import API_URL
+
+
+@pytest_asyncio.fixture
+async def release():
+    """Set to let the fake GitHub answer; until then jobs stay running."""
+    event = asyncio.Event()
+    event.set()
+    yield event
+    await async_engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def queues(fake_github, release, monkeypatch):
+    """Builds queues standing in for separate processes over one database."""
+    monkeypatch.setattr(settings, "github_token", "token")
+    created = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return fake_github.handle(request)
+
+    def client_factory(token: str) -> GitHubClient:
+        return GitHubClient(
+            token, base_url=API_URL, transport=httpx.MockTransport(handle)
+        )
+
+    def build() -> SyncJobQueue:
+        queue = SyncJobQueue(concurrency=1, client_factory=client_factory)
+        created.append(queue)
+        return queue
+
+    yield build
+    for queue in created:
+        await queue.stop()
+
+
+async def _add_job(**values) -> int:
+    async with AsyncSessionLocal() as db:
+        job = SyncJob(created_at=datetime.utcnow(), **values)
+        db.add(job)
+        await db.commit()
+        return job.id
+
+
+async def _status(job_id: int) -> SyncJobStatus:
+    async with AsyncSessionLocal() as db:
+        return (await db.get(SyncJob, job_id)).status
+
+
+@pytest.mark.asyncio
+async def test_submits_coalesce_into_the_active_job(queues, release, fake_github):
+    first, second = queues(), queues()
+    await first.start()
+    await second.start()
+    release.clear()
+
+    job, created = await first.submit(fake_github.full_name)
+    same, coalesced = await second.submit(fake_github.full_name)
+
+    assert created and not coalesced
+    assert same.id == job.id
+
+    release.set()
+    await first._queue.join()
+    assert await _status(job.id) == SyncJobStatus.COMPLETED
+    # A finished job no longer absorbs new requests
+    later, created = await second.submit(fake_github.full_name)
+    assert created and later.id != job.id
+
+
+@pytest.mark.asyncio
+async def test_database_allows_one_active_job_per_repository(queues):
+    await _add_job(repository_full_name="octocat/hello", status=SyncJobStatus.QUEUED)
+    await _add_job(repository_full_name="octocat/hello", status=SyncJobStatus.COMPLETED)
+
+    with pytest.raises(IntegrityError):
+        await _add_job(
+            repository_full_name="octocat/hello", status=SyncJobStatus.RUNNING
+        )
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_claims_a_job(queues):
+    job_id = await _add_job(
+        repository_full_name="octocat/hello", status=SyncJobStatus.QUEUED
+    )
+
+    claimed = await queues()._claim(job_id)
+    again = await queues()._claim(job_id)
+
+    assert claimed is not None and claimed.status == SyncJobStatus.RUNNING
+    assert again is None
+
+
+@pytest.mark.asyncio
+async def test_restart_recovers_only_jobs_with_expired_leases(queues, fake_github):
+    lease = timedelta(seconds=settings.sync_job_lease_seconds)
+    stale = datetime.utcnow() - lease - timedelta(seconds=1)
+    expired = await _add_job(
+        repository_full_name=fake_github.full_name,
+        status=SyncJobStatus.RUNNING,
+        started_at=stale,
+        heartbeat_at=stale,
+    )
+    alive = await _add_job(
+        repository_full_name="octocat/other",
+        status=SyncJobStatus.RUNNING,
+        started_at=stale,
+        heartbeat_at=datetime.utcnow(),
+    )
+
+    queue = queues()
+    await queue.start()
+    await queue._queue.join()
+
+    assert await _status(expired) == SyncJobStatus.COMPLETED
+    # Still leased by a live worker elsewhere, so this process leaves it alone
+    assert await _status(alive) == SyncJobStatus.RUNNING
+    assert not any(
+        request.url.path.startswith("/repos/octocat/other")
+        for request in fake_github.requests
+    )
@@ -0,0 +1,80 @@
+"""Tests for the stored team aggregates."""
+
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.prediction import (
+    Prediction,
+    PredictionModel,
+    PredictionStatus,
+    PredictionType,
+)
+from app.models.team import Team
+from app.services.team_aggregates import (
+    rebuild_team_aggregates,
+    record_team_validation,
+)
+
+
+@pytest_asyncio.fixture
+async def team_id():
+    async with AsyncSessionLocal() as session:
+        # The seeded cycle time, entered with the team
+        team = Team(name="Frontend Team", average_cycle_time_hours=72.4)
+        session.add(team)
+        session.add(
+            PredictionModel(
+                id=1,
+                name="Model",
+                version="1",
+                model_type="random_forest",
+                prediction_type=PredictionType.HOURS,
+            )
+        )
+        await session.commit()
+        yield team.id
+    await async_engine.dispose()
+
+
+def _hours_prediction(team_id: int, predicted: float, actual: float) -> Prediction:
+    return Prediction(
+        task_title="Task",
+        input_features={},
+        prediction_type=PredictionType.HOURS,
+        predicted_value=predicted,
+        actual_value=actual,
+        validation_date=datetime(2026, 10, 18, 12),
+        status=PredictionStatus.VALIDATED,
+        model_id=1,
+        team_id=team_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_validation_updates_accuracy_and_keeps_cycle_time(team_id):
+    async with AsyncSessionLocal() as session:
+        prediction = _hours_prediction(team_id, predicted=8, actual=10)
+        session.add(prediction)
+        await session.flush()
+        await record_team_validation(session, prediction)
+        await session.commit()
+
+        team = await session.get(Team, team_id, populate_existing=True)
+        assert team.validated_prediction_count == 1
+        assert team.estimation_accuracy_score == pytest.approx(0.8)
+        assert team.average_cycle_time_hours == pytest.approx(72.4)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_cycle_time(team_id, db):
+    db.add(_hours_prediction(team_id, predicted=10, actual=10))
+    db.commit()
+
+    assert rebuild_team_aggregates(db) == 1
+
+    team = db.get(Team, team_id)
+    assert team.estimation_accuracy_score == pytest.approx(1.0)
+    assert team.average_cycle_time_hours == pytest.approx(72.4)
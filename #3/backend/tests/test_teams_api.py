@@ -0,0 +1,250 @@
+"""Tests for the teams API."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.prediction import Prediction, PredictionModel, PredictionType
+from app.models.team import (
+    ExperienceLevel,
+    SeniorityLevel,
+    Sprint,
+    Team,
+    TeamMember,
+    TechnologyExperience,
+)
+from app.services.feature_store import feature_store
+
+
+@pytest.fixture
+def sprints(db):
+    """A team with a completed sprint at velocity 20 and an active one."""
+    team = Team(name="Platform Team")
+    other = Team(name="Data Team")
+    db.add_all([team, other])
+    db.flush()
+    start = datetime(2026, 9, 1)
+    completed, active = (
+        Sprint(
+            name=f"Sprint {number}",
+            start_date=start + timedelta(days=14 * number),
+            end_date=start + timedelta(days=14 * (number + 1)),
+            is_active=number == 2,
+            is_completed=number == 1,
+            planned_story_points=30,
+            velocity=20.0 if number == 1 else None,
+            team_id=team.id,
+        )
+        for number in (1, 2)
+    )
+    db.add_all([completed, active])
+    db.commit()
+    return team.id, other.id, active.id
+
+
+def test_completing_a_sprint_refreshes_the_team_velocity_feature(client, sprints):
+    team_id, other_team_id, sprint_id = sprints
+
+    response = client.post(
+        f"/api/v1/teams/{team_id}/sprints/{sprint_id}/complete",
+        json={"completed_story_points": 30, "actual_hours": 120.5},
+    )
+
+    assert response.status_code == 200
+    sprint = response.json()
+    assert sprint["is_completed"] and not sprint["is_active"]
+    assert sprint["velocity"] == 30.0
+    assert sprint["actual_hours"] == 120.5
+    assert feature_store.features(team_id)["team_avg_velocity"] == 25.0
+
+    again = client.post(
+        f"/api/v1/teams/{team_id}/sprints/{sprint_id}/complete",
+        json={"completed_story_points": 30},
+    )
+    assert again.status_code == 409
+    elsewhere = client.post(
+        f"/api/v1/teams/{other_team_id}/sprints/{sprint_id}/complete",
+        json={"completed_story_points": 30},
+    )
+    assert elsewhere.status_code == 404
+
+
+def test_completing_a_sprint_updates_the_stored_team_velocity(client, sprints):
+    team_id, other_team_id, sprint_id = sprints
+
+    client.post(
+        f"/api/v1/teams/{team_id}/sprints/{sprint_id}/complete",
+        json={"completed_story_points": 40},
+    )
+
+    assert client.get(f"/api/v1/teams/{team_id}").json()["average_velocity"] == 30.0
+    assert (
+        client.get(f"/api/v1/teams/{other_team_id}").json()["average_velocity"] is None
+    )
+
+
+def _add_teams(db, count: int, members: int) -> int:
+    """Add teams with members, skills, sprints and predictions; return the first."""
+    model = db.query(PredictionModel).first()
+    if model is None:
+        model = PredictionModel(
+            name="Model",
+            version="1",
+            model_type="random_forest",
+            prediction_type=PredictionType.STORY_POINTS,
+        )
+        db.add(model)
+        db.flush()
+
+    teams = [Team(name=f"Team {i}", current_size=members) for i in range(count)]
+    db.add_all(teams)
+    db.flush()
+    now = datetime.utcnow()
+    for team in teams:
+        for number in range(members):
+            member = TeamMember(
+                team_id=team.id,
+                name=f"Member {number}",
+                seniority_level=list(SeniorityLevel)[number % len(SeniorityLevel)],
+                years_of_experience=number + 1,
+            )
+            db.add(member)
+            db.flush()
+            db.add(
+                TechnologyExperience(
+                    team_member_id=member.id,
+                    technology_name=f"Tech {number % 3}",
+                    experience_level=ExperienceLevel.ADVANCED,
+                    proficiency_score=0.8,
+                )
+            )
+            db.add(
+                Sprint(
+                    name=f"Sprint {number}",
+                    start_date=now - timedelta(days=number + 1),
+                    end_date=now,
+                    planned_story_points=20,
+                    completed_story_points=18,
+                    team_id=team.id,
+                )
+            )
+            db.add(
+                Prediction(
+                    task_title=f"Task {number}",
+                    input_features={},
+                    prediction_type=PredictionType.STORY_POINTS,
+                    predicted_value=3.0,
+                    model_id=model.id,
+                    team_id=team.id,
+                )
+            )
+    db.commit()
+    return teams[0].id
+
+
+def test_team_endpoint_query_counts_do_not_grow_with_teams_and_members(
+    client, db, count_queries
+):
+    statement_counts = []
+    for teams, members in ((2, 2), (8, 8)):
+        # A team added for each size, so no cached response is reused
+        team_id = _add_teams(db, teams, members)
+        counts = {}
+        for name, url in (
+            ("list", "/api/v1/teams/"),
+            ("analytics", f"/api/v1/teams/{team_id}/analytics"),
+            ("performance", f"/api/v1/analytics/teams/{team_id}/performance"),
+        ):
+            with count_queries() as statements:
+                response = client.get(url)
+            assert response.status_code == 200
+            counts[name] = len(statements)
+        statement_counts.append(counts)
+
+    small, large = statement_counts
+    assert small == large
+
+
+@pytest.fixture
+def skills(db):
+    """Python and Go skills across active and inactive members and teams."""
+    platform, data = Team(name="Platform Team"), Team(name="Data Team")
+    retired = Team(name="Retired Team", is_active=False)
+    db.add_all([platform, data, retired])
+    db.flush()
+    for team, name, technology, score, active in (
+        (platform, "Ada", "Python", 90.0, True),
+        (platform, "Grace", "Python", 70.0, True),
+        (platform, "Linus", "Python", 95.0, False),
+        (platform, "Rob", "Go", 99.0, True),
+        (data, "Guido", "Python", 80.0, True),
+        (retired, "Barbara", "Python", 85.0, True),
+    ):
+        member = TeamMember(team_id=team.id, name=name, is_active=active)
+        db.add(member)
+        db.flush()
+        db.add(
+            TechnologyExperience(
+                team_member_id=member.id,
+                technology_name=technology,
+                proficiency_score=score,
+            )
+        )
+    db.commit()
+    return {team.name: team.id for team in (platform, data, retired)}
+
+
+def _search(client, **params):
+    response = client.get("/api/v1/teams/skills", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_skill_search_filters_by_technology_and_proficiency(client, skills):
+    result = _search(client, technology="Python", min_proficiency=75)
+
+    assert [member["member_name"] for member in result["members"]] == [
+        "Ada",
+        "Guido",
+    ]
+    assert [
+        (team["team_name"], team["member_count"], team["max_proficiency"])
+        for team in result["teams"]
+    ] == [("Platform Team", 1, 90.0), ("Data Team", 1, 80.0)]
+
+    everyone = _search(client, technology="Python")
+    assert [member["member_name"] for member in everyone["members"]] == [
+        "Ada",
+        "Guido",
+        "Grace",
+    ]
+    platform = everyone["teams"][0]
+    assert (platform["team_id"], platform["member_count"]) == (
+        skills["Platform Team"],
+        2,
+    )
+    assert platform["average_proficiency"] == 80.0
+
+    go = _search(client, technology="Go")
+    assert [member["member_name"] for member in go["members"]] == ["Rob"]
+
+
+def test_skill_search_includes_inactive_members_and_teams_on_request(client, skills):
+    result = _search(client, technology="Python", min_proficiency=75, active_only=False)
+
+    assert [member["member_name"] for member in result["members"]] == [
+        "Linus",
+        "Ada",
+        "Barbara",
+        "Guido",
+    ]
+    assert [(team["team_name"], team["member_count"]) for team in result["teams"]] == [
+        ("Platform Team", 2),
+        ("Retired Team", 1),
+        ("Data Team", 1),
+    ]
+
+    # The limit applies to the members, not the per-team summary
+    limited = _search(client, technology="Python", active_only=False, limit=1)
+    assert [member["member_name"] for member in limited["members"]] == ["Linus"]
+    assert len(limited["teams"]) == 3
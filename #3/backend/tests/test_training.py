@@ -0,0 +1,39 @@
+"""Tests for claiming scheduled training runs."""
+
+from datetime import datetime, timedelta
+
+from app.models.prediction import PredictionModel, PredictionType, TrainingClaim
+from app.services.training import TRAINING_CLAIM_NAME, claim_training
+
+INTERVAL = timedelta(hours=24)
+
+
+def test_only_one_claim_per_interval(db):
+    assert claim_training(db, INTERVAL) is True
+    assert claim_training(db, INTERVAL) is False
+    # Forced runs, like the training script's, still claim
+    assert claim_training(db, INTERVAL, force=True) is True
+
+
+def test_claim_is_due_again_after_the_interval(db):
+    assert claim_training(db, INTERVAL) is True
+    claim = db.get(TrainingClaim, TRAINING_CLAIM_NAME)
+    claim.claimed_at -= INTERVAL
+    db.commit()
+
+    assert claim_training(db, INTERVAL) is True
+
+
+def test_first_claim_waits_for_the_last_training_run(db):
+    db.add(
+        PredictionModel(
+            name="Hours Estimator",
+            version="1",
+            model_type="ridge",
+            prediction_type=PredictionType.HOURS,
+            training_started_at=datetime.utcnow() - timedelta(hours=1),
+        )
+    )
+    db.commit()
+
+    assert claim_training(db, INTERVAL) is False
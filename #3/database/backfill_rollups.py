@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Accuracy rollup backfill script for GitHub Predictive Analytics.
+
+This script rebuilds the EstimationAccuracy rollups from the full history of
+validated predictions. Run it after upgrading an existing database, or any time
+the rollups need to be recomputed from scratch.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to the path so we can import our modules
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.database import get_database_session
+from app.services.accuracy_rollups import rebuild_accuracy_rollups
+
+
+def main():
+    """Main function to rebuild the accuracy rollups."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of predictions streamed from the database per batch",
+    )
+    args = parser.parse_args()
+
+    print("📊 GitHub Predictive Analytics - Accuracy Rollup Backfill")
+    print("=" * 60)
+
+    db = get_database_session()
+    try:
+        rollup_count = rebuild_accuracy_rollups(db, batch_size=args.batch_size)
+        print(f"✅ Rebuilt {rollup_count} accuracy rollups")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Rollup backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Dashboard summary benchmark for GitHub Predictive Analytics.
+
+This script times the dashboard counts as one statement against the separate
+COUNT queries they replaced, and checks that both return the same numbers.
+Pass --seed to first add synthetic predictions and issues, split 60/40, to
+the configured database; point DATABASE_URL at a scratch database to do so.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the backend directory to the path so we can import our modules
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import func, insert, select
+
+from app.api.analytics import dashboard_counts_query
+from app.core.database import (
+    AsyncSessionLocal,
+    Base,
+    close_db_connection,
+    engine,
+    get_database_session,
+)
+from app.models.github import GitHubUser, Issue, Repository
+from app.models.prediction import (
+    ModelStatus,
+    Prediction,
+    PredictionModel,
+    PredictionStatus,
+    PredictionType,
+)
+from app.models.team import Team, TeamMember
+
+TEAMS = 100
+MEMBERS_PER_TEAM = 8
+REPOSITORIES = 200
+SEED_BATCH_SIZE = 10000
+
+
+def seed(rows: int) -> None:
+    """Add teams, repositories, models and ``rows`` predictions and issues."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    now = datetime.utcnow()
+
+    def created_at() -> datetime:
+        return now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+
+    db = get_database_session()
+    try:
+        first_team = (db.scalar(select(func.max(Team.id))) or 0) + 1
+        # GitHub IDs only need to be unique within each table
+        first_github_id = 1 + max(
+            db.scalar(select(func.max(model.github_id))) or 0
+            for model in (GitHubUser, Repository, Issue)
+        )
+        user = GitHubUser(
+            github_id=first_github_id,
+            login=f"benchmark-{first_github_id}",
+            created_at=now,
+        )
+        db.add(user)
+        db.flush()
+
+        db.execute(
+            insert(Team),
+            [{"name": f"Benchmark team {first_team + i}"} for i in range(TEAMS)],
+        )
+        db.execute(
+            insert(TeamMember),
+            [
+                {
+                    "team_id": first_team + i // MEMBERS_PER_TEAM,
+                    "name": f"Member {i}",
+                    "is_active": rng.random() < 0.9,
+                }
+                for i in range(TEAMS * MEMBERS_PER_TEAM)
+            ],
+        )
+        repository_ids = db.scalars(
+            insert(Repository).returning(Repository.id),
+            [
+                {
+                    "github_id": first_github_id + i,
+                    "name": f"repo-{first_github_id + i}",
+                    "full_name": f"benchmark/repo-{first_github_id + i}",
+                    "url": f"https://github.com/benchmark/repo-{first_github_id + i}",
+                    "clone_url": f"https://github.com/benchmark/repo-{first_github_id + i}.git",
+                    "owner_id": user.id,
+                    "created_at": now,
+                }
+                for i in range(REPOSITORIES)
+            ],
+        ).all()
+        model_ids = db.scalars(
+            insert(PredictionModel).returning(PredictionModel.id),
+            [
+                {
+                    "name": "Benchmark model",
+                    "version": str(i),
+                    "model_type": "random_forest",
+                    "prediction_type": PredictionType.HOURS,
+                    "status": ModelStatus.ACTIVE if i == 0 else ModelStatus.DEPRECATED,
+                }
+                for i in range(5)
+            ],
+        ).all()
+
+        predictions = rows * 3 // 5
+        for start in range(0, predictions, SEED_BATCH_SIZE):
+            db.execute(
+                insert(Prediction),
+                [
+                    {
+                        "task_title": f"Task {start + i}",
+                        "input_features": {},
+                        "prediction_type": PredictionType.HOURS,
+                        "predicted_value": rng.uniform(1, 40),
+                        "status": PredictionStatus.VALIDATED
+                        if rng.random() < 0.3
+                        else PredictionStatus.PENDING,
+                        "model_id": rng.choice(model_ids),
+                        "team_id": first_team + rng.randrange(TEAMS),
+                        "created_at": created_at(),
+                    }
+                    for i in range(min(SEED_BATCH_SIZE, predictions - start))
+                ],
+            )
+
+        issues = rows - predictions
+        first_issue = first_github_id + REPOSITORIES
+        for start in range(0, issues, SEED_BATCH_SIZE):
+            db.execute(
+                insert(Issue),
+                [
+                    {
+                        "github_id": first_issue + start + i,
+                        "number": start + i,
+                        "title": f"Issue {start + i}",
+                        "state": "closed" if rng.random() < 0.6 else "open",
+                        "url": f"https://github.com/benchmark/issues/{start + i}",
+                        "repository_id": rng.choice(repository_ids),
+                        "author_id": user.id,
+                        "created_at": created_at(),
+                    }
+                    for i in range(min(SEED_BATCH_SIZE, issues - start))
+                ],
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def separate_counts(db, start_date: datetime, team_id=None) -> dict:
+    """The dashboard counts as one query each, as the endpoint used to run them."""
+    team_query = select(func.count(Team.id)).where(Team.is_active == True)
+    pred_query = select(func.count(Prediction.id)).where(
+        Prediction.created_at >= start_date
+    )
+    if team_id:
+        team_query = team_query.where(Team.id == team_id)
+        pred_query = pred_query.where(Prediction.team_id == team_id)
+    issue_query = select(func.count(Issue.id)).where(Issue.created_at >= start_date)
+    model_query = select(func.count(PredictionModel.id))
+
+    return {
+        "active_teams": await db.scalar(team_query),
+        "total_members": await db.scalar(
+            select(func.count(TeamMember.id)).where(TeamMember.is_active == True)
+        ),
+        "recent_predictions": await db.scalar(pred_query),
+        "validated_predictions": await db.scalar(
+            pred_query.where(Prediction.status == PredictionStatus.VALIDATED)
+        ),
+        "total_repositories": await db.scalar(select(func.count(Repository.id))),
+        "recent_issues": await db.scalar(issue_query),
+        "closed_issues": await db.scalar(issue_query.where(Issue.state == "closed")),
+        "active_models": await db.scalar(
+            model_query.where(PredictionModel.status == ModelStatus.ACTIVE)
+        ),
+        "total_models": await db.scalar(model_query),
+    }
+
+
+async def single_statement(db, start_date: datetime, team_id=None) -> dict:
+    result = await db.execute(dashboard_counts_query(start_date, team_id))
+    return dict(result.one()._mapping)
+
+
+async def benchmark(runs: int, days: int, team_id) -> None:
+    start_date = datetime.utcnow() - timedelta(days=days)
+    async with AsyncSessionLocal() as db:
+        rows = await db.scalar(select(func.count(Prediction.id))) + await db.scalar(
+            select(func.count(Issue.id))
+        )
+        print(f"Predictions and issues: {rows:,}")
+
+        results = {}
+        for name, counts in (
+            ("separate queries", separate_counts),
+            ("single statement", single_statement),
+        ):
+            # Warm the connection and page cache before timing
+            results[name] = await counts(db, start_date, team_id)
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                await counts(db, start_date, team_id)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(
+                f"{name:>17}: median {statistics.median(timings):8.2f} ms, "
+                f"min {min(timings):8.2f} ms over {runs} runs"
+            )
+    await close_db_connection()
+
+    if results["separate queries"] != results["single statement"]:
+        print(f"❌ Counts differ: {results}")
+        sys.exit(1)
+    print(f"✅ Counts match: {results['single statement']}")
+
+
+def main():
+    """Main function to run the dashboard benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        metavar="ROWS",
+        help="Add this many synthetic predictions and issues before timing",
+    )
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per variant")
+    parser.add_argument("--days", type=int, default=7, help="Dashboard period in days")
+    parser.add_argument("--team-id", type=int, default=None, help="Team filter")
+    args = parser.parse_args()
+
+    print("⏱️  GitHub Predictive Analytics - Dashboard Benchmark")
+    print("=" * 60)
+
+    if args.seed:
+        started = time.perf_counter()
+        seed(args.seed)
+        print(f"Seeded {args.seed:,} rows in {time.perf_counter() - started:.1f}s")
+
+    asyncio.run(benchmark(args.runs, args.days, args.team_id))
+
+
+if __name__ == "__main__":
+    main()
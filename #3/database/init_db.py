@@ -35,6 +35,8 @@ from app.models.prediction import (
     ModelStatus,
     PredictionStatus,
 )
+from app.services.accuracy_rollups import rebuild_accuracy_rollups
+from app.services.team_aggregates import rebuild_team_aggregates
 from datetime import datetime, timedelta
 import json
 
@@ -504,6 +506,14 @@ def seed_sample_data():
             db.add(sprint)
         db.commit()
 
+        # Build accuracy rollups for the validated sample predictions
+        print("Building accuracy rollups...")
+        rebuild_accuracy_rollups(db)
+
+        # Derive team sizes and metrics from the sample members and history
+        print("Building team aggregates...")
+        rebuild_team_aggregates(db)
+
         print("✅ Sample data seeded successfully!")
 
     except Exception as e:
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Model training script for GitHub Predictive Analytics.
+
+This script trains a model for each prediction type from the collected task
+features, records it as a new prediction model and deploys it when it beats
+the active one. The API runs the same pipeline on its retrain interval; use
+this script to train on demand or from an external scheduler.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to the path so we can import our modules
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.services.training import run_training
+
+
+def main():
+    """Main function to train the prediction models."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--if-due",
+        action="store_true",
+        help="Skip training if a run was claimed within the retrain interval",
+    )
+    args = parser.parse_args()
+
+    print("🧠 GitHub Predictive Analytics - Model Training")
+    print("=" * 60)
+
+    try:
+        results = run_training(force=not args.if_due)
+    except Exception as e:
+        print(f"\n❌ Model training failed: {e}")
+        sys.exit(1)
+
+    if not results:
+        print("ℹ️  Nothing trained: not enough task features, or training not due")
+    for result in results:
+        status = "deployed" if result.deployed else "kept inactive"
+        print(
+            f"✅ {result.prediction_type.value}: {result.model_type} "
+            f"(CV R² {result.cross_validation_score:.3f}, "
+            f"MAE {result.mae:.2f}) {status}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -107,6 +107,29 @@ export interface ValidationRequest {
 export interface SyncRequest {
     repository_full_name: string;
     github_token?: string;
+    full_resync?: boolean;
+}
+
+export interface SyncChangeCounts {
+    inserted: number;
+    updated: number;
+    unchanged: number;
+}
+
+export interface SyncJob {
+    id: number;
+    repository_full_name: string;
+    status: 'queued' | 'running' | 'completed' | 'failed';
+    full_resync: boolean;
+    repository_id?: number;
+    issues_synced: number;
+    pull_requests_synced: number;
+    commits_synced: number;
+    result?: Record<'issues' | 'pull_requests' | 'commits', SyncChangeCounts>;
+    error?: string;
+    created_at: string;
+    started_at?: string;
+    finished_at?: string;
 }
 
 export interface DashboardSummary {
@@ -233,7 +256,16 @@ export const githubApi = {
     },
 
     syncRepository: (data: SyncRequest) =>
-        api.post<{ message: string; repository_id: number; issues_synced: number; pull_requests_synced: number; commits_synced: number }>('/api/v1/github/repositories/sync', data),
+        api.post<SyncJob>('/api/v1/github/repositories/sync', data),
+
+    listSyncJobs: (status?: SyncJob['status'], limit = 50) => {
+        const params = new URLSearchParams({ limit: limit.toString() });
+        if (status) params.append('status', status);
+        return api.get<SyncJob[]>(`/api/v1/github/sync-jobs?${params}`);
+    },
+
+    getSyncJob: (jobId: number) =>
+        api.get<SyncJob>(`/api/v1/github/sync-jobs/${jobId}`),
 
     getRepositoryAnalytics: (repoId: number) =>
         api.get<{
@@ -304,6 +336,9 @@ export const predictionsApi = {
     createPrediction: (data: PredictionRequest) =>
         api.post<Prediction>('/api/v1/predictions/predict', data),
 
+    createPredictionsBatch: (tasks: PredictionRequest[]) =>
+        api.post<Prediction[]>('/api/v1/predictions/predict/batch', { tasks }),
+
     listPredictions: (params?: {
         skip?: number;
         limit?: number;